@@ -0,0 +1,116 @@
+"""
+Times the CPU-bound paths of every feed delivery against synthetic catalogs: converting API details (from_dict),
+grouping creators (format_creators), rendering comic embeds (to_embed) and summaries (summary_embed), filtering by
+keywords (check_comic) and ordering the catalog (catalog_order). Reports calls per second and the peak memory
+allocated per call.
+
+Results can be saved as a baseline, and later runs compared against it; the run fails if any benchmark got slower by
+more than the threshold.
+
+    python -m benchmarks.bench_hot_paths --comics 100 1000 10000 --keywords 0 50 500
+    python -m benchmarks.bench_hot_paths --save benchmarks/baseline.json
+    python -m benchmarks.bench_hot_paths --baseline benchmarks/baseline.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Iterator, Tuple
+
+from benchmarks.synthetic import synthetic_details, synthetic_keywords, to_comic
+from funcs.pull_functions import summary_embed, catalog_order
+from objects.brand import Brands, MARVEL
+
+# A benchmark is a batch to run, and how many calls it makes
+Batch = Tuple[Callable[[], object], int]
+
+
+def benchmarks(comic_counts, keyword_counts) -> Iterator[Tuple[str, Batch]]:
+    brand = Brands()[MARVEL]
+    loop = asyncio.new_event_loop()
+    for count in comic_counts:
+        details = synthetic_details(count, brand)
+        comics = {c.id: c for c in map(to_comic, details)}
+        values = list(comics.values())
+        order = {brand.id: catalog_order(comics)}
+
+        yield f"from_dict[{count}]", (lambda: [to_comic(d) for d in details], count)
+        yield f"format_creators[{count}]", (lambda: [c.format_creators() for c in values], count)
+        yield f"to_embed[{count}]", (lambda: [c.to_embed() for c in values], count)
+        yield f"summary_embed[{count}]", (lambda: loop.run_until_complete(summary_embed(order, comics, brand)), 1)
+        yield f"catalog_order[{count}]", (lambda: catalog_order(comics), 1)
+        for keyword_count in keyword_counts:
+            keywords = synthetic_keywords(keyword_count)
+            yield f"check_comic[{count}x{keyword_count}]", (lambda: [keywords.check_comic(c) for c in values], count)
+    loop.close()
+
+
+def measure(batch: Batch, min_time: float) -> Dict[str, float]:
+    fn, calls = batch
+    fn()  # Warm up
+
+    batches, started = 0, perf_counter()
+    while True:
+        fn()
+        batches += 1
+        elapsed = perf_counter() - started
+        if elapsed >= min_time:
+            break
+
+    # Measured separately, since tracing allocations slows everything down
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'ops_per_sec': batches * calls / elapsed, 'peak_bytes_per_op': (peak - before) / calls}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> bool:
+    print()
+    print(f"{'benchmark':<32} {'baseline ops/s':>15} {'ops/s':>12} {'change':>8}")
+    ok = True
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, now = baseline[name]['ops_per_sec'], result['ops_per_sec']
+        change = now / before - 1
+        regressed = change < -threshold
+        ok = ok and not regressed
+        print(f"{name:<32} {before:>15,.0f} {now:>12,.0f} {change:>+8.1%}{'  REGRESSED' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comics', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--keywords', type=int, nargs='+', default=[0, 50, 500])
+    parser.add_argument('--min-time', type=float, default=0.5, help="Seconds to run each benchmark for")
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name contains this")
+    parser.add_argument('--save', type=Path, help="Save the results as a baseline")
+    parser.add_argument('--baseline', type=Path, help="Compare the results against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Slowdown allowed against the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'benchmark':<32} {'ops/s':>12} {'peak B/op':>11}")
+    for name, batch in benchmarks(args.comics, args.keywords):
+        if args.filter not in name:
+            continue
+        results[name] = result = measure(batch, args.min_time)
+        print(f"{name:<32} {result['ops_per_sec']:>12,.0f} {result['peak_bytes_per_op']:>11,.0f}")
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.baseline and not compare(results, json.loads(args.baseline.read_text()), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Times imager_to_bytes, which renders the avatar, at a range of output sizes, with the corner masks cached (as in the
+bot) and rebuilt every call (as before they were cached), and through the compositor process pool.
+
+    python -m benchmarks.bench_imager --sizes 512 1200 2048 --repeat 10
+"""
+import argparse
+import asyncio
+import random
+from time import perf_counter
+from typing import Callable, List
+
+from PIL import Image
+
+from funcs.profile import Profile, imager_to_bytes, corner_mask, render_profile, shutdown_compositor
+
+# The avatar's layout at 1200px, scaled to each size
+BASE_SIZE, BASE_MARGIN, BASE_SKEW, BASE_ELEM_WIDTH, BASE_CORNERS = 1200, 70, 300, 600, 20
+
+
+def synthetic_covers(elem_width: int, count: int = 4, seed: int = 0) -> List[Image.Image]:
+    """Noisy RGBA covers at a typical 2:3 aspect ratio, already at the width they are laid out at."""
+    rng = random.Random(seed)
+    return [Image.effect_noise((elem_width, elem_width * 3 // 2), rng.randint(32, 96)).convert('RGBA')
+            for _ in range(count)]
+
+
+def profile_at(size: int) -> Profile:
+    scale = size / BASE_SIZE
+    elem_width = int(BASE_ELEM_WIDTH * scale)
+    return Profile(synthetic_covers(elem_width), size, int(BASE_MARGIN * scale), int(BASE_SKEW * scale), elem_width,
+                   bg=(255, 255, 255, 240), round_corners=max(1, int(BASE_CORNERS * scale)))
+
+
+def time_calls(fn: Callable[[], object], repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        fn()
+        times.append((perf_counter() - started) * 1000)
+    return times
+
+
+def uncached(pf: Profile):
+    corner_mask.cache_clear()
+    return imager_to_bytes(pf)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512, 1024, 1200, 2048])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    print(f"{'size':>6} {'variant':<14} {'min ms':>9} {'mean ms':>9} {'max ms':>9} {'png KiB':>9}")
+    for size in args.sizes:
+        pf = profile_at(size)
+        png_size = len(imager_to_bytes(pf).getvalue()) / 1024
+
+        variants = {
+            'masks cached': lambda: imager_to_bytes(pf),
+            'masks rebuilt': lambda: uncached(pf),
+            'process pool': lambda: loop.run_until_complete(render_profile(pf)),
+        }
+        for name, fn in variants.items():
+            fn()  # Warm up: caches, pool workers
+            times = time_calls(fn, args.repeat)
+            print(f"{size:>6} {name:<14} {min(times):>9.1f} {sum(times) / len(times):>9.1f} {max(times):>9.1f} "
+                  f"{png_size:>9.1f}")
+    loop.close()
+    shutdown_compositor()
+
+
+if __name__ == '__main__':
+    main()
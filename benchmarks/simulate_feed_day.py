@@ -0,0 +1,240 @@
+"""
+Simulates a feed day: loads N synthetic configurations and runs the Pulls cog's own startup, scheduling
+(schedule_feeds, calculate_schedule_offsets, the feed scheduler) and deliveries (send_comics) against fake Discord
+and Postgres layers, on a virtual clock. Hours of scheduled feeds pass in however long the bot's code takes to run.
+
+Discord requests take a random latency and get 429s past Discord's limits; queries take a fixed latency. Reports the
+fan-out time from the first feed to the last one finishing, feed lag, requests and 429s, peak memory, peak task count
+and the longest the event loop was held by a single pass over its callbacks.
+
+    python -m benchmarks.simulate_feed_day --configs 50000 --comics 100
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime as dt
+import os
+import random
+import resource
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Dict, List
+
+# The bot's config is read on import, so point it at the simulation first
+_workdir = tempfile.TemporaryDirectory()
+os.environ['CATALOG_SNAPSHOT_PATH'] = str(Path(_workdir.name) / 'catalog.snapshot')
+os.environ['ADMIN_GUILD_IDS'] = os.getenv('ADMIN_GUILD_IDS') or '0'
+os.environ['TRACE_SAMPLE_RATE'] = '0'
+
+from benchmarks.simulation import VirtualClockLoop, virtual_utcnow, FakeDiscord, FakeGuild, FakeChannel, FakePool
+from benchmarks.synthetic import synthetic_catalog, synthetic_keywords
+from config import CATALOG_SNAPSHOT_PATH, POSTGRES_POOL_MAX_SIZE, DISPATCH_WORKERS, GLOBAL_RATE_LIMIT
+from funcs.database import Database
+from funcs.dispatcher import RateLimitTracker, DeliveryDispatcher
+from funcs.metrics import BotMetrics
+from funcs.profiler import Profiler
+from funcs.pull_functions import catalog_order
+from funcs.sharding import ShardPlan
+from funcs.snapshot import write_snapshot
+from funcs.startup import Startup
+from funcs.tracing import Tracer
+from objects.brand import Brands
+from objects.configuration_store import ConfigurationStore
+from pulls import PullsCog
+
+BOT_ID = 1 << 50
+
+
+class SimBot:
+    """The parts of the bot the Pulls cog uses, with Discord's caches filled from the fake guilds."""
+
+    def __init__(self, loop: VirtualClockLoop, guilds: List[FakeGuild], **attributes):
+        self.loop = loop
+        self.guilds = guilds
+        self.user = SimpleNamespace(id=BOT_ID)
+        self.tree = SimpleNamespace(on_error=None)
+        self._guilds = {g.id: g for g in guilds}
+        self._channels = {c.id: c for g in guilds for c in g.channels.values()}
+        self.__dict__.update(attributes)
+
+    def get_guild(self, guild_id: int):
+        return self._guilds.get(guild_id)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+    def get_cog(self, _name: str):
+        return None
+
+    def is_closed(self) -> bool:
+        return False
+
+    async def change_presence(self, **_kwargs):
+        pass
+
+
+def synthetic_servers(count: int, brand_ids: List[str], day: int, discord_: FakeDiscord, rng: random.Random,
+                      formats: Dict[str, float], keyword_share: float):
+    """Guilds, configuration rows and keyword rows for `count` feeds, one to a server per brand."""
+    guilds, configurations, keywords = [], [], {}
+    snowflakes = iter(range(1 << 42, 1 << 43, 1 << 22))
+
+    guild = None
+    for n in range(count):
+        brand_id = brand_ids[n % len(brand_ids)]
+        # Most servers follow one brand, some follow several
+        if guild is None or brand_id == brand_ids[0] or rng.random() < 0.6:
+            guild = FakeGuild(next(snowflakes), int(rng.lognormvariate(6, 2)), BOT_ID)
+            guilds.append(guild)
+            channel = FakeChannel(discord_, guild, next(snowflakes), BOT_ID)
+            guild.channels[channel.id] = channel
+        elif rng.random() < 0.5:
+            channel = FakeChannel(discord_, guild, next(snowflakes), BOT_ID)
+            guild.channels[channel.id] = channel
+
+        check_keywords = rng.random() < keyword_share
+        if check_keywords and guild.id not in keywords:
+            kw = synthetic_keywords(rng.randint(1, 20), guild.id, seed=n)
+            keywords[guild.id] = [{'server': guild.id, 'keyword': k, 'type': 0} for k in kw.keys] + \
+                                 [{'server': guild.id, 'keyword': k, 'type': 1} for k in kw.creators]
+        configurations.append({
+            'server': guild.id, 'channel': channel.id, 'brand': brand_id,
+            'format': rng.choices(list(formats), weights=list(formats.values()))[0],
+            'day': day, 'ping': next(snowflakes) if rng.random() < 0.2 else None, 'pin': rng.random() < 0.3,
+            'check_key': check_keywords,
+        })
+    return guilds, configurations, keywords
+
+
+def quantile(histogram, q: float) -> float:
+    """Upper bound of the bucket holding the `q` quantile of a metrics histogram with one label set."""
+    if not histogram.values:
+        return 0.0
+    counts, _ = histogram.values[()]
+    target, seen = q * sum(counts), 0
+    for bound, n in zip(histogram.buckets, counts):
+        seen += n
+        if seen >= target:
+            return bound
+    return histogram.buckets[-1]
+
+
+async def simulate(args, loop: VirtualClockLoop) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    brands = [Brands()[b] for b in args.brands]
+
+    # The cog loads the catalog from its snapshot, as shard processes that don't crawl do
+    comics = {b.id: synthetic_catalog(args.comics, b, seed=n) for n, b in enumerate(brands)}
+    order = {b.id: catalog_order(comics[b.id]) for b in brands}
+    write_snapshot(CATALOG_SNAPSHOT_PATH, comics, order, {b.id: loop.utcnow() for b in brands})
+
+    rate_limits = RateLimitTracker(GLOBAL_RATE_LIMIT)
+    discord_ = FakeDiscord(rate_limits, args.latency / 1000, rate_limit_chance=args.rate_limit_chance, seed=args.seed)
+    formats = {'FULL': args.full, 'COMPACT': args.compact, 'SUMMARY': max(0.0, 1 - args.full - args.compact)}
+    guilds, configurations, keywords = synthetic_servers(
+        args.configs, [b.id for b in brands], args.day, discord_, rng, formats, args.keyword_share)
+
+    db = Database(FakePool(POSTGRES_POOL_MAX_SIZE, args.db_latency / 1000, configurations, keywords))
+    configs = ConfigurationStore(db)
+    await configs.load()
+
+    delivery = DeliveryDispatcher(rate_limits, workers=DISPATCH_WORKERS)
+    delivery.start(loop)
+    bot = SimBot(loop, guilds, db=db, configs=configs, rate_limits=rate_limits, delivery=delivery,
+                 startup=Startup(), shard_plan=ShardPlan(crawl_leader=False), tracer=Tracer(None),
+                 profiler=Profiler(), image_cache=None, migrations_applied=[])
+    bot.metrics = BotMetrics(bot)
+
+    started = perf_counter()
+    bot.startup.begin('gateway')
+    cog = PullsCog(bot)
+    cog.feed_scheduler.clock = loop.utcnow
+    bot.startup.done('db')
+    bot.startup.done('gateway')
+
+    await bot.startup.wait('feeds')
+    scheduling_time = perf_counter() - started
+    first_feed = min(cog.feed_scheduler.next_fire(k) for k in cog.feed_scheduler.keys())
+
+    delivered, last_delivery, peak_tasks = 0, loop.utcnow(), 0
+    deadline = first_feed + dt.timedelta(hours=args.max_hours)
+    while delivered < len(configurations) and loop.utcnow() < deadline:
+        await asyncio.sleep(1)
+        peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+        total = sum(bot.metrics.feeds_delivered.values.values())
+        if total != delivered:
+            delivered, last_delivery = total, loop.utcnow()
+
+    cog.feed_scheduler.stop()
+    delivery.stop()
+    for task in asyncio.all_tasks():
+        if task is not asyncio.current_task():
+            task.cancel()
+
+    return {
+        'configs': len(configurations),
+        'servers': len(guilds),
+        'first feed': first_feed.strftime('%Y-%m-%d %H:%M:%S UTC'),
+        'delivered': delivered,
+        'scheduling (real s)': round(scheduling_time, 2),
+        'fan-out (virtual s)': round((last_delivery - first_feed).total_seconds(), 1),
+        'feed lag p50 (s, bucket)': quantile(bot.metrics.feed_lag, 0.5),
+        'feed lag p99 (s, bucket)': quantile(bot.metrics.feed_lag, 0.99),
+        'requests': discord_.requests,
+        '429s': discord_.rate_limited,
+        'db queries': db.pool.queries,
+        'peak tasks': peak_tasks,
+        'max loop lag (real ms)': round(loop.max_lag * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', type=int, default=10000)
+    parser.add_argument('--comics', type=int, default=100, help="Comics per brand")
+    parser.add_argument('--brands', nargs='+', default=['MARVEL', 'DC'])
+    parser.add_argument('--day', type=int, default=0, help="Weekday the feeds fire on (0 is Monday)")
+    parser.add_argument('--full', type=float, default=0.05, help="Share of feeds in the Full format")
+    parser.add_argument('--compact', type=float, default=0.15, help="Share of feeds in the Compact format")
+    parser.add_argument('--keyword-share', type=float, default=0.2, help="Share of feeds filtered by keywords")
+    parser.add_argument('--latency', type=float, default=150, help="Median Discord request latency (ms)")
+    parser.add_argument('--rate-limit-chance', type=float, default=0.0,
+                        help="Chance of any request getting a 429 regardless of limits")
+    parser.add_argument('--db-latency', type=float, default=2, help="Latency of each query (ms)")
+    parser.add_argument('--max-hours', type=float, default=24, help="Virtual hours to wait for every feed")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="Show the bot's own output")
+    args = parser.parse_args()
+
+    # Starts shortly before the feed day, so startup and scheduling run first
+    today = dt.datetime.now(dt.timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today + dt.timedelta(days=(args.day - today.weekday()) % 7 or 7) - dt.timedelta(minutes=10)
+    loop = VirtualClockLoop(start)
+    asyncio.set_event_loop(loop)
+
+    started = perf_counter()
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    with virtual_utcnow(loop):
+        with output:
+            task = loop.create_task(simulate(args, loop))
+            try:
+                loop.run_until_complete(task)
+            finally:
+                loop.run_until_complete(asyncio.sleep(0))
+        results = task.result()
+    loop.close()
+    _workdir.cleanup()
+
+    results['wall time (s)'] = round(perf_counter() - started, 1)
+    # Kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results['peak RSS (MiB)'] = round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    for name, value in results.items():
+        print(f"{name:<26} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+"""
+A virtual clock event loop, and stand-ins for Discord and Postgres, for running the bot's scheduling and delivery code
+offline at full scale.
+"""
+import asyncio
+import contextlib
+import datetime as dt
+import itertools
+import random
+import selectors
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+from discord import utils
+
+from funcs.database import PREPARED_QUERIES
+from funcs.dispatcher import RateLimitTracker
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Polls for I/O without blocking, and instead of waiting for the next timer, moves the loop's clock to it."""
+
+    def __init__(self, loop: 'VirtualClockLoop'):
+        super().__init__()
+        self.loop = loop
+        self.waited = 0.0
+
+    def select(self, timeout: Optional[float] = None):
+        started = perf_counter()
+        try:
+            if self.loop.executor_jobs:
+                # Work in a thread finishes in real time, so wait for it without moving the clock
+                return super().select(timeout)
+            events = super().select(0 if timeout is not None else None)
+            if not events and timeout:
+                self.loop.advance(timeout)
+            return events
+        finally:
+            self.waited += perf_counter() - started
+
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose clock only moves when every task is waiting on a timer, so hours of sleeps pass instantly.
+    Callbacks still take real time, which is measured: `max_lag` is the longest a single pass over ready callbacks
+    held the loop.
+    """
+
+    def __init__(self, start: dt.datetime):
+        self._selector_ = _VirtualSelector(self)
+        super().__init__(self._selector_)
+        self.epoch = start
+        self.now = 0.0
+        self.executor_jobs = 0
+        self.max_lag = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def utcnow(self) -> dt.datetime:
+        return self.epoch + dt.timedelta(seconds=self.now)
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_jobs += 1
+
+        def done(_):
+            self.executor_jobs -= 1
+        future.add_done_callback(done)
+        return future
+
+    def _run_once(self):
+        started, waited = perf_counter(), self._selector_.waited
+        super()._run_once()
+        self.max_lag = max(self.max_lag, perf_counter() - started - (self._selector_.waited - waited))
+
+
+@contextlib.contextmanager
+def virtual_utcnow(loop: VirtualClockLoop):
+    """Points `discord.utils.utcnow`, which the bot reads the time from, at the loop's clock."""
+    real = utils.utcnow
+    utils.utcnow = loop.utcnow
+    try:
+        yield
+    finally:
+        utils.utcnow = real
+
+
+class FakeDiscord:
+    """
+    Discord's REST API as far as feeds use it: every request takes a random latency, and requests over Discord's
+    limits (five per channel per five seconds, fifty per second globally) get a 429 and are retried after
+    `Retry-After`, as discord.py does. Responses are fed to the bot's `RateLimitTracker` just as real ones are.
+    """
+    CHANNEL_LIMIT, CHANNEL_WINDOW = 5, 5.0
+    GLOBAL_LIMIT = 50
+
+    def __init__(self, rate_limits: RateLimitTracker, latency: float = 0.15, jitter: float = 0.5,
+                 rate_limit_chance: float = 0.0, seed: int = 0):
+        self.rate_limits = rate_limits
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_chance = rate_limit_chance
+        self.rng = random.Random(seed)
+
+        self.requests = 0
+        self.rate_limited = 0
+        self._ids = itertools.count(1 << 40)
+        # Route path: (remaining, resets at)
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+        self._global_second, self._global_count = -1, 0
+
+    def snowflake(self) -> int:
+        return next(self._ids)
+
+    def _limited(self, bucket: str, now: float) -> Optional[Tuple[float, Dict[str, str]]]:
+        """Retry-After and headers of a 429 for a request now, or None if it goes through."""
+        second = int(now)
+        if second != self._global_second:
+            self._global_second, self._global_count = second, 0
+        if self._global_count >= self.GLOBAL_LIMIT:
+            retry_after = second + 1 - now
+            return retry_after, {'Retry-After': str(retry_after), 'X-RateLimit-Global': 'true'}
+
+        remaining, resets_at = self._buckets.get(bucket, (self.CHANNEL_LIMIT, now + self.CHANNEL_WINDOW))
+        if now >= resets_at:
+            remaining, resets_at = self.CHANNEL_LIMIT, now + self.CHANNEL_WINDOW
+        if remaining <= 0 or self.rng.random() < self.rate_limit_chance:
+            retry_after = max(resets_at - now, 0.1)
+            return retry_after, {'Retry-After': str(retry_after), 'X-RateLimit-Scope': 'user'}
+        self._buckets[bucket] = (remaining, resets_at)
+        return None
+
+    async def request(self, method: str, path: str, bucket: str):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.latency * self.rng.lognormvariate(0, self.jitter))
+            now = loop.time()
+
+            limited = self._limited(bucket, now)
+            if limited is not None:
+                retry_after, headers = limited
+                self.rate_limited += 1
+                self.rate_limits.observe(method, path, 429, headers)
+                await asyncio.sleep(retry_after)
+                continue
+
+            remaining, resets_at = self._buckets[bucket]
+            self._buckets[bucket] = (remaining - 1, resets_at)
+            self._global_count += 1
+            self.requests += 1
+            self.rate_limits.observe(method, path, 200, {
+                'X-RateLimit-Limit': str(self.CHANNEL_LIMIT),
+                'X-RateLimit-Remaining': str(remaining - 1),
+                'X-RateLimit-Reset-After': str(resets_at - now),
+            })
+            return
+
+
+class FakeMessage:
+    def __init__(self, discord_: FakeDiscord, channel: 'FakeChannel', id_: int = None, author_id: int = 0):
+        self.discord = discord_
+        self.channel = channel
+        self.guild = channel.guild
+        self.id = id_ or discord_.snowflake()
+        self.author = SimpleNamespace(id=author_id)
+
+    @property
+    def jump_url(self) -> str:
+        return f"https://discord.com/channels/{self.guild.id}/{self.channel.id}/{self.id}"
+
+    async def pin(self):
+        path = f"/api/v10/channels/{self.channel.id}/messages/pins/{self.id}"
+        await self.discord.request('PUT', path, f"/channels/{self.channel.id}/pins")
+
+    async def delete(self):
+        path = f"/api/v10/channels/{self.channel.id}/messages/{self.id}"
+        await self.discord.request('DELETE', path, f"/channels/{self.channel.id}/messages/delete")
+
+
+class FakeChannel:
+    def __init__(self, discord_: FakeDiscord, guild: 'FakeGuild', id_: int, bot_id: int):
+        self.discord = discord_
+        self.guild = guild
+        self.id = id_
+        self.bot_id = bot_id
+        self.name = f"comics-{id_}"
+
+    def permissions_for(self, _member) -> discord.Permissions:
+        return self.guild.permissions
+
+    async def send(self, content: str = None, **_kwargs) -> FakeMessage:
+        await self.discord.request('POST', f"/api/v10/channels/{self.id}/messages", f"/channels/{self.id}/messages")
+        return FakeMessage(self.discord, self, author_id=self.bot_id)
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return FakeMessage(self.discord, self, message_id, self.bot_id)
+
+    async def pins(self) -> List[FakeMessage]:
+        await self.discord.request('GET', f"/api/v10/channels/{self.id}/messages/pins", f"/channels/{self.id}/pins/get")
+        return []
+
+    async def history(self, limit: int = 100):
+        await self.discord.request('GET', f"/api/v10/channels/{self.id}/messages",
+                                   f"/channels/{self.id}/messages/get")
+        # The "pinned a message" notice
+        for _ in range(min(limit, 1)):
+            yield FakeMessage(self.discord, self)
+
+
+class FakeGuild:
+    def __init__(self, id_: int, member_count: int, bot_id: int):
+        self.id = id_
+        self.name = f"Server {id_}"
+        self.member_count = member_count
+        self.me = SimpleNamespace(id=bot_id)
+        self.channels: Dict[int, FakeChannel] = {}
+        # The bot's permissions in every channel
+        self.permissions = discord.Permissions(send_messages=True, embed_links=True, attach_files=True)
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self.channels.get(channel_id)
+
+
+class FakeRecord(dict):
+    """Rows are looked up by column name, as asyncpg Records are."""
+
+
+class FakeConnection:
+    """
+    Answers the queries feeds make: configurations and keywords come from the given rows, journal reads find
+    nothing, and writes succeed. Each query takes `latency` seconds.
+    """
+
+    def __init__(self, pool: 'FakePool'):
+        self.pool = pool
+
+    async def _query(self, query: str, *args) -> List[FakeRecord]:
+        await asyncio.sleep(self.pool.latency)
+        self.pool.queries += 1
+        if query.startswith('SELECT * FROM configuration'):
+            return self.pool.configurations
+        if query == PREPARED_QUERIES['keywords_by_server']:
+            return self.pool.keywords.get(args[0], [])
+        return []
+
+    async def fetch(self, query: str, *args, **_kwargs):
+        return await self._query(query, *args)
+
+    async def fetchrow(self, query: str, *args, **_kwargs):
+        rows = await self._query(query, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query: str, *args, **_kwargs):
+        row = await self.fetchrow(query, *args)
+        return next(iter(row.values())) if row else None
+
+    async def execute(self, query: str, *args, **_kwargs):
+        await self._query(query, *args)
+        return "OK"
+
+    async def executemany(self, query: str, *args, **_kwargs):
+        await self._query(query)
+
+    async def prepared(self, name: str):
+        connection, query = self, PREPARED_QUERIES[name]
+
+        class Statement:
+            async def fetch(self, *args):
+                return await connection._query(query, *args)
+
+            async def fetchrow(self, *args):
+                rows = await connection._query(query, *args)
+                return rows[0] if rows else None
+
+        return Statement()
+
+
+class FakePool:
+    """A connection pool of `size` connections, to wrap in the bot's `Database`."""
+
+    def __init__(self, size: int, latency: float, configurations: List[Dict[str, Any]],
+                 keywords: Dict[int, List[Dict[str, Any]]]):
+        self.size = size
+        self.latency = latency
+        self.configurations = [FakeRecord(r) for r in configurations]
+        self.keywords = {s: [FakeRecord(r) for r in rows] for s, rows in keywords.items()}
+        self.queries = 0
+        self._semaphore = asyncio.Semaphore(size)
+        self._in_use = 0
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        async with self._semaphore:
+            self._in_use += 1
+            try:
+                yield FakeConnection(self)
+            finally:
+                self._in_use -= 1
+
+    def get_size(self) -> int:
+        return self.size
+
+    def get_idle_size(self) -> int:
+        return self.size - self._in_use
+
+    async def close(self):
+        pass
@@ -0,0 +1,96 @@
+"""
+Synthetic catalogs and keywords, shaped like League of Comic Geeks data, for benchmarks and simulations that run
+without network access.
+"""
+import datetime as dt
+import random
+from typing import Any, Dict, List
+
+from comic_types.brand import Brand
+from comic_types.locg import ComicDetails
+from funcs.utils import from_dict
+from objects.comic import Comic
+from objects.keywords import Keywords
+
+WORDS = ["Spider", "Man", "Avengers", "X-Men", "Batman", "Superman", "Wonder", "Woman", "Justice", "League",
+         "Black", "Panther", "Daredevil", "Venom", "Hulk", "Thor", "Captain", "America", "Flash", "Green", "Lantern",
+         "Nightwing", "Fantastic", "Four", "Ultimate", "Absolute", "Legacy", "Saga", "Annual", "Special", "War",
+         "Secret", "Origins"]
+NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Rowan", "Sky",
+         "Robin", "Drew", "Emery", "Harper", "Kai", "Logan", "Parker", "Reese", "Sage", "Blake", "Cameron", "Dana"]
+ROLES = ["Writer", "Artist", "Penciller", "Inker", "Colorist", "Letterer", "Editor", "Cover Artist", "Writer, Artist"]
+FORMATS = ["Comic"] * 8 + ["Trade Paperback", "Hardcover"]
+
+
+def _title(rng: random.Random) -> str:
+    return ' '.join(rng.sample(WORDS, rng.randint(2, 4))) + f" #{rng.randint(1, 120)}"
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(NAMES)} {rng.choice(NAMES)}son"
+
+
+def synthetic_details(count: int, brand: Brand, seed: int = 0) -> List[Dict[str, Any]]:
+    """Raw comic details as the API returns them, releasing over the week starting on the next Wednesday."""
+    rng = random.Random(seed)
+    today = dt.date.today()
+    release = today + dt.timedelta(days=(2 - today.weekday()) % 7)
+
+    details = []
+    for n in range(count):
+        cid = seed * 1_000_000 + n + 1
+        creators = [{'name': _person(rng), 'role': rng.choice(ROLES), 'url': f"https://example.com/people/{cid}-{i}",
+                     'type': 'creator'} for i in range(rng.randint(2, 12))]
+        characters = [{'name': rng.choice(WORDS), 'url': f"https://example.com/characters/{cid}-{i}"}
+                      for i in range(rng.randint(0, 6))]
+        variants = [{'id': cid * 100 + i, 'title': f"Variant {i}", 'coverImage': f"https://example.com/v/{cid}-{i}.jpg",
+                     'url': f"https://example.com/comics/{cid}/{i}", 'category': 'Variant'}
+                    for i in range(rng.randint(0, 4))]
+        details.append({
+            'id': cid,
+            'title': _title(rng),
+            'issueNumber': str(rng.randint(1, 120)),
+            'publisher': brand.locg_publisher,
+            'description': ' '.join(rng.choices(WORDS + NAMES, k=rng.randint(20, 80))) + '.',
+            'coverDate': release.isoformat(),
+            'releaseDate': release,
+            'pages': rng.randint(20, 200),
+            'price': rng.choice([3.99, 4.99, 5.99, 17.99, 24.99, 49.99]),
+            'format': rng.choice(FORMATS),
+            'upc': str(rng.randrange(10 ** 16)),
+            'isbn': None,
+            'distributorSku': f"SKU{cid}",
+            'finalOrderCutoff': release.isoformat(),
+            'coverImage': f"https://example.com/covers/{cid}.jpg",
+            'url': f"https://example.com/comics/{cid}",
+            'rating': rng.random() * 5,
+            'ratingCount': rng.randint(0, 500),
+            'ratingText': "Good",
+            'pulls': rng.randint(0, 5000),
+            'collected': rng.randint(0, 5000),
+            'read': rng.randint(0, 5000),
+            'wanted': rng.randint(0, 5000),
+            'seriesUrl': f"https://example.com/series/{cid % 400}",
+            'creators': creators,
+            'characters': characters,
+            'variants': variants,
+            'stories': [],
+        })
+    return details
+
+
+def to_comic(detail: Dict[str, Any]) -> Comic:
+    """Converts raw details the way the comic releases service does."""
+    return Comic(**from_dict(ComicDetails, detail).__dict__)
+
+
+def synthetic_catalog(count: int, brand: Brand, seed: int = 0) -> Dict[int, Comic]:
+    return {c.id: c for c in map(to_comic, synthetic_details(count, brand, seed))}
+
+
+def synthetic_keywords(count: int, server_id: int = 0, seed: int = 0) -> Keywords:
+    """A server's keywords, split evenly between title keywords and creators."""
+    rng = random.Random(seed)
+    keys = [rng.choice(WORDS) + rng.choice(['', ' ', 's']) for _ in range(count // 2)]
+    creators = [_person(rng) for _ in range(count - count // 2)]
+    return Keywords(server_id, keys, creators)
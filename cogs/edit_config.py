@@ -5,7 +5,6 @@ from discord.app_commands import checks
 from discord.ext import commands
 
 from funcs.discord_functions import cmd_ping
-from funcs.postgresql import fetch_configs
 from objects.brand import BrandAutocomplete, Brands
 from objects.configuration import format_autocomplete, WEEKDAYS, Format
 
@@ -25,7 +24,7 @@ class EditConfigCog(commands.Cog, name="Edit Configuration"):
         """Displays all configurations set in this server."""
         await interaction.response.defer()
 
-        configs = await fetch_configs(self.bot.db, interaction.guild_id)
+        configs = self.bot.configs.for_server(interaction.guild_id)
 
         if not configs:
             return await interaction.followup.send(
@@ -149,7 +148,7 @@ class EditConfigCog(commands.Cog, name="Edit Configuration"):
     async def edit_config(self, interaction: Interaction, brand: str, attributes: Dict[str, Any]):
         b = self.brands[brand] if brand else None
 
-        configs = await fetch_configs(self.bot.db, interaction.guild_id)
+        configs = self.bot.configs.for_server(interaction.guild_id)
         if not configs:
             await interaction.followup.send(
                 "You have not set up any feeds yet in this server! Use /setup to set one up!")
@@ -159,14 +158,13 @@ class EditConfigCog(commands.Cog, name="Edit Configuration"):
             await interaction.followup.send(f"You have not set up a `{b.name}` feed yet in this server!")
             return None
 
+        pulls = self.bot.get_cog("Pulls")
         for c in filtered:
-            for a, v in attributes.items():
-                c.__setattr__(a, v)
-            await c.edit_sql(self.bot.db)
+            await self.bot.configs.update(c, **attributes)
 
-            if "day" in attributes:
-                self.cancel_feed(c)
-                self.schedule_feed(c)
+            # Replace the scheduled entry so the feed fires with the edited configuration
+            if pulls:
+                pulls.schedule_feed(c)
 
         return [f"Edited configuration(s): {', '.join(f'`{c.brand.name}`' for c in filtered)}"]
 
@@ -179,15 +177,17 @@ class EditConfigCog(commands.Cog, name="Edit Configuration"):
         await interaction.response.defer()
 
         b = self.brands[brand]
-        configs = await fetch_configs(self.bot.db, interaction.guild_id)
+        configs = self.bot.configs.for_server(interaction.guild_id)
 
         if b.id not in configs:
             return await interaction.followup.send("You have not set up a feed for this brand in this server.")
         c = configs[b.id]
 
-        await c.delete_from_sql(self.bot.db)
+        await self.bot.configs.delete(c)
 
-        self.cancel_feed(c)
+        pulls = self.bot.get_cog("Pulls")
+        if pulls:
+            pulls.cancel_feed(c)
 
         return await interaction.followup.send("**DELETED** the following feed:", embed=c.to_embed())
 
@@ -3,8 +3,7 @@ from discord.app_commands import checks
 from discord.ext import commands
 
 from funcs.discord_functions import cmd_ping
-from objects.brand import Marvel
-from objects.configuration import config_from_record
+from objects.brand import MARVEL, Brands
 from objects.keywords import fetch_keywords, Types, sanitise, add_keyword, delete_keyword
 
 
@@ -24,11 +23,9 @@ class KeywordsCog(commands.Cog, name="Keywords"):
 
         kw = await fetch_keywords(self.bot.db, interaction.guild_id)
 
-        cons = await self.bot.db.fetch('SELECT * FROM configuration WHERE server = $1 AND check_key = $2',
-                                       interaction.guild_id, True)
-        configs = [config_from_record(c) for c in cons]
+        configs = [c for c in self.bot.configs.for_server(interaction.guild_id).values() if c.check_keywords]
 
-        e = Embed(title="Keywords", colour=Marvel().color)
+        e = Embed(title="Keywords", colour=Brands()[MARVEL].color)
 
         e.add_field(name="Keys (Title & Description)",
                     value=', '.join(f'`{i}`' for i in kw.keys) if kw.keys else "None")
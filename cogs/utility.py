@@ -1,18 +1,22 @@
+import asyncio
 import copy
 import random
+import traceback
+from typing import Dict, List, Optional, Tuple
 
-from discord import app_commands, Interaction, TextStyle, Forbidden, Embed, utils
+from discord import app_commands, Interaction, TextStyle, Forbidden, HTTPException, Embed, utils
 from discord.ext import commands
 from discord.ui import TextInput, Modal
 
 from comic_types.locg import Creator
-from config import ADMIN_GUILD_IDS
+from config import ADMIN_GUILD_IDS, BROADCAST_CONCURRENCY, BROADCAST_PROGRESS_INTERVAL, BROADCAST_POLL_INTERVAL
 from funcs.discord_functions import cmd_ping
 from funcs.pull_functions import summary_embed
 from funcs.utils import is_owner
-from objects.brand import Marvel, BrandEnum, Brands
+from objects.brand import MARVEL, Brands
+from objects.broadcast import Broadcast, DeliveryStatus, create_broadcast, set_progress_message, \
+    fetch_running_broadcasts, fetch_pending_channels, record_deliveries, count_deliveries, finish_broadcast
 from objects.comic import Comic
-from objects.configuration import config_from_record
 
 
 class UtilityCog(commands.Cog, name="Utility"):
@@ -23,12 +27,152 @@ class UtilityCog(commands.Cog, name="Utility"):
 
         self.brands = Brands()
 
+        self.broadcasts: Dict[int, asyncio.Task] = {}
+        self.poller = self.bot.loop.create_task(self.resume_broadcasts())
+
+    async def cog_unload(self):
+        # Progress is saved, so the broadcasts resume when the cog is loaded again
+        self.poller.cancel()
+        for task in self.broadcasts.values():
+            task.cancel()
+
+    async def resume_broadcasts(self):
+        """
+        Starts this process's share of every running broadcast: the ones left over from before a restart, and the ones
+        queued from other processes since, which are picked up on the next poll.
+        """
+        await self.bot.startup.wait('db', 'gateway')
+        while True:
+            try:
+                for broadcast in await fetch_running_broadcasts(self.bot.db):
+                    if broadcast.id not in self.broadcasts:
+                        print(f"[Broadcast] Starting this process's share of broadcast #{broadcast.id}")
+                    self.start_broadcast(broadcast)
+            except Exception:
+                traceback.print_exc()
+            await asyncio.sleep(BROADCAST_POLL_INTERVAL)
+
+    def start_broadcast(self, broadcast: Broadcast):
+        task = self.broadcasts.get(broadcast.id)
+        if task is None or task.done():
+            self.broadcasts[broadcast.id] = self.bot.loop.create_task(self.run_broadcast(broadcast))
+
+    def broadcast_embed(self, broadcast: Broadcast) -> Embed:
+        embed = Embed(
+            title=broadcast.title,
+            description=broadcast.message,
+            color=self.brands[MARVEL].color,
+            timestamp=utils.utcnow()
+        )
+        embed.set_footer(text=f"Broadcast from {self.bot.user.display_name}",
+                         icon_url=self.bot.user.display_avatar.url)
+        return embed
+
+    async def run_broadcast(self, broadcast: Broadcast):
+        """
+        Sends a broadcast to every channel still pending, several at a time through the delivery dispatcher, saving
+        each channel's outcome in batches and editing the progress message as it goes.
+        """
+        db = self.bot.db
+        embed = self.broadcast_embed(broadcast)
+        pending = [c for c, server in (await fetch_pending_channels(db, broadcast.id)).items() if self.owns(server)]
+        counts = await count_deliveries(db, broadcast.id)
+        started = self.bot.loop.time()
+        if not pending:
+            # This process's share is already sent, and the other processes are still on theirs
+            return
+
+        results: List[Tuple[int, DeliveryStatus, Optional[str]]] = []
+        # Leaves dispatcher workers free for feeds going out at the same time
+        semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+        finished = asyncio.Event()
+
+        async def deliver(channel_id: int):
+            async with semaphore:
+                channel = self.bot.get_channel(channel_id)
+                status, error = DeliveryStatus.FAILED, None
+                if channel is None:
+                    error = "Channel not found"
+                else:
+                    try:
+                        await self.bot.delivery.send(channel, embed=embed)
+                        status = DeliveryStatus.SENT
+                    except Forbidden:
+                        error = "Missing permissions"
+                    except HTTPException as e:
+                        error = f"{e.status} {e.text}"
+                    except Exception as e:
+                        error = repr(e)
+            results.append((channel_id, status, error))
+            counts[DeliveryStatus.PENDING] -= 1
+            counts[status] += 1
+
+        async def flush():
+            nonlocal results
+            batch, results = results, []
+            if batch:
+                await record_deliveries(db, broadcast.id, batch)
+
+        async def report():
+            while not finished.is_set():
+                try:
+                    await asyncio.wait_for(finished.wait(), BROADCAST_PROGRESS_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await flush()
+                    await self.update_progress(broadcast, counts, self.bot.loop.time() - started,
+                                               counts[DeliveryStatus.PENDING] == 0)
+                except Exception:
+                    traceback.print_exc()
+
+        print(f"[Broadcast] #{broadcast.id}: sending to {len(pending)} channels")
+        reporter = self.bot.loop.create_task(report())
+        try:
+            await asyncio.gather(*(deliver(c) for c in pending))
+        finally:
+            # The reporter saves whatever is left before it stops
+            finished.set()
+            await reporter
+
+        # Other processes send to their own shards' channels, and whichever finishes last finishes the broadcast
+        counts = await count_deliveries(db, broadcast.id)
+        if counts[DeliveryStatus.PENDING] == 0:
+            await finish_broadcast(db, broadcast)
+        print(f"[Broadcast] #{broadcast.id}: {counts[DeliveryStatus.SENT]} sent, "
+              f"{counts[DeliveryStatus.FAILED]} failed, {counts[DeliveryStatus.PENDING]} pending on other shards, "
+              f"in {self.bot.loop.time() - started:.1f}s")
+
+    def owns(self, server_id: Optional[int]) -> bool:
+        """Whether this process sends to a server's channels. Deliveries without a server are the crawl leader's."""
+        if server_id is None:
+            return self.bot.shard_plan.crawl_leader
+        return self.bot.shard_plan.owns(server_id)
+
+    async def update_progress(self, broadcast: Broadcast, counts: Dict[DeliveryStatus, int], elapsed: float,
+                              done: bool = False):
+        if broadcast.progress_message is None:
+            return
+        channel = self.bot.get_channel(broadcast.progress_channel)
+        if channel is None:
+            return
+
+        total = sum(counts.values())
+        content = f"**Broadcast #{broadcast.id}** {'finished' if done else 'sending'} · " \
+                  f"{counts[DeliveryStatus.SENT]} sent, {counts[DeliveryStatus.FAILED]} failed, " \
+                  f"{counts[DeliveryStatus.PENDING]} pending, of {total} channels · {elapsed:.0f}s"
+        try:
+            await channel.get_partial_message(broadcast.progress_message).edit(content=content)
+        except HTTPException:
+            pass
 
     @app_commands.command(name="broadcast")
     @app_commands.guilds(*ADMIN_GUILD_IDS or None)
     @app_commands.check(is_owner)
     async def broadcast(self, interaction: Interaction):
         """Opens a modal to broadcast a message to all servers."""
+        cog = self
+
         class BroadcastModal(Modal, title="Broadcast Message"):
             header = TextInput(label="Header", required=False, max_length=256)
             message = TextInput(label="Message", style=TextStyle.paragraph, max_length=2000)
@@ -36,32 +180,18 @@ class UtilityCog(commands.Cog, name="Utility"):
             async def on_submit(self, modal_interaction: Interaction):
                 await modal_interaction.response.defer()
 
-                embed = Embed(
-                    title=self.header.value or None,
-                    description=self.message.value,
-                    color=Marvel().color,
-                    timestamp=utils.utcnow()
-                )
-                bot = modal_interaction.client
-                embed.set_footer(text=f"Broadcast from {bot.user.display_name}", icon_url=bot.user.display_avatar.url)
-
-                con = await bot.db.fetch('SELECT * FROM configuration')
-                configurations = [config_from_record(c) for c in con]
-                channels = set(c.channel_id for c in configurations)
-
-                n = 0
-                for channel_id in channels:
-                    channel = bot.get_channel(channel_id)
-                    if channel is None:
-                        continue
-                    try:
-                        await channel.send(embed=embed)
-                        n += 1
-                    except Forbidden:
-                        print(f"Missing permissions in {channel.guild.name} ({channel.guild.id})")
+                # Every process sends to its own shards' channels, picking the broadcast up on its next poll
+                bot = cog.bot
+                channels = {config.channel_id: config.server_id for config in bot.configs.all()}
 
+                broadcast = await create_broadcast(bot.db, self.header.value or None, self.message.value,
+                                                   modal_interaction.user.id, channels)
                 await modal_interaction.followup.send(
-                    f"Broadcasted message to {n} channels (of {len(configurations)} configured channels).")
+                    f"Queued broadcast #{broadcast.id} to {len(channels)} channels.")
+
+                progress = await modal_interaction.channel.send(f"**Broadcast #{broadcast.id}** starting…")
+                await set_progress_message(bot.db, broadcast, progress.channel.id, progress.id)
+                cog.start_broadcast(broadcast)
 
         await interaction.response.send_modal(BroadcastModal())
 
@@ -69,7 +199,7 @@ class UtilityCog(commands.Cog, name="Utility"):
     @app_commands.command(name="about")
     async def about(self, interaction: Interaction):
         """Information about this bot."""
-        embed = Embed(title="About", color=Marvel().color)
+        embed = Embed(title="About", color=Brands()[MARVEL].color)
         embed.description = \
             "This bot was developed by **Rocked03#3304**. Originally created for the *Marvel Discord* " \
             "(https://discord.gg/Marvel), this bot was later expanded for public use with *Marvel* and *DC* feeds " \
@@ -84,7 +214,7 @@ class UtilityCog(commands.Cog, name="Utility"):
     @app_commands.command(name="invite")
     async def invite(self, interaction: Interaction):
         """Invite this bot to your own server."""
-        embed = Embed(title="Invite me!", color=Marvel().color)
+        embed = Embed(title="Invite me!", color=Brands()[MARVEL].color)
         embed.description = \
             "**Add this bot** to your own server: " \
             f"https://discordapp.com/oauth2/authorize?client_id={self.bot.user.id}&scope=bot&permissions={'18432'}"
@@ -100,7 +230,7 @@ class UtilityCog(commands.Cog, name="Utility"):
 
         embeds = []
 
-        comics = list(self.bot.comics[Marvel().id].values())
+        comics = list(self.bot.comics[MARVEL].values())
         samples = random.sample(comics, len(comics) if 4 > len(comics) else 4)
 
         meddle: Comic = copy.copy(random.choice(samples))
@@ -123,7 +253,7 @@ class UtilityCog(commands.Cog, name="Utility"):
                              "Also followed by the 'Summary' embed."
         embeds.append(meddle.to_embed(False))
 
-        summaries = await summary_embed(self.bot.order, {i.id: i for i in samples}, self.brands.Marvel)
+        summaries = await summary_embed(self.bot.order, {i.id: i for i in samples}, self.brands[MARVEL])
         summ = summaries[0]
         summ.title = "Summary Format"
         summ.insert_field_at(0, name="This displays all comics",
@@ -135,6 +265,11 @@ class UtilityCog(commands.Cog, name="Utility"):
                              "the real one often has around two dozen items.")
         embeds.append(summ)
 
+        collage = Embed(title="Collage Format", color=self.brands[MARVEL].color)
+        collage.description = "The 'Collage' Format posts the week's covers as one or a few grid images, instead of " \
+                              "an embed per comic, attached to the 'Summary' embed."
+        embeds.append(collage)
+
         await interaction.followup.send(embeds=embeds)
 
 
@@ -3,11 +3,15 @@ from dataclasses import dataclass
 from discord.app_commands import Choice
 
 
-@dataclass
+@dataclass(frozen=True)
 class Brand:
     id: str
     name: str
     color: int
     default_day: int
-    autocomplete_choice: Choice
     locg_id: int
+    locg_publisher: str
+
+    @property
+    def autocomplete_choice(self) -> Choice:
+        return Choice(name=self.name, value=self.id)
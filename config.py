@@ -1,3 +1,4 @@
+import datetime as dt
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -16,5 +17,74 @@ postgres_credentials = {
     "host": os.getenv('POSTGRES_HOST')
 }
 
+POSTGRES_POOL_MIN_SIZE = int(os.getenv('POSTGRES_POOL_MIN_SIZE', 10))
+POSTGRES_POOL_MAX_SIZE = int(os.getenv('POSTGRES_POOL_MAX_SIZE', 10))
+POSTGRES_STATEMENT_CACHE_SIZE = int(os.getenv('POSTGRES_STATEMENT_CACHE_SIZE', 100))
+POSTGRES_COMMAND_TIMEOUT = float(os.getenv('POSTGRES_COMMAND_TIMEOUT', 60))
+
 ADMIN_GUILD_IDS = [int(x) for x in os.getenv('ADMIN_GUILD_IDS', '').split(',') if x]
 ADMIN_USER_IDS = [int(x) for x in os.getenv('ADMIN_USER_IDS', '').split(',') if x]
+
+# Delivery dispatcher. GLOBAL_RATE_LIMIT is the bot's whole budget; the launcher splits it between its processes.
+DISPATCH_WORKERS = int(os.getenv('DISPATCH_WORKERS', 8))
+GLOBAL_RATE_LIMIT = float(os.getenv('GLOBAL_RATE_LIMIT', 50))
+
+# Catching up on feeds missed while offline
+CATCHUP_WINDOW_HOURS = float(os.getenv('CATCHUP_WINDOW_HOURS', 12))
+CATCHUP_BATCH_SIZE = int(os.getenv('CATCHUP_BATCH_SIZE', 25))
+CATCHUP_BATCH_INTERVAL = float(os.getenv('CATCHUP_BATCH_INTERVAL', 5))
+
+# Sharding across processes. Leave SHARD_IDS empty to run every shard in one process.
+SHARD_COUNT = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+SHARD_IDS = [int(x) for x in os.getenv('SHARD_IDS', '').split(',') if x] or None
+CRAWL_LEADER = os.getenv('CRAWL_LEADER', '').lower() in ['1', 'true', 'yes'] if os.getenv('CRAWL_LEADER') else None
+CATALOG_POLL_INTERVAL = float(os.getenv('CATALOG_POLL_INTERVAL', 60))
+PROCESS_COUNT = int(os.getenv('PROCESS_COUNT', 1))
+
+# Catalog snapshot, loaded at startup and shared with the other shard processes
+CATALOG_SNAPSHOT_PATH = Path(os.getenv('CATALOG_SNAPSHOT_PATH') or Path(__file__).parent / 'catalog.snapshot')
+
+# Catalog freshness
+CRAWL_MAX_AGE = dt.timedelta(hours=float(os.getenv('CRAWL_MAX_AGE_HOURS', 12)))
+FEED_FRESHNESS = dt.timedelta(minutes=float(os.getenv('FEED_FRESHNESS_MINUTES', 60)))
+CRAWL_LEAD = dt.timedelta(minutes=float(os.getenv('CRAWL_LEAD_MINUTES', 15)))
+
+# How long before each day's feed batch its offsets are recalculated from the latest delivery stats
+FEED_REPLAN_LEAD = dt.timedelta(minutes=float(os.getenv('FEED_REPLAN_LEAD_MINUTES', 10)))
+
+# Configs validated per batch when scheduling feeds at startup
+VALIDATION_BATCH_SIZE = int(os.getenv('VALIDATION_BATCH_SIZE', 1000))
+
+# Configurations of servers the bot has left are deleted after the grace period, checked every interval
+GUILD_GRACE_PERIOD = dt.timedelta(hours=float(os.getenv('GUILD_GRACE_HOURS', 72)))
+GUILD_RECONCILE_INTERVAL = dt.timedelta(hours=float(os.getenv('GUILD_RECONCILE_INTERVAL_HOURS', 6)))
+
+# Processes compositing images, such as the avatar
+COMPOSITOR_PROCESSES = int(os.getenv('COMPOSITOR_PROCESSES', 1))
+
+# Resized cover images kept on disk
+IMAGE_CACHE_PATH = Path(os.getenv('IMAGE_CACHE_PATH') or Path(__file__).parent / 'image_cache')
+IMAGE_CACHE_MAX_BYTES = int(float(os.getenv('IMAGE_CACHE_MAX_MB', 256)) * 1024 * 1024)
+
+# Collages: rendered sets of comics kept per brand, and covers downloaded at once while rendering
+COLLAGE_RENDERS_PER_BRAND = int(os.getenv('COLLAGE_RENDERS_PER_BRAND', 32))
+COLLAGE_DOWNLOAD_CONCURRENCY = int(os.getenv('COLLAGE_DOWNLOAD_CONCURRENCY', 8))
+
+# Broadcasts: channels sent to at once, seconds between progress updates, and seconds between checks for broadcasts
+# queued from other processes
+BROADCAST_CONCURRENCY = int(os.getenv('BROADCAST_CONCURRENCY', 4))
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv('BROADCAST_PROGRESS_INTERVAL', 5))
+BROADCAST_POLL_INTERVAL = float(os.getenv('BROADCAST_POLL_INTERVAL', 30))
+
+# Prometheus metrics, served at /metrics. Leave METRICS_PORT empty to not serve them; the launcher gives each process
+# its own port, counting up from METRICS_PORT.
+METRICS_HOST = os.getenv('METRICS_HOST') or '127.0.0.1'
+METRICS_PORT = int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None
+
+# Tracing of feed deliveries: the share of feeds traced, and the file their spans are appended to as JSON lines
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0))
+TRACE_PATH = Path(os.getenv('TRACE_PATH') or Path(__file__).parent / 'traces.jsonl')
+
+# On-demand profiling: milliseconds between stack samples, and frames kept per allocation traced by tracemalloc
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL_MS', 10)) / 1000
+PROFILE_MEMORY_FRAMES = int(os.getenv('PROFILE_MEMORY_FRAMES', 1))
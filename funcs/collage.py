@@ -0,0 +1,67 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Tuple
+
+from config import COLLAGE_RENDERS_PER_BRAND, COLLAGE_DOWNLOAD_CONCURRENCY
+from funcs.image_cache import ImageCache
+from funcs.profile import load_images, composite, collage_to_bytes
+from objects.comic import Comic
+
+# Each sheet is a grid of COLUMNS by ROWS covers; a message takes at most ten attachments
+COLUMNS = 5
+ROWS = 4
+TILE_WIDTH = 240
+GAP = 12
+MAX_SHEETS = 10
+
+
+class CollageRenderer:
+    """
+    Renders a week's covers into a few JPEG grids, once per brand per catalog version. Every feed of that brand
+    reuses the result, and feeds firing together wait on the same render.
+
+    Only the `max_renders` most recently used sets of comics are kept per brand, and covers not in the image cache are
+    downloaded at most `downloads` at a time across every render.
+    """
+
+    def __init__(self, cache: ImageCache, max_renders: int = COLLAGE_RENDERS_PER_BRAND,
+                 downloads: int = COLLAGE_DOWNLOAD_CONCURRENCY):
+        self.cache = cache
+        self.max_renders = max_renders
+        self._downloads = asyncio.Semaphore(downloads)
+        self._renders: Dict[str, Tuple[Hashable, OrderedDict[Tuple[int, ...], asyncio.Task]]] = {}
+
+    async def render(self, brand_id: str, version: Hashable, comics: List[Comic]) -> List[bytes]:
+        """
+        JPEG sheets of `comics`' covers, in order. Renders are kept per set of comics, so feeds filtered by keywords
+        share them too, until the brand's catalog `version` changes.
+        """
+        comics = comics[:COLUMNS * ROWS * MAX_SHEETS]
+        key = tuple(c.id for c in comics)
+
+        cached_version, renders = self._renders.get(brand_id, (None, OrderedDict()))
+        if cached_version != version:
+            renders = OrderedDict()
+            self._renders[brand_id] = (version, renders)
+
+        task = renders.get(key)
+        if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+            task = renders[key] = asyncio.get_running_loop().create_task(self._render(comics))
+            # Feeds already waiting on an evicted render still get it; later ones render it again
+            while len(renders) > self.max_renders:
+                renders.popitem(last=False)
+        renders.move_to_end(key)
+        # Shielded, so one feed being cancelled doesn't cancel the render the others are waiting on
+        return await asyncio.shield(task)
+
+    async def _render(self, comics: List[Comic]) -> List[bytes]:
+        urls = [c.coverImage for c in comics if c.coverImage and c.coverImage.startswith("http")]
+        loaded = await load_images(urls, min_side=TILE_WIDTH, cache=self.cache, return_exceptions=True,
+                                   downloads=self._downloads)
+        failed = sum(isinstance(i, Exception) for i in loaded)
+        if failed:
+            print(f"[Collage] {failed}/{len(loaded)} covers failed to load, leaving their tiles blank")
+
+        by_url = {url: None if isinstance(im, Exception) else im for url, im in zip(urls, loaded)}
+        images = [by_url.get(c.coverImage) for c in comics]
+        return await composite(collage_to_bytes, images, COLUMNS, ROWS, TILE_WIDTH, GAP, (255, 255, 255), 12)
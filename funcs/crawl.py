@@ -0,0 +1,89 @@
+import asyncio
+import datetime as dt
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from discord import utils
+
+
+class CrawlCoordinator:
+    """
+    Tracks how fresh each brand's catalog is, and makes sure only one crawl runs at a time.
+
+    `crawl` is called with the brand ids to refresh and returns the ids it crawled successfully, which are marked
+    fetched as of when the crawl started. A `crawl` that loads data fetched elsewhere should return nothing and set
+    `fetched_at` itself. Requests that arrive while a crawl covering their brands is in flight wait for that crawl
+    rather than starting another.
+    """
+
+    def __init__(self, crawl: Callable[[Set[str]], Awaitable[Iterable[str]]], *,
+                 retry_after: dt.timedelta = dt.timedelta(minutes=5)):
+        self._crawl = crawl
+        self.retry_after = retry_after
+
+        self.fetched_at: Dict[str, dt.datetime] = {}
+        self.attempted_at: Dict[str, dt.datetime] = {}
+
+        self._inflight: Optional[asyncio.Task] = None
+        self._inflight_brands: Set[str] = set()
+
+    def age(self, brand_id: str, at: dt.datetime = None) -> Optional[dt.timedelta]:
+        if brand_id not in self.fetched_at:
+            return None
+        return (at or utils.utcnow()) - self.fetched_at[brand_id]
+
+    def is_fresh(self, brand_id: str, max_age: dt.timedelta, at: dt.datetime = None) -> bool:
+        age = self.age(brand_id, at)
+        return age is not None and age <= max_age
+
+    def stale(self, brand_ids: Iterable[str], max_age: dt.timedelta, at: dt.datetime = None) -> Set[str]:
+        return {b for b in brand_ids if not self.is_fresh(b, max_age, at)}
+
+    def mark_fetched(self, brand_ids: Iterable[str], at: dt.datetime = None):
+        at = at or utils.utcnow()
+        for b in brand_ids:
+            self.fetched_at[b] = at
+
+    @property
+    def crawling(self) -> bool:
+        return self._inflight is not None and not self._inflight.done()
+
+    async def ensure_fresh(self, brand_ids: Iterable[str], max_age: dt.timedelta, at: dt.datetime = None):
+        """
+        Crawls any of `brand_ids` that will be older than `max_age` at `at` (now by default), unless they were
+        attempted too recently.
+        """
+        now = utils.utcnow()
+        stale = {b for b in self.stale(brand_ids, max_age, at)
+                 if b not in self.attempted_at or now - self.attempted_at[b] >= self.retry_after}
+        if stale:
+            await self.crawl(stale)
+
+    async def crawl(self, brand_ids: Iterable[str]):
+        brand_ids = set(brand_ids)
+        while brand_ids:
+            if self.crawling:
+                covered = self._inflight_brands
+                await self._wait(self._inflight)
+                brand_ids -= covered
+                continue
+
+            self._inflight_brands = brand_ids
+            self._inflight = asyncio.get_event_loop().create_task(self._run(brand_ids))
+            await self._wait(self._inflight)
+            return
+
+    @staticmethod
+    async def _wait(task: asyncio.Task):
+        # Shielded, so a cancelled caller doesn't cancel a crawl other callers are waiting on
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done():
+                raise
+
+    async def _run(self, brand_ids: Set[str]):
+        started = utils.utcnow()
+        for b in brand_ids:
+            self.attempted_at[b] = started
+        fetched = await self._crawl(brand_ids)
+        self.mark_fetched(fetched, started)
@@ -0,0 +1,138 @@
+import bisect
+import contextlib
+from time import perf_counter
+from typing import Dict, List
+
+import asyncpg
+
+# Hot queries, prepared under fixed names on every pooled connection
+PREPARED_QUERIES = {
+    'configuration_by_servers': 'SELECT * FROM configuration WHERE server = ANY($1)',
+    'configuration_by_servers_brand': 'SELECT * FROM configuration WHERE server = ANY($1) AND brand = $2',
+    'keywords_by_server': 'SELECT * FROM keywords WHERE server = $1',
+    'journal_entry': 'SELECT * FROM delivery_journal WHERE server = $1 AND brand = $2 AND week = $3',
+    'journal_progress': 'UPDATE delivery_journal SET last_comic = $4, updated_at = now() '
+                        'WHERE server = $1 AND brand = $2 AND week = $3',
+    'archive_week': "SELECT c.*, string_agg(cr.name, ', ') FILTER (WHERE cr.role LIKE '%Writer%') AS writer "
+                    'FROM archive_comic c LEFT JOIN archive_creator cr USING (week, brand, comic) '
+                    'WHERE c.week BETWEEN $1::DATE - 3 AND $1::DATE + 3 AND c.brand = $2 '
+                    'GROUP BY c.week, c.brand, c.comic ORDER BY c.position',
+    'archive_series_releases': 'SELECT DISTINCT ON (release_date) * FROM archive_comic WHERE series_url = $1 '
+                               'ORDER BY release_date DESC, week DESC LIMIT $2',
+}
+
+# Upper bounds (ms) of the latency histogram buckets
+BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf')]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(BUCKETS, ms)] += 1
+        self.total += ms
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket containing the q-th quantile."""
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if n and seen >= target:
+                return bound
+        return 0.0
+
+
+class QueryStats:
+    def __init__(self):
+        self.queries: Dict[str, Histogram] = {}
+        self.pool_wait = Histogram()
+
+    def observe(self, label: str, ms: float):
+        if label not in self.queries:
+            self.queries[label] = Histogram()
+        self.queries[label].observe(ms)
+
+    def slowest(self, n: int = 10) -> List[tuple]:
+        return sorted(self.queries.items(), key=lambda x: x[1].total, reverse=True)[:n]
+
+
+class PreparedConnection(asyncpg.Connection):
+    """Connection that keeps `PREPARED_QUERIES` prepared under fixed names, once per connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._named_statements = {}
+
+    async def prepared(self, name: str):
+        if name not in self._named_statements:
+            self._named_statements[name] = await self.prepare(PREPARED_QUERIES[name], name=f"zelma_{name}")
+        return self._named_statements[name]
+
+
+class Database:
+    """Wraps the connection pool, recording how long each query and each wait for a connection takes."""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+        self.stats = QueryStats()
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        started = perf_counter()
+        async with self.pool.acquire() as conn:
+            self.stats.pool_wait.observe((perf_counter() - started) * 1000)
+            yield conn
+
+    async def _run(self, label: str, method: str, query: str, *args, **kwargs):
+        async with self.acquire() as conn:
+            started = perf_counter()
+            try:
+                return await getattr(conn, method)(query, *args, **kwargs)
+            finally:
+                self.stats.observe(label, (perf_counter() - started) * 1000)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        return await self._run(query, 'fetch', query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        return await self._run(query, 'fetchrow', query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        return await self._run(query, 'fetchval', query, *args, **kwargs)
+
+    async def execute(self, query: str, *args, **kwargs):
+        return await self._run(query, 'execute', query, *args, **kwargs)
+
+    async def executemany(self, query: str, *args, **kwargs):
+        return await self._run(query, 'executemany', query, *args, **kwargs)
+
+    async def _run_prepared(self, name: str, method: str, *args):
+        async with self.acquire() as conn:
+            started = perf_counter()
+            try:
+                statement = await conn.prepared(name)
+                return await getattr(statement, method)(*args)
+            finally:
+                self.stats.observe(name, (perf_counter() - started) * 1000)
+
+    async def fetch_prepared(self, name: str, *args):
+        return await self._run_prepared(name, 'fetch', *args)
+
+    async def fetchrow_prepared(self, name: str, *args):
+        return await self._run_prepared(name, 'fetchrow', *args)
+
+    async def execute_prepared(self, name: str, *args):
+        # Prepared statements have no `execute`; `fetch` runs them and discards the (empty) result
+        await self._run_prepared(name, 'fetch', *args)
+
+    async def close(self):
+        await self.pool.close()
@@ -1,5 +1,4 @@
 import copy
-import functools
 import random
 from io import BytesIO
 from typing import Dict, List
@@ -8,7 +7,7 @@ from discord import Interaction, app_commands, Message, Forbidden, RateLimited,
 from discord.app_commands import AppCommandError
 from discord.app_commands.tree import _log
 
-from funcs.profile import load_image, Profile, imager_to_bytes
+from funcs.profile import load_images, Profile, render_profile
 from objects.comic import Comic
 
 
@@ -27,7 +26,6 @@ def cmd_ping(all_commands: Dict, command: str):
 
 
 async def pin(bot_id: int, msg: Message):
-    if msg.guild.id == 281648235557421056: print("pin start")
     try:
         pins = list(reversed(await msg.channel.pins()))
         if len(pins) >= 50:
@@ -37,13 +35,10 @@ async def pin(bot_id: int, msg: Message):
             except StopIteration:
                 return None
         await msg.pin()
-        if msg.guild.id == 281648235557421056: print("pinned")
 
         async for m in msg.channel.history(limit=1):
             await m.delete()
 
-        if msg.guild.id == 281648235557421056: print("deleted pin message")
-
     except (Forbidden, RateLimited, HTTPException):
         pass
 
@@ -51,14 +46,14 @@ async def pin(bot_id: int, msg: Message):
 async def profile_pic(marvel_comics: List[Comic], dc_comics: List[Comic], bot) -> BytesIO:
     m_ims = random.sample([i.coverImage for i in marvel_comics if i.coverImage], 2)
     d_ims = random.sample([i.coverImage for i in dc_comics if i.coverImage], 2)
-    ims = [await load_image(i) for i in m_ims] + [await load_image(i) for i in d_ims]
+    elem_width = 600
+    ims = await load_images(m_ims + d_ims, min_side=elem_width, cache=bot.image_cache)
 
-    p = Profile(ims, 1200, 70, 300, 600,
+    p = Profile(ims, 1200, 70, 300, elem_width,
                 bg=(255, 255, 255, 240),
                 round_corners=20)
 
-    fp = functools.partial(imager_to_bytes, p)
-    img: BytesIO = await bot.loop.run_in_executor(None, fp)
+    img = await render_profile(p)
 
     await bot.user.edit(avatar=copy.copy(img).read())
     return img
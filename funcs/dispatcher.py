@@ -0,0 +1,231 @@
+import asyncio
+import re
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+import aiohttp
+from discord import Message, abc
+
+from funcs.discord_functions import pin
+
+Route = Tuple[str, int]
+
+GLOBAL_ROUTE: Route = ('global', 0)
+
+_channel_path = re.compile(r'/channels/(\d+)(/.*)?$')
+
+
+def route_for(method: str, path: str) -> Optional[Route]:
+    """
+    Map a Discord API request to the bucket it is tracked under: message sends and pinning each have their own per
+    channel. Discord limits other requests, such as reading or deleting messages, separately, so their headers mustn't
+    update these buckets; they aren't tracked.
+    """
+    match = _channel_path.search(path)
+    if match is None:
+        return None
+    channel_id = int(match.group(1))
+    rest = match.group(2) or ''
+    if method == 'POST' and rest == '/messages':
+        return 'channel', channel_id
+    # discord.py pins at /messages/pins/; older versions used /pins/
+    if method in ('PUT', 'DELETE') and (rest.startswith('/messages/pins/') or rest.startswith('/pins/')):
+        return 'pin', channel_id
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket for one Discord route.
+
+    Discord's `X-RateLimit-*` headers correct the local estimate after every response, and 429s halve the refill rate
+    (recovering gradually on success), so the bucket settles just under what Discord actually allows.
+    """
+
+    MIN_RATE = 0.2
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_rate = rate
+
+        self.tokens = capacity
+        self.paused_until = 0.0
+        self._updated = asyncio.get_event_loop().time()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            now = loop.time()
+            self._refill(now)
+
+            wait = self.paused_until - now
+            if wait <= 0:
+                # Refills that round to just under a whole token would otherwise spin on sub-resolution sleeps
+                if self.tokens >= 1 - 1e-9:
+                    self.tokens = max(self.tokens - 1, 0.0)
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def update(self, limit: int, remaining: int, reset_after: float):
+        now = asyncio.get_event_loop().time()
+        self._refill(now)
+
+        self.capacity = max(limit, 1)
+        if remaining == limit - 1 and reset_after > 0:
+            # Window just opened, so `reset_after` is the full window length
+            self.max_rate = limit / reset_after
+        self.recover()
+        self.tokens = min(self.tokens, remaining)
+
+        if remaining == 0:
+            self.paused_until = max(self.paused_until, now + reset_after)
+
+    def recover(self):
+        """Wins back a tenth of the rate lost to 429s."""
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def penalise(self, retry_after: float):
+        now = asyncio.get_event_loop().time()
+        self._refill(now)
+
+        self.tokens = 0
+        self.paused_until = max(self.paused_until, now + retry_after)
+        self.rate = max(self.MIN_RATE, self.rate / 2)
+
+
+class RateLimitTracker:
+    """Keeps a token bucket per route, fed by the rate limit headers of every Discord API response."""
+
+    def __init__(self, global_rate: float = 50):
+        self.global_rate = global_rate
+        self.buckets: Dict[Route, TokenBucket] = {}
+
+        self.rate_limited: Counter[Route] = Counter()
+        self.statuses: Counter[int] = Counter()
+
+    def bucket(self, route: Route) -> TokenBucket:
+        if route not in self.buckets:
+            if route == GLOBAL_ROUTE:
+                self.buckets[route] = TokenBucket(self.global_rate, self.global_rate)
+            else:
+                # Conservative until the first response tells us the real limits
+                self.buckets[route] = TokenBucket(5, 1)
+        return self.buckets[route]
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_request_end.append(self._on_request_end)
+        return trace
+
+    async def _on_request_end(self, _session, _ctx, params: aiohttp.TraceRequestEndParams):
+        self.observe(params.method, params.url.path, params.response.status, params.response.headers)
+
+    def observe(self, method: str, path: str, status: int, headers: Mapping[str, str]):
+        """Records a Discord API response to `path`, updating its route's bucket from the rate limit headers."""
+        self.statuses[status] += 1
+
+        route = route_for(method, path)
+
+        if status == 429:
+            retry_after = float(headers.get('Retry-After', 1))
+            is_global = headers.get('X-RateLimit-Global', '').lower() == 'true' or \
+                headers.get('X-RateLimit-Scope') == 'global'
+            # Other routes' limits, such as the avatar's hours-long one, mustn't hold up deliveries
+            if is_global:
+                route = GLOBAL_ROUTE
+            elif route is None:
+                return
+            self.rate_limited[route] += 1
+            self.bucket(route).penalise(retry_after)
+            return
+
+        # Discord sends no headers for the global limit, so any other response wins back some of the rate lost to it
+        if GLOBAL_ROUTE in self.buckets:
+            self.buckets[GLOBAL_ROUTE].recover()
+
+        if route is None or 'X-RateLimit-Limit' not in headers:
+            return
+
+        try:
+            self.bucket(route).update(
+                int(headers['X-RateLimit-Limit']),
+                int(headers['X-RateLimit-Remaining']),
+                float(headers['X-RateLimit-Reset-After'])
+            )
+        except (KeyError, ValueError):
+            pass
+
+
+class _Job:
+    __slots__ = ('routes', 'factory', 'future')
+
+    def __init__(self, routes: List[Route], factory: Callable[[], Awaitable], future: asyncio.Future):
+        self.routes = routes
+        self.factory = factory
+        self.future = future
+
+
+class DeliveryDispatcher:
+    """Queue of Discord send jobs, drained by a pool of workers that wait on the rate limit buckets of each job."""
+
+    def __init__(self, rate_limits: RateLimitTracker, workers: int = 8):
+        self.rate_limits = rate_limits
+        self.worker_count = workers
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+
+        self.sent: Counter[Route] = Counter()
+
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        loop = loop or asyncio.get_event_loop()
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        while len(self.workers) < self.worker_count:
+            self.workers.append(loop.create_task(self._worker()))
+
+    def stop(self):
+        for w in self.workers:
+            w.cancel()
+        self.workers = []
+
+    async def submit(self, route: Route, factory: Callable[[], Awaitable]):
+        """Run `factory()` once the global bucket and `route`'s bucket allow it, and return its result."""
+        future = asyncio.get_event_loop().create_future()
+        # The route's own bucket goes first, so a job waiting on a busy channel doesn't hold a global token
+        await self.queue.put(_Job([route, GLOBAL_ROUTE], factory, future))
+        return await future
+
+    async def send(self, channel: abc.Messageable, *args, **kwargs) -> Message:
+        return await self.submit(('channel', channel.id), lambda: channel.send(*args, **kwargs))
+
+    async def pin(self, bot_id: int, msg: Message):
+        return await self.submit(('pin', msg.channel.id), lambda: pin(bot_id, msg))
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.future.cancelled():
+                    continue
+                for route in job.routes:
+                    await self.rate_limits.bucket(route).acquire()
+                result = await job.factory()
+                self.sent[job.routes[0]] += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self.queue.task_done()
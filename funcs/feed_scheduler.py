@@ -0,0 +1,133 @@
+import asyncio
+import datetime as dt
+import heapq
+import itertools
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+from discord import utils
+
+
+class _Entry:
+    __slots__ = ('when', 'seq', 'key', 'payload', 'cancelled')
+
+    def __init__(self, when: dt.datetime, seq: int, key: Hashable, payload: Any):
+        self.when = when
+        self.seq = seq
+        self.key = key
+        self.payload = payload
+        self.cancelled = False
+
+    def __lt__(self, other: '_Entry'):
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class FeedScheduler:
+    """
+    Single timer for every scheduled feed.
+
+    Entries live in a min-heap ordered by fire time. Cancelling only marks an entry as dead (it is dropped when it
+    reaches the top of the heap), so schedule, cancel and reschedule are all O(log n). One runner task sleeps until
+    the earliest entry is due, regardless of how many feeds are scheduled.
+    """
+
+    def __init__(self, callback: Callable[[Hashable, Any, dt.datetime], Awaitable[None]], *,
+                 clock: Callable[[], dt.datetime] = utils.utcnow):
+        self.callback = callback
+        self.clock = clock
+
+        self._heap: List[_Entry] = []
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def next_fire(self, key: Hashable) -> Optional[dt.datetime]:
+        entry = self._entries.get(key)
+        return entry.when if entry else None
+
+    def keys(self):
+        return self._entries.keys()
+
+    def payloads(self):
+        return [e.payload for e in self._entries.values()]
+
+    def schedule(self, key: Hashable, when: dt.datetime, payload: Any = None):
+        """Schedule (or reschedule) `key` to fire at `when`."""
+        self.cancel(key)
+        entry = _Entry(when, next(self._counter), key, payload)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry.cancelled = True
+
+        # Keep dead entries from accumulating when many feeds are edited between fires
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if not e.cancelled]
+            heapq.heapify(self._heap)
+        return True
+
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        if self._runner is None or self._runner.done():
+            loop = loop or asyncio.get_event_loop()
+            self._runner = loop.create_task(self._run())
+
+    def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        for task in list(self._running):
+            task.cancel()
+
+    def _peek(self) -> Optional[_Entry]:
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            entry = self._peek()
+
+            if entry is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = (entry.when - self.clock()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            del self._entries[entry.key]
+            self._fire(entry)
+
+    def _fire(self, entry: _Entry):
+        task = asyncio.get_event_loop().create_task(self._call(entry))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _call(self, entry: _Entry):
+        try:
+            await self.callback(entry.key, entry.payload, entry.when)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            traceback.print_exc()
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+
+class ImageCache:
+    """
+    Derived images (such as resized covers) on local disk, keyed by source URL and variant. Once the cache grows past
+    `max_bytes`, the least recently used entries are evicted. Each entry is stored behind a SHA-256 of its contents,
+    and entries that don't match it are dropped when read.
+
+    Methods block on disk access, so call them from an executor.
+    """
+    SUFFIX = '.img'
+    DIGEST_SIZE = hashlib.sha256().digest_size
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        for tmp in self.path.glob('*.tmp'):
+            tmp.unlink(missing_ok=True)
+        # Hits touch the file, so modification order is recency order across restarts
+        for file, stat in sorted(((f, f.stat()) for f in self.path.glob('*' + self.SUFFIX)),
+                                 key=lambda x: x[1].st_mtime):
+            self._entries[file.stem] = stat.st_size
+            self.size += stat.st_size
+        with self._lock:
+            self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def key(url: str, variant: Any = None) -> str:
+        return hashlib.sha256(f"{variant}|{url}".encode()).hexdigest()
+
+    def _file(self, key: str) -> Path:
+        return self.path / (key + self.SUFFIX)
+
+    def get(self, url: str, variant: Any = None) -> Optional[bytes]:
+        key = self.key(url, variant)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        file = self._file(key)
+        try:
+            data = file.read_bytes()
+            os.utime(file)
+        except FileNotFoundError:
+            data = b''
+
+        digest, payload = data[:self.DIGEST_SIZE], data[self.DIGEST_SIZE:]
+        if len(digest) != self.DIGEST_SIZE or hashlib.sha256(payload).digest() != digest:
+            print(f"[Image Cache] Dropping corrupt entry {key}")
+            with self._lock:
+                self._remove(key)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return payload
+
+    def put(self, url: str, variant: Any, data: bytes):
+        key = self.key(url, variant)
+        file = self._file(key)
+        tmp = file.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(hashlib.sha256(data).digest())
+            f.write(data)
+        os.replace(tmp, file)
+
+        with self._lock:
+            self.size -= self._entries.pop(key, 0)
+            self._entries[key] = self.DIGEST_SIZE + len(data)
+            self.size += self._entries[key]
+            self._evict()
+
+    def _remove(self, key: str):
+        self.size -= self._entries.pop(key, 0)
+        self._file(key).unlink(missing_ok=True)
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
@@ -0,0 +1,231 @@
+import asyncio
+import bisect
+import math
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from aiohttp import web
+
+from funcs.database import BUCKETS as DB_BUCKETS
+
+LabelValues = Tuple[str, ...]
+
+# Upper bounds (seconds) of the default histogram buckets
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, float('inf')]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, *labels: str, value: float):
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: List[float] = None):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets or DEFAULT_BUCKETS
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, *labels: str, value: float):
+        counts, total = self.values.setdefault(labels, ([0] * len(self.buckets), [0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for k, (counts, total) in self.values.items():
+            lines += self.bucket_samples(k, counts, total[0])
+        return lines
+
+    def bucket_samples(self, labels: LabelValues, counts: List[int], total: float) -> List[str]:
+        """Samples of one label set, from its per-bucket (not cumulative) `counts`."""
+        lines, seen = [], 0
+        for bound, n in zip(self.buckets, counts):
+            seen += n
+            le = 'le="%s"' % _number(bound)
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {seen}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {seen}")
+        return lines
+
+
+class Registry:
+    """
+    Metrics recorded as things happen, plus collectors that read figures kept elsewhere (database stats, rate limit
+    counters, caches) when scraped, rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], None]] = []
+
+    def _add(self, metric: Metric) -> Metric:
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (),
+                  buckets: List[float] = None) -> Histogram:
+        return self._add(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, fn: Callable[[], None]):
+        """Registers `fn` to update metrics just before every scrape."""
+        self.collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        for fn in self.collectors:
+            try:
+                fn()
+            except Exception as e:
+                print(f"[Metrics] Collector {fn.__name__} failed: {e!r}")
+        lines = []
+        for metric in self.metrics.values():
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+class BotMetrics(Registry):
+    """The bot's metrics. Feeds and deliveries are labelled by brand and format, never by server or channel."""
+
+    def __init__(self, bot):
+        super().__init__()
+        self.bot = bot
+
+        self.crawl_duration = self.histogram('zelma_crawl_duration_seconds', "Time taken to crawl a brand's catalog.",
+                                             ['brand'])
+        self.crawl_errors = self.counter('zelma_crawl_errors_total', "Brand crawls that failed.", ['brand'])
+        self.catalog_comics = self.gauge('zelma_catalog_comics', "Comics in the loaded catalog.", ['brand'])
+
+        self.feeds_scheduled = self.gauge('zelma_feeds_scheduled', "Feeds waiting on the scheduler.")
+        self.feed_lag = self.histogram('zelma_feed_lag_seconds', "Delay between a feed's scheduled and actual start.")
+        self.feed_duration = self.histogram('zelma_feed_delivery_duration_seconds', "Time taken to deliver a feed.",
+                                            ['brand', 'format'])
+        self.feed_messages = self.counter('zelma_feed_messages_total', "Requests sent delivering feeds.",
+                                          ['brand', 'format'])
+        self.feeds_delivered = self.counter('zelma_feeds_delivered_total', "Feed deliveries, by outcome.",
+                                            ['brand', 'format', 'status'])
+
+        self.responses = self.counter('zelma_discord_responses_total', "Discord API responses, by status.",
+                                      ['status'])
+        self.rate_limited = self.counter('zelma_discord_rate_limited_total', "429 responses, by route kind.",
+                                         ['route'])
+
+        self.pool_size = self.gauge('zelma_db_pool_connections', "Database pool connections, by state.", ['state'])
+        self.pool_wait = self.histogram('zelma_db_pool_wait_seconds', "Time spent waiting for a pooled connection.",
+                                        buckets=[b / 1000 for b in DB_BUCKETS])
+
+        self.image_cache = self.gauge('zelma_image_cache', "Image cache lookups and size.", ['stat'])
+        self.image_cache_hit_ratio = self.gauge('zelma_image_cache_hit_ratio', "Image cache hits over lookups.")
+
+        self.loop_lag = self.histogram('zelma_event_loop_lag_seconds', "How late the event loop ran a timer.",
+                                       buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, float('inf')])
+
+        self.collector(self.collect)
+
+    def collect(self):
+        bot = self.bot
+
+        for brand_id, comics in getattr(bot, 'comics', {}).items():
+            self.catalog_comics.set(brand_id, value=len(comics))
+
+        pulls = bot.get_cog('Pulls')
+        if pulls is not None:
+            self.feeds_scheduled.set(value=len(pulls.feed_scheduler))
+
+        self.responses.values = {(str(status),): n for status, n in bot.rate_limits.statuses.items()}
+        limited: Dict[LabelValues, float] = {}
+        for (kind, _), n in bot.rate_limits.rate_limited.items():
+            limited[(kind,)] = limited.get((kind,), 0) + n
+        self.rate_limited.values = limited
+
+        db = getattr(bot, 'db', None)
+        if db is not None:
+            size, idle = db.pool.get_size(), db.pool.get_idle_size()
+            self.pool_size.set('idle', value=idle)
+            self.pool_size.set('in_use', value=size - idle)
+            wait = db.stats.pool_wait
+            self.pool_wait.values[()] = (list(wait.counts), [wait.total / 1000])
+
+        cache = getattr(bot, 'image_cache', None)
+        if cache is not None:
+            self.image_cache.set('hits', value=cache.hits)
+            self.image_cache.set('misses', value=cache.misses)
+            self.image_cache.set('entries', value=len(cache))
+            self.image_cache.set('bytes', value=cache.size)
+            self.image_cache_hit_ratio.set(value=cache.hit_rate)
+
+
+async def monitor_loop_lag(histogram: Histogram, interval: float = 0.5):
+    """Measures how late the event loop wakes from a sleep, which is how long other callbacks held it."""
+    while True:
+        started = perf_counter()
+        await asyncio.sleep(interval)
+        histogram.observe(value=max(0.0, perf_counter() - started - interval))
+
+
+async def serve_metrics(registry: Registry, host: str, port: int) -> web.AppRunner:
+    async def metrics(_request: web.Request) -> web.Response:
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"[Metrics] Serving on http://{host}:{port}/metrics")
+    return runner
+
@@ -0,0 +1,116 @@
+import datetime as dt
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from funcs.database import Database, PREPARED_QUERIES
+
+MIGRATIONS_PATH = Path(__file__).parent.parent / 'migrations'
+
+# Held while migrating, so shard processes starting together don't race each other
+_LOCK_ID = 0x5A454C4D41
+
+# Sample arguments for EXPLAINing each hot query
+HOT_QUERY_ARGS: Dict[str, Tuple[Any, ...]] = {
+    'configuration_by_servers': ([0],),
+    'configuration_by_servers_brand': ([0], ''),
+    'keywords_by_server': (0,),
+    'journal_entry': (0, '', dt.date.today()),
+    'journal_progress': (0, '', dt.date.today(), 0),
+    'archive_week': (dt.date.today(), ''),
+    'archive_series_releases': ('', 10),
+}
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def __str__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def discover_migrations(path: Path = MIGRATIONS_PATH) -> List[Migration]:
+    migrations = []
+    for file in path.glob('*.sql'):
+        match = re.fullmatch(r'(\d+)_(\w+)\.sql', file.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), file))
+    return sorted(migrations, key=lambda m: m.version)
+
+
+async def run_migrations(db: Database) -> List[Migration]:
+    """Applies pending migrations in order, each in its own transaction. Returns the ones applied."""
+    applied = []
+
+    # Migrations RAISE NOTICE about any rows they change beyond the schema
+    def log_notice(_, message):
+        print(f"[Migrations] {message.message}")
+
+    async with db.acquire() as conn:
+        await conn.execute('SELECT pg_advisory_lock($1)', _LOCK_ID)
+        conn.add_log_listener(log_notice)
+        try:
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_version (" +
+                "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+            )
+            current = await conn.fetchval('SELECT COALESCE(MAX(version), 0) FROM schema_version')
+
+            for migration in discover_migrations():
+                if migration.version <= current:
+                    continue
+                try:
+                    async with conn.transaction():
+                        await conn.execute(migration.path.read_text())
+                        await conn.execute('INSERT INTO schema_version (version, name) VALUES ($1, $2)',
+                                           migration.version, migration.name)
+                except Exception as e:
+                    print(f"[Migrations] ! {migration} failed and was rolled back: {e}")
+                    raise
+                applied.append(migration)
+                print(f"[Migrations] Applied {migration}")
+        finally:
+            conn.remove_log_listener(log_notice)
+            await conn.execute('SELECT pg_advisory_unlock($1)', _LOCK_ID)
+
+    version = max([m.version for m in applied], default=current)
+    print(f"[Migrations] Schema at version {version}")
+    return applied
+
+
+def _scan_nodes(plan: dict) -> List[str]:
+    nodes = [f"{plan['Node Type']} on {plan['Relation Name']}" if 'Relation Name' in plan else plan['Node Type']]
+    for child in plan.get('Plans', []):
+        nodes += _scan_nodes(child)
+    return nodes
+
+
+async def check_query_plans(db: Database) -> Dict[str, List[str]]:
+    """
+    EXPLAINs every hot query with sequential scans disabled, and warns about any that still need one (meaning no
+    index can serve it). Returns the plan nodes of each query.
+    """
+    plans = {}
+    async with db.acquire() as conn:
+        for name, query in PREPARED_QUERIES.items():
+            # Always rolled back: only the plan is wanted, and SET LOCAL must not leak into the pool
+            transaction = conn.transaction()
+            await transaction.start()
+            try:
+                await conn.execute('SET LOCAL enable_seqscan = off')
+                result = await conn.fetchval(f'EXPLAIN (FORMAT JSON) {query}', *HOT_QUERY_ARGS[name])
+            finally:
+                await transaction.rollback()
+            if isinstance(result, str):
+                result = json.loads(result)
+            plans[name] = _scan_nodes(result[0]['Plan'])
+
+    for name, nodes in plans.items():
+        seq_scans = [n for n in nodes if n.startswith('Seq Scan')]
+        if seq_scans:
+            print(f"[Migrations] ! {name} has no usable index: {', '.join(seq_scans)}")
+    return plans
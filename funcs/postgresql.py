@@ -1,22 +1,12 @@
-from typing import Dict, List
-
-from asyncpg import Pool
+from discord import app_commands, Interaction, Embed
 from discord.ext import commands
 import asyncpg
 
 from config import *
-from objects.configuration import Configuration, config_from_record
-
-
-async def fetch_raw_configs(db: Pool, server: int):
-    return await db.fetch(
-        'SELECT * FROM configuration WHERE server = $1', server
-    )
-
-
-async def fetch_configs(db: Pool, server: int) -> Dict[str, Configuration]:
-    configs: List[Configuration] = [config_from_record(i) for i in await fetch_raw_configs(db, server)]
-    return {c.brand.id: c for c in configs}
+from funcs.database import Database, PreparedConnection, QueryStats
+from funcs.migrations import run_migrations, check_query_plans
+from funcs.utils import is_owner
+from objects.configuration_store import ConfigurationStore
 
 
 class PostgreSQLCog(commands.Cog, name="PostgreSQL"):
@@ -26,13 +16,52 @@ class PostgreSQLCog(commands.Cog, name="PostgreSQL"):
         self.bot = bot
 
         self.credentials = postgres_credentials
-        self.bot.loop.create_task(self.load_postgresql())
-
-        self.bot.postgresql_loaded = False
+        self.bot.loop.create_task(self.bot.startup.run('db', self.load_postgresql()))
 
     async def load_postgresql(self):
-        self.bot.db = await asyncpg.create_pool(**self.credentials)
-        self.bot.postgresql_loaded = True
+        pool = await asyncpg.create_pool(
+            **self.credentials,
+            min_size=POSTGRES_POOL_MIN_SIZE,
+            max_size=POSTGRES_POOL_MAX_SIZE,
+            statement_cache_size=POSTGRES_STATEMENT_CACHE_SIZE,
+            command_timeout=POSTGRES_COMMAND_TIMEOUT,
+            connection_class=PreparedConnection
+        )
+        self.bot.db = Database(pool)
+
+        self.bot.migrations_applied = await run_migrations(self.bot.db)
+        await check_query_plans(self.bot.db)
+
+        self.bot.configs = ConfigurationStore(self.bot.db)
+        await self.bot.configs.load()
+        await self.bot.configs.listen(lambda: asyncpg.connect(**self.credentials))
+
+    async def cog_unload(self):
+        await self.bot.configs.close()
+
+    @app_commands.command(name="db-stats")
+    @app_commands.guilds(*ADMIN_GUILD_IDS or None)
+    @app_commands.check(is_owner)
+    async def db_stats(self, interaction: Interaction):
+        """Query latency and pool wait statistics, dev-only."""
+        stats: QueryStats = self.bot.db.stats
+        pool: asyncpg.Pool = self.bot.db.pool
+
+        embed = Embed(title="Database")
+        embed.description = \
+            f"Pool: {pool.get_size() - pool.get_idle_size()}/{pool.get_size()} in use " \
+            f"(min {pool.get_min_size()}, max {pool.get_max_size()})\n" \
+            f"Pool wait: {stats.pool_wait.count} acquires, mean {stats.pool_wait.mean:.1f}ms, " \
+            f"p95 ≤{stats.pool_wait.quantile(0.95)}ms"
+
+        for label, h in stats.slowest(10):
+            embed.add_field(
+                name=label[:250],
+                value=f"{h.count} calls · {h.total / 1000:.1f}s total\n"
+                      f"mean {h.mean:.1f}ms · p50 ≤{h.quantile(0.5)}ms · p95 ≤{h.quantile(0.95)}ms",
+                inline=False)
+
+        await interaction.response.send_message(embed=embed)
 
 
 async def setup(bot):
@@ -1,8 +1,19 @@
+import asyncio
+import contextlib
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
 from io import BytesIO
-from typing import List
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional, Tuple, TypeVar
 
 import aiohttp
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageOps
+
+from config import COMPOSITOR_PROCESSES
+from funcs.image_cache import ImageCache
+
+T = TypeVar('T')
 
 
 class Profile:
@@ -25,18 +36,24 @@ def resize(im: Image.Image, width: int):
     return im.resize((int(w * ratio), int(h * ratio)))
 
 
-def add_corners(im, rad):
+@functools.lru_cache(maxsize=32)
+def corner_mask(size: Tuple[int, int], rad: int) -> Image.Image:
+    """Alpha mask rounding the corners of an image of `size`. Shared between calls, so don't modify it."""
     # https://stackoverflow.com/a/11291419
     circle = Image.new('L', (rad * 2, rad * 2), 0)
     draw = ImageDraw.Draw(circle)
     draw.ellipse((0, 0, rad * 2 - 1, rad * 2 - 1), fill=255)
-    alpha = Image.new('L', im.size, 255)
-    w, h = im.size
+    alpha = Image.new('L', size, 255)
+    w, h = size
     alpha.paste(circle.crop((0, 0, rad, rad)), (0, 0))
     alpha.paste(circle.crop((0, rad, rad, rad * 2)), (0, h - rad))
     alpha.paste(circle.crop((rad, 0, rad * 2, rad)), (w - rad, 0))
     alpha.paste(circle.crop((rad, rad, rad * 2, rad * 2)), (w - rad, h - rad))
-    im.putalpha(alpha)
+    return alpha
+
+
+def add_corners(im, rad):
+    im.putalpha(corner_mask(im.size, rad))
     return im
 
 
@@ -69,11 +86,189 @@ def imager_to_bytes(pf: Profile):
     return output_buffer
 
 
-async def load_image(url: str):
-    async with aiohttp.ClientSession() as session:
+_compositor: Optional[Executor] = None
+
+
+def compositor() -> Executor:
+    """
+    The process pool images are composited in, away from the bot's GIL. Workers come from a fork server, or are
+    spawned where there is none, rather than forked from the bot: its threads may hold locks a fork would inherit.
+    """
+    global _compositor
+    if _compositor is None:
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _compositor = ProcessPoolExecutor(COMPOSITOR_PROCESSES, mp_context=multiprocessing.get_context(method))
+    return _compositor
+
+
+def shutdown_compositor():
+    """Stops the compositor's workers, if it was started."""
+    global _compositor
+    if _compositor is not None:
+        _compositor.shutdown(cancel_futures=True)
+        _compositor = None
+
+
+def _profile_png(images: List[Image.Image], size: int, margin: int, skew: int, elem_width: int, bg: tuple,
+                 round_corners: int) -> bytes:
+    pf = Profile(images, size, margin, skew, elem_width, bg=bg, round_corners=round_corners)
+    return imager_to_bytes(pf).getvalue()
+
+
+def _composite_shared(shm_name: str, shapes: List[Tuple[int, int, int]], render: Callable[..., T], *args) -> T:
+    """
+    Runs in a compositor process: calls `render` with the RGBA images laid out in shared memory as (width, height,
+    offset), or None where the shape is empty, followed by `args`.
+    """
+    shm = SharedMemory(name=shm_name)
+    try:
+        images = [Image.frombuffer('RGBA', (w, h), shm.buf[offset:offset + w * h * 4], 'raw', 'RGBA', 0, 1)
+                  if w and h else None for w, h, offset in shapes]
+        output = render(images, *args)
+        # Nothing may still point into the buffer when it closes
+        del images
+        return output
+    finally:
+        shm.close()
+
+
+async def composite(render: Callable[..., T], images: List[Optional[Image.Image]], *args) -> T:
+    """
+    Calls `render(images, *args)` in the compositor, handing the images over in one shared memory block rather than
+    pickled. `render` must be a module-level function.
+    """
+    loop = asyncio.get_running_loop()
+    images = [i if i is None or i.mode == 'RGBA' else i.convert('RGBA') for i in images]
+    shapes, offset = [], 0
+    for im in images:
+        if im is None:
+            shapes.append((0, 0, 0))
+            continue
+        shapes.append((im.width, im.height, offset))
+        offset += im.width * im.height * 4
+
+    shm = SharedMemory(create=True, size=max(offset, 1))
+    try:
+        for im, (_, _, start) in zip(images, shapes):
+            if im is not None:
+                data = im.tobytes()
+                shm.buf[start:start + len(data)] = data
+        return await loop.run_in_executor(compositor(), _composite_shared, shm.name, shapes, render, *args)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+async def render_profile(pf: Profile) -> BytesIO:
+    """Renders `pf` in the compositor."""
+    output = await composite(_profile_png, pf.images[:4],
+                             pf.size, pf.margin, pf.skew, pf.elem_width, pf.bg, pf.round_corners)
+    return BytesIO(output)
+
+
+def collage(images: List[Optional[Image.Image]], columns: int, rows: int, tile_width: int, *, gap: int = 10,
+            bg=(255, 255, 255), round_corners: int = 0) -> List[Image.Image]:
+    """
+    Lays covers out in a grid of `columns` by `rows` tiles per sheet, as many sheets as needed. Covers are cropped to
+    fill their 2:3 tile, and missing ones (None) are left blank.
+    """
+    tile = (tile_width, tile_width * 3 // 2)
+    per_sheet = columns * rows
+
+    sheets = []
+    for start in range(0, len(images), per_sheet):
+        page = images[start:start + per_sheet]
+        used_rows = -(-len(page) // columns)
+        width = columns * tile[0] + (columns + 1) * gap
+        height = used_rows * tile[1] + (used_rows + 1) * gap
+        sheet = Image.new('RGBA', (width, height), bg)
+        for n, im in enumerate(page):
+            if im is None:
+                continue
+            im = ImageOps.fit(im.convert('RGBA'), tile)
+            if round_corners:
+                im = add_corners(im, round_corners)
+            x = gap + (n % columns) * (tile[0] + gap)
+            y = gap + (n // columns) * (tile[1] + gap)
+            sheet.alpha_composite(im, (x, y))
+        sheets.append(sheet.convert('RGB'))
+    return sheets
+
+
+def collage_to_bytes(images: List[Optional[Image.Image]], columns: int, rows: int, tile_width: int, gap: int,
+                     bg: tuple, round_corners: int) -> List[bytes]:
+    output = []
+    for sheet in collage(images, columns, rows, tile_width, gap=gap, bg=bg, round_corners=round_corners):
+        buffer = BytesIO()
+        sheet.save(buffer, 'JPEG', quality=85, optimize=True)
+        output.append(buffer.getvalue())
+    return output
+
+
+def decode_image(data: bytes, min_side: Optional[int] = None) -> Image.Image:
+    """
+    Decodes an image to RGBA. With `min_side`, images are decoded no smaller than needed for their shorter side to be
+    `min_side`: JPEGs straight at a reduced scale, anything else reduced right after decoding.
+    """
+    im = Image.open(BytesIO(data))
+    if min_side is not None:
+        w, h = im.size
+        factor = min(w, h) // min_side
+        if factor >= 2:
+            if im.format == 'JPEG':
+                im.draft('RGB', (w // factor, h // factor))
+            else:
+                im = im.reduce(factor)
+    return im.convert('RGBA')
+
+
+def derive_image(cache: ImageCache, url: str, data: bytes, min_side: Optional[int]) -> Image.Image:
+    """Decodes a downloaded image, resized to `min_side`, and caches the result."""
+    im = decode_image(data, min_side)
+    if min_side is not None and min(im.size) > min_side:
+        im = resize(im, min_side)
+
+    buffer = BytesIO()
+    im.convert('RGB').save(buffer, 'JPEG', quality=90)
+    cache.put(url, min_side, buffer.getvalue())
+    return im
+
+
+async def load_image(url: str, min_side: Optional[int] = None, session: aiohttp.ClientSession = None,
+                     cache: ImageCache = None, downloads: asyncio.Semaphore = None) -> Image.Image:
+    """
+    Downloads and decodes an image, decoding off the event loop. With a cache, images seen before aren't downloaded
+    again. With `downloads`, the download waits for the semaphore; cache hits don't.
+    """
+    loop = asyncio.get_running_loop()
+    if cache is not None:
+        cached = await loop.run_in_executor(None, cache.get, url, min_side)
+        if cached is not None:
+            return await loop.run_in_executor(None, decode_image, cached)
+
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await load_image(url, min_side, session, cache, downloads)
+
+    async with downloads or contextlib.nullcontext():
         async with session.get(url) as response:
+            response.raise_for_status()
             image_bytes = await response.read()
-    return Image.open(BytesIO(image_bytes)).convert('RGBA')
+
+    if cache is None:
+        return await loop.run_in_executor(None, decode_image, image_bytes, min_side)
+    return await loop.run_in_executor(None, derive_image, cache, url, image_bytes, min_side)
+
+
+async def load_images(urls: List[str], min_side: Optional[int] = None, cache: ImageCache = None,
+                      return_exceptions: bool = False, downloads: asyncio.Semaphore = None) -> List[Image.Image]:
+    """
+    Downloads and decodes images concurrently, in the order given, at most `downloads` at a time if given. With
+    `return_exceptions`, images that fail to load are returned as their exception instead of failing the rest.
+    """
+    async with aiohttp.ClientSession() as session:
+        return list(await asyncio.gather(*(load_image(url, min_side, session, cache, downloads) for url in urls),
+                                         return_exceptions=return_exceptions))
 
 # import requests
 # from io import BytesIO
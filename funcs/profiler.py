@@ -0,0 +1,267 @@
+import asyncio
+import collections
+import contextlib
+import datetime as dt
+import functools
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Counter, Dict, Hashable, List, Optional, Tuple
+
+from discord import utils
+
+ROOT = str(Path(__file__).resolve().parent.parent)
+
+TARGETS = {
+    'time': "a set duration",
+    'crawl': "the next crawl",
+    'feeds': "the next feed batch",
+}
+
+# Seconds a feed batch can have no feed running before its profile ends, since feeds are staggered across lanes
+FEED_BATCH_GRACE = 30.0
+
+
+@functools.lru_cache(maxsize=None)
+def _short_path(filename: str) -> str:
+    if filename.startswith(ROOT):
+        return filename[len(ROOT) + 1:]
+    if 'site-packages' in filename:
+        return filename.split('site-packages', 1)[1].lstrip('/\\')
+    return Path(filename).name
+
+
+class StackSampler(threading.Thread):
+    """Records one thread's stack every `interval` seconds from a thread of its own, counting each distinct stack."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[Tuple[str, ...]] = collections.Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                # Outermost frame first, as folded stacks are written
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class ProfileSession:
+    """
+    One profile, of a set duration or of the next crawl or feed batch. Sampling and tracemalloc only run between
+    `begin` and `end`; a session waiting for its crawl or feed batch costs nothing.
+    """
+
+    def __init__(self, target: str, max_duration: float, memory: bool, top: int, interval: float, frames: int):
+        self.target = target
+        self.max_duration = max_duration
+        self.memory = memory
+        self.top = top
+        self.interval = interval
+        self.frames = frames
+
+        self.started_at: Optional[dt.datetime] = None
+        self.ended_at: Optional[dt.datetime] = None
+        self.duration = 0.0
+        self.stacks: Counter[Tuple[str, ...]] = collections.Counter()
+        self.samples = 0
+        self.memory_diff: List[tracemalloc.StatisticDiff] = []
+        self.memory_peak = 0
+        self.memory_traced = 0
+
+        # Which batch of the target is being profiled, and how many of its runs are in progress
+        self.batch: Optional[Hashable] = None
+        self.active = 0
+
+        self.done = asyncio.Event()
+        self._sampler: Optional[StackSampler] = None
+        self._started = 0.0
+        self._owns_tracemalloc = False
+        self._before: Optional[tracemalloc.Snapshot] = None
+        self._timeout: Optional[asyncio.TimerHandle] = None
+        self._idle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def description(self) -> str:
+        if self.target == 'time':
+            return f"{self.max_duration:g}s"
+        return f"{TARGETS[self.target]} (for at most {self.max_duration:g}s)"
+
+    def begin(self):
+        """Starts sampling the calling thread, which is the event loop's."""
+        self.started_at = utils.utcnow()
+        self._started = time.perf_counter()
+
+        if self.memory:
+            self._owns_tracemalloc = not tracemalloc.is_tracing()
+            if self._owns_tracemalloc:
+                tracemalloc.start(self.frames)
+            tracemalloc.reset_peak()
+            self._before = tracemalloc.take_snapshot()
+
+        self._sampler = StackSampler(threading.get_ident(), self.interval)
+        self._sampler.start()
+        self._timeout = asyncio.get_running_loop().call_later(self.max_duration, self.end)
+        print(f"[Profiler] Started profiling {self.description}.")
+
+    def end(self):
+        """Stops sampling and collects the results. Ending a session that never began just cancels it."""
+        if self.done.is_set():
+            return
+        for handle in (self._timeout, self._idle):
+            if handle is not None:
+                handle.cancel()
+
+        if self._sampler is not None:
+            self._sampler.stop()
+            self.duration = time.perf_counter() - self._started
+            self.ended_at = utils.utcnow()
+            self.stacks, self.samples = self._sampler.stacks, self._sampler.samples
+            self._sampler = None
+
+            if self._before is not None:
+                after = tracemalloc.take_snapshot()
+                self.memory_traced, self.memory_peak = tracemalloc.get_traced_memory()
+                if self._owns_tracemalloc:
+                    tracemalloc.stop()
+                ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+                self.memory_diff = after.filter_traces(ignore).compare_to(self._before.filter_traces(ignore), 'lineno')
+                self._before = None
+            print(f"[Profiler] Finished profiling {self.description} after {self.duration:.1f}s.")
+
+        self.done.set()
+
+    def enter(self, batch: Hashable):
+        if self.started_at is None:
+            self.batch = batch
+            self.begin()
+        if self._idle is not None:
+            self._idle.cancel()
+            self._idle = None
+        self.active += 1
+
+    def leave(self):
+        self.active -= 1
+        if self.active:
+            return
+        if self.target == 'feeds':
+            self._idle = asyncio.get_running_loop().call_later(FEED_BATCH_GRACE, self.end)
+        else:
+            self.end()
+
+    def report(self) -> str:
+        """Top functions and stacks by samples, and the lines whose allocations grew the most."""
+        if self.started_at is None:
+            return f"Profile of {TARGETS[self.target]} was cancelled before it started.\n"
+
+        lines = [
+            f"Profile of {TARGETS[self.target]}: {self.duration:.1f}s, {self.samples:,} samples "
+            f"every {self.interval * 1000:g}ms",
+            f"{self.started_at:%Y-%m-%d %H:%M:%S} to {self.ended_at:%Y-%m-%d %H:%M:%S} UTC",
+        ]
+        total = max(self.samples, 1)
+
+        own: Counter[str] = collections.Counter()
+        inclusive: Counter[str] = collections.Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                inclusive[function] += count
+
+        for title, counts in (("own samples", own), ("total samples", inclusive)):
+            lines += ["", f"Top {self.top} functions by {title}", f"{'samples':>9} {'%':>6}  function"]
+            lines += [f"{n:>9,} {n / total:>6.1%}  {f}" for f, n in counts.most_common(self.top)]
+
+        lines += ["", f"Top {self.top} stacks (innermost frame last)"]
+        for stack, count in self.stacks.most_common(self.top):
+            lines.append(f"{count:>9,} {count / total:>6.1%}")
+            lines += [f"            {frame}" for frame in stack]
+
+        if self.memory:
+            lines += [
+                "",
+                f"Memory traced at the end: {self.memory_traced / 1024 / 1024:.1f} MiB, "
+                f"peak {self.memory_peak / 1024 / 1024:.1f} MiB",
+                f"Top {self.top} allocation changes by line",
+                f"{'size':>12} {'blocks':>9}  line",
+            ]
+            lines += [f"{d.size_diff:>+12,} {d.count_diff:>+9,}  {_short_path(d.traceback[0].filename)}:"
+                      f"{d.traceback[0].lineno}" for d in self.memory_diff[:self.top]]
+
+        return "\n".join(lines) + "\n"
+
+    def folded(self) -> str:
+        """Every sampled stack in the folded format flame graph tools read."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.items())
+
+
+class Profiler:
+    """
+    Runs one profile session at a time. Crawls and feeds mark themselves with `phase`, which starts a session that
+    is waiting for them; with no session waiting it does nothing.
+    """
+
+    def __init__(self, interval: float = 0.01, frames: int = 1):
+        self.interval = interval
+        self.frames = frames
+        self.session: Optional[ProfileSession] = None
+
+    def start(self, target: str = 'time', max_duration: float = 60.0, memory: bool = True,
+              top: int = 30) -> ProfileSession:
+        if target not in TARGETS:
+            raise ValueError(f"Unknown profile target: {target}")
+        if self.session is not None and not self.session.done.is_set():
+            raise RuntimeError(f"Already profiling {self.session.description}.")
+
+        self.session = ProfileSession(target, max_duration, memory, top, self.interval, self.frames)
+        if target == 'time':
+            self.session.begin()
+        return self.session
+
+    def stop(self) -> Optional[ProfileSession]:
+        """Ends the current session early, returning it if there was one."""
+        session = self.session
+        if session is None or session.done.is_set():
+            return None
+        session.end()
+        return session
+
+    @contextlib.contextmanager
+    def phase(self, target: str, batch: Hashable = None):
+        """Marks a run of `target`; runs of the first batch seen are profiled together."""
+        session = self.session
+        if session is None or session.target != target or session.done.is_set() or \
+                (session.started_at is not None and session.batch != batch):
+            yield
+            return
+
+        session.enter(batch)
+        try:
+            yield
+        finally:
+            session.leave()
+
+
+def profile_files(session: ProfileSession) -> Dict[str, bytes]:
+    """Attachments of a finished session: the report, and the folded stacks if anything was sampled."""
+    stamp = (session.started_at or utils.utcnow()).strftime('%Y%m%d-%H%M%S')
+    files = {f"profile-{stamp}.txt": session.report().encode()}
+    if session.stacks:
+        files[f"profile-{stamp}.folded"] = session.folded().encode()
+    return files
@@ -1,12 +1,39 @@
-from typing import Tuple, Dict, Union
+import asyncio
+import heapq
+from typing import Tuple, Dict, Union, List, AsyncIterator
 
-from discord import Embed, Message
+from discord import Embed, Message, Guild, abc
 from discord.ext.commands import Bot
 
 from comic_types.brand import Brand
+from comic_types.locg import ComicDetails
 from funcs.utils import week_of_date, f_date
 from objects.comic import ComicMessage, Comic
-from objects.configuration import Configuration
+from objects.configuration import Configuration, Format
+from objects.journal import DeliveryStats
+
+# Assumed delivery time of feeds that have never been measured
+DEFAULT_DURATIONS = {
+    Format.FULL: 15.0,
+    Format.COMPACT: 0.5,
+    Format.SUMMARY: 0.5,
+    Format.COLLAGE: 1.0
+}
+
+
+def channel_access(guild: Guild, channel: abc.GuildChannel, attach_files: bool = False) -> Tuple[bool, str]:
+    if channel is None:
+        return False, "Channel not found"
+
+    perms = channel.permissions_for(guild.me)
+    if not perms.send_messages:
+        return False, "Missing permission: Send Messages"
+    if not perms.embed_links:
+        return False, "Missing permission: Embed Links"
+    if attach_files and not perms.attach_files:
+        return False, "Missing permission: Attach Files"
+
+    return True, ""
 
 
 async def validate_config_accessibility(bot: Bot, config: Configuration) -> Tuple[bool, str]:
@@ -20,17 +47,115 @@ async def validate_config_accessibility(bot: Bot, config: Configuration) -> Tupl
     if guild is None:
         return False, "Guild not found"
 
-    channel = bot.get_channel(config.channel_id)
-    if channel is None:
-        return False, "Channel not found"
+    return channel_access(guild, bot.get_channel(config.channel_id), config.format == Format.COLLAGE)
 
-    perms = channel.permissions_for(guild.me)
-    if not perms.send_messages:
-        return False, "Missing permission: Send Messages"
-    if not perms.embed_links:
-        return False, "Missing permission: Embed Links"
 
-    return True, ""
+class ValidationBatch:
+    def __init__(self):
+        self.valid: List[Configuration] = []
+        self.inaccessible: List[Tuple[Configuration, str]] = []
+        self.member_counts: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self.valid) + len(self.inaccessible)
+
+
+async def validate_configs_batched(bot: Bot, configs: List[Configuration],
+                                   batch_size: int = 1000) -> AsyncIterator[ValidationBatch]:
+    """
+    Validates configurations a batch at a time, yielding each batch as soon as it is checked.
+
+    Configs are grouped by server so each guild is looked up once, and permissions are checked once per channel.
+    """
+    by_server: Dict[int, List[Configuration]] = {}
+    for config in configs:
+        by_server.setdefault(config.server_id, []).append(config)
+
+    batch = ValidationBatch()
+    for server_id, server_configs in by_server.items():
+        guild = bot.get_guild(server_id)
+        if guild is None:
+            batch.inaccessible.extend((c, "Guild not found") for c in server_configs)
+        else:
+            batch.member_counts[server_id] = guild.member_count or 0
+            # Collages are sent as attachments, so their channels are checked for more
+            access: Dict[Tuple[int, bool], Tuple[bool, str]] = {}
+            for config in server_configs:
+                key = (config.channel_id, config.format == Format.COLLAGE)
+                if key not in access:
+                    access[key] = channel_access(guild, guild.get_channel(config.channel_id), key[1])
+                is_accessible, reason = access[key]
+                if is_accessible:
+                    batch.valid.append(config)
+                else:
+                    batch.inaccessible.append((config, reason))
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = ValidationBatch()
+            # Let the gateway breathe between batches
+            await asyncio.sleep(0)
+
+    if len(batch):
+        yield batch
+
+
+def estimate_duration(config: Configuration, stats: DeliveryStats = None) -> float:
+    """Expected delivery time of a feed, inflated by the share of its requests that hit a 429 last time."""
+    if stats is None:
+        return DEFAULT_DURATIONS.get(config.format, DEFAULT_DURATIONS[Format.SUMMARY])
+    return stats.duration * (1 + stats.rate_limited / max(stats.messages, 1))
+
+
+def delivery_concurrency(stats: Dict[Tuple[int, str], DeliveryStats], global_rate: float) -> int:
+    """
+    How many feeds can deliver at once without their combined request rate exceeding the global limit.
+
+    Falls back to one feed at a time until there are measurements, and halves if more than 1% of last week's
+    requests were rate limited.
+    """
+    rates = sorted(s.request_rate for s in stats.values() if s.request_rate > 0)
+    if not rates:
+        return 1
+
+    median_rate = rates[len(rates) // 2]
+    lanes = max(1, int(global_rate * 0.8 / median_rate))
+
+    messages = sum(s.messages for s in stats.values())
+    rate_limited = sum(s.rate_limited for s in stats.values())
+    if messages and rate_limited / messages > 0.01:
+        lanes = max(1, lanes // 2)
+    return lanes
+
+
+def pack_schedule_offsets(configs: List[Configuration], durations: Dict[Tuple[int, str], float],
+                          lanes: int) -> Dict[Tuple[int, str], float]:
+    """
+    Assigns start offsets by list scheduling: configs, in priority order, each start on whichever of `lanes`
+    concurrent lanes frees up first, and occupy it for their expected duration.
+    """
+    free_at = [0.0] * max(lanes, 1)
+    offsets = {}
+    for config in configs:
+        key = (config.server_id, config.brand.id)
+        start = heapq.heappop(free_at)
+        offsets[key] = start
+        heapq.heappush(free_at, start + durations[key])
+    return offsets
+
+
+def catalog_order(comic_dict: Dict[int, ComicDetails]) -> List[int]:
+    """Comic ids in the order feeds post them: issues first, then trades and hardcovers, each by title."""
+    format_order = ["Comic", "Trade Paperback", "Hardcover"]
+
+    return sorted(
+        comic_dict.keys(),
+        key=lambda x: (
+            format_order.index(comic_dict[x].format) if comic_dict[x].format in format_order else len(format_order),
+            comic_dict[x].title,
+            comic_dict[x].releaseDate,
+        )
+    )
 
 
 async def summary_embed(
@@ -0,0 +1,33 @@
+from typing import List, Optional
+
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """Discord's shard assignment for a guild."""
+    return (guild_id >> 22) % shard_count
+
+
+class ShardPlan:
+    """Which Discord shards, and therefore which feeds, this process owns."""
+
+    def __init__(self, shard_count: Optional[int] = None, shard_ids: Optional[List[int]] = None,
+                 crawl_leader: Optional[bool] = None):
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+
+        if crawl_leader is None:
+            crawl_leader = not self.sharded or 0 in shard_ids
+        self.crawl_leader = crawl_leader
+
+    @property
+    def sharded(self) -> bool:
+        return bool(self.shard_count and self.shard_ids is not None)
+
+    def owns(self, server_id: int) -> bool:
+        if not self.sharded:
+            return True
+        return shard_for_guild(server_id, self.shard_count) in self.shard_ids
+
+    def __str__(self):
+        if not self.sharded:
+            return "unsharded"
+        return f"shards {self.shard_ids} of {self.shard_count}" + (" (crawl leader)" if self.crawl_leader else "")
@@ -0,0 +1,112 @@
+import datetime as dt
+import marshal
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Union, get_args, get_origin, get_type_hints
+
+from objects.comic import Comic
+
+MAGIC = b'ZELMACAT'
+FORMAT_VERSION = 1
+
+# Magic, format version, marshal version, layout checksum, payload checksum, payload length
+HEADER = struct.Struct('<8sHHIIQ')
+
+Codec = Tuple[Callable[[Any], Any], Callable[[Any], Any]]
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _identity(value):
+    return value
+
+
+def _codec(tp, layout: List[str]) -> Codec:
+    """
+    Encoder and decoder between values of type `tp` and builtins marshal can store: dataclasses become tuples of
+    their fields, and dates become ordinals. Data that doesn't match its type hints passes through unchanged.
+    """
+    origin = get_origin(tp)
+    if origin is Union:
+        inner = [a for a in get_args(tp) if a is not type(None)]
+        return _codec(inner[0], layout) if len(inner) == 1 else (_identity, _identity)
+
+    if origin is list:
+        enc, dec = _codec(get_args(tp)[0], layout)
+        return (lambda v: [enc(i) for i in v] if isinstance(v, list) else v,
+                lambda v: [dec(i) for i in v] if isinstance(v, list) else v)
+
+    if tp is dt.date:
+        return (lambda v: v.toordinal() if isinstance(v, dt.date) else v,
+                lambda v: dt.date.fromordinal(v) if isinstance(v, int) else v)
+
+    if is_dataclass(tp):
+        hints = get_type_hints(tp)
+        names = [f.name for f in fields(tp)]
+        layout.append(f"{tp.__name__}({', '.join(f'{n}: {hints[n]}' for n in names)})")
+        codecs = [_codec(hints[n], layout) for n in names]
+
+        def encode(v):
+            return tuple(enc(getattr(v, n)) for n, (enc, _) in zip(names, codecs)) if v is not None else None
+
+        def decode(v):
+            return tp(**{n: dec(x) for n, (_, dec), x in zip(names, codecs, v)}) if v is not None else None
+
+        return encode, decode
+
+    return _identity, _identity
+
+
+_layout: List[str] = []
+_encode_comic, _decode_comic = _codec(Comic, _layout)
+# Snapshots written against a different Comic layout are rejected rather than misread
+LAYOUT_CHECKSUM = zlib.crc32('\n'.join(_layout).encode())
+
+
+def write_snapshot(path: Path, comics: Dict[str, Dict[int, Comic]], order: Dict[str, List[int]],
+                   fetched_at: Dict[str, dt.datetime]):
+    """Writes the catalog, its sort order and fetch times to `path`. The file is replaced atomically."""
+    payload = marshal.dumps((
+        {brand: [_encode_comic(c) for c in brand_comics.values()] for brand, brand_comics in comics.items()},
+        order,
+        {brand: t.timestamp() for brand, t in fetched_at.items()},
+    ))
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, marshal.version, LAYOUT_CHECKSUM, zlib.crc32(payload), len(payload))
+
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: Path) -> Tuple[Dict[str, Dict[int, Comic]], Dict[str, List[int]], Dict[str, dt.datetime]]:
+    """Reads a snapshot written by `write_snapshot`. Raises SnapshotError if it is corrupt or from another version."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise SnapshotError("Snapshot is truncated")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, version, marshal_version, layout, checksum, length = HEADER.unpack_from(mm)
+            if magic != MAGIC:
+                raise SnapshotError("Not a catalog snapshot")
+            if (version, marshal_version, layout) != (FORMAT_VERSION, marshal.version, LAYOUT_CHECKSUM):
+                raise SnapshotError(f"Snapshot is from another version (format {version}, marshal {marshal_version})")
+            if len(mm) < HEADER.size + length:
+                raise SnapshotError("Snapshot is truncated")
+
+            with memoryview(mm)[HEADER.size:HEADER.size + length] as payload:
+                if zlib.crc32(payload) != checksum:
+                    raise SnapshotError("Snapshot checksum mismatch")
+                comics, order, fetched_at = marshal.loads(payload)
+
+    return (
+        {brand: {c.id: c for c in map(_decode_comic, brand_comics)} for brand, brand_comics in comics.items()},
+        order,
+        {brand: dt.datetime.fromtimestamp(t, dt.timezone.utc) for brand, t in fetched_at.items()},
+    )
@@ -0,0 +1,83 @@
+import asyncio
+import traceback
+from time import perf_counter
+from typing import Awaitable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Stages in the order they usually finish, for the report
+STAGES = ['db', 'commands', 'catalog', 'gateway', 'feeds']
+
+
+class Startup:
+    """
+    Readiness of each startup stage, as events other tasks can await instead of polling, and when each stage began
+    and finished relative to boot.
+
+    Stages run concurrently, each waiting only on the stages it needs. A stage that is begun again (when its cog is
+    reloaded) is awaited afresh.
+    """
+
+    def __init__(self):
+        self.boot = perf_counter()
+        self.began_at: Dict[str, float] = {}
+        self.finished_at: Dict[str, float] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._reported = False
+
+    def _event(self, name: str) -> asyncio.Event:
+        # Created lazily, so the bot can be set up before its event loop runs
+        if name not in self._events:
+            self._events[name] = asyncio.Event()
+        return self._events[name]
+
+    def begin(self, name: str):
+        self.began_at[name] = perf_counter() - self.boot
+        self.finished_at.pop(name, None)
+        if name in self._events:
+            self._events[name].clear()
+
+    def done(self, name: str):
+        if self.is_done(name):
+            return
+        self.began_at.setdefault(name, 0.0)
+        self.finished_at[name] = perf_counter() - self.boot
+        self._event(name).set()
+        print(f"[Startup] {name} ready at {self.finished_at[name]:.2f}s "
+              f"(took {self.finished_at[name] - self.began_at[name]:.2f}s)")
+
+        if not self._reported and all(self.is_done(s) for s in STAGES):
+            self._reported = True
+            print(self.report())
+
+    def is_done(self, name: str) -> bool:
+        return name in self.finished_at
+
+    async def wait(self, *names: str):
+        for name in names:
+            await self._event(name).wait()
+
+    async def run(self, name: str, stage: Awaitable[T]) -> Optional[T]:
+        """Runs a stage start to finish. If it fails, it stays unfinished and whatever waits on it keeps waiting."""
+        self.begin(name)
+        try:
+            result = await stage
+        except Exception:
+            print(f"[Startup] {name} failed")
+            traceback.print_exc()
+            return None
+        self.done(name)
+        return result
+
+    def report(self) -> str:
+        names: List[str] = STAGES + [n for n in self.began_at if n not in STAGES]
+        lines = [f"[Startup] {'Stage':<10} {'Began':>7} {'Finished':>9} {'Took':>9}"]
+        for name in names:
+            began = self.began_at.get(name)
+            finished = self.finished_at.get(name)
+            lines.append(
+                f"[Startup] {name:<10} " +
+                (f"{began:>6.2f}s" if began is not None else f"{'-':>7}") + " " +
+                (f"{finished:>8.2f}s {finished - began:>8.2f}s" if finished is not None else f"{'pending':>9}")
+            )
+        return '\n'.join(lines)
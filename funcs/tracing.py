@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class Span:
+    """
+    One timed phase of a trace. Children share the root's trace id, start with their parent's attributes, and are
+    exported along with the root.
+    """
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'start', 'end', 'error', 'spans')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any],
+                 spans: List['Span']):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        # Every span of the trace, in the order they finished
+        self.spans = spans
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _Unsampled:
+    """Stands in for spans of traces that weren't sampled, so callers needn't check."""
+
+    def set(self, **attributes):
+        pass
+
+
+UNSAMPLED = _Unsampled()
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('span', default=None)
+_sampled_out: contextvars.ContextVar[bool] = contextvars.ContextVar('sampled_out', default=False)
+
+
+class JsonLinesExporter:
+    """
+    Appends every span of a finished trace to a file, one JSON object per line. On the event loop the file is written
+    from the default executor, and traces finishing while a write is under way go out together in the next one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._writer: Optional[asyncio.Task] = None
+
+    def export(self, spans: List[Span]):
+        lines = ''.join(json.dumps(s.to_dict(), default=str) + '\n' for s in spans)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._write(lines)
+
+        self._pending.append(lines)
+        if self._writer is None:
+            self._writer = loop.create_task(self._write_pending())
+
+    async def flush(self):
+        """Waits for every exported trace to be written."""
+        if self._writer is not None:
+            await asyncio.shield(self._writer)
+
+    async def _write_pending(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                lines, self._pending = ''.join(self._pending), []
+                try:
+                    await loop.run_in_executor(None, self._write, lines)
+                except OSError as e:
+                    spans = lines.count('\n')
+                    print(f"[Tracing] Couldn't export {spans} spans: {e}")
+        finally:
+            self._writer = None
+
+    def _write(self, lines: str):
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+class Tracer:
+    """
+    Times phases of work as nested spans. The current span is kept in a context variable, so spans opened in a task
+    nest under whichever span was open when the task was created.
+
+    Only `sample_rate` of root spans are recorded; the rest, and everything under them, cost a context variable check.
+    """
+
+    def __init__(self, exporter: Optional[JsonLinesExporter], sample_rate: float = 0.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current.get()
+        if parent is None:
+            if _sampled_out.get() or random.random() >= self.sample_rate:
+                token = _sampled_out.set(True)
+                try:
+                    yield UNSAMPLED
+                finally:
+                    _sampled_out.reset(token)
+                return
+            span = Span(name, os.urandom(16).hex(), None, attributes, [])
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, {**parent.attributes, **attributes}, parent.spans)
+
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.end = time.time()
+            _current.reset(token)
+            span.spans.append(span)
+            if parent is None:
+                self._export(span.spans)
+
+    def _export(self, spans: List[Span]):
+        try:
+            self.exporter.export(spans)
+        except OSError as e:
+            print(f"[Tracing] Couldn't export trace {spans[-1].trace_id}: {e}")
@@ -49,7 +49,9 @@ def f_date(date: dt.date):
 
 
 def week_of_date(comics: List[ComicDetails]) -> dt.date:
-    return min(c.releaseDate for c in comics if c.format == "Comic") if comics else dt.date.today()
+    # Weeks of only trades and hardcovers go by those
+    dates = [c.releaseDate for c in comics if c.format == "Comic"] or [c.releaseDate for c in comics]
+    return min(dates) if dates else dt.date.today()
 
 
 def is_owner(interaction: Interaction) -> bool:
@@ -0,0 +1,48 @@
+"""
+Runs the bot as PROCESS_COUNT shard processes, splitting SHARD_COUNT shards between them.
+
+The first process owns shard 0 and is the crawl leader; the others load the catalog it publishes. Each process gets an
+equal share of GLOBAL_RATE_LIMIT.
+"""
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+from config import PROCESS_COUNT, SHARD_COUNT, METRICS_PORT, GLOBAL_RATE_LIMIT
+
+
+def shard_split(shard_count: int, process_count: int):
+    return [list(range(i, shard_count, process_count)) for i in range(process_count)]
+
+
+def main():
+    if not SHARD_COUNT:
+        sys.exit("SHARD_COUNT must be set to run multiple shard processes.")
+
+    process_count = min(PROCESS_COUNT, SHARD_COUNT)
+    processes = []
+    for n, shard_ids in enumerate(shard_split(SHARD_COUNT, process_count)):
+        env = os.environ.copy()
+        env['SHARD_COUNT'] = str(SHARD_COUNT)
+        env['SHARD_IDS'] = ','.join(str(i) for i in shard_ids)
+        # Discord's global limit is per bot, so the processes split it
+        env['GLOBAL_RATE_LIMIT'] = str(GLOBAL_RATE_LIMIT / process_count)
+        if METRICS_PORT is not None:
+            env['METRICS_PORT'] = str(METRICS_PORT + n)
+        print(f"Starting process for shards {shard_ids}")
+        processes.append(subprocess.Popen([sys.executable, str(Path(__file__).parent / 'main.py')], env=env))
+
+    def stop(*_):
+        for p in processes:
+            p.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    sys.exit(max(p.wait() for p in processes))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,34 @@
 import discord
 from discord.ext import commands
 
-from config import BOT_PREFIX, TOKEN
+from config import BOT_PREFIX, TOKEN, DISPATCH_WORKERS, GLOBAL_RATE_LIMIT, SHARD_COUNT, SHARD_IDS, CRAWL_LEADER, \
+    IMAGE_CACHE_PATH, IMAGE_CACHE_MAX_BYTES, METRICS_HOST, METRICS_PORT, TRACE_SAMPLE_RATE, TRACE_PATH, \
+    PROFILE_INTERVAL, PROFILE_MEMORY_FRAMES
+from funcs.dispatcher import RateLimitTracker, DeliveryDispatcher
+from funcs.image_cache import ImageCache
+from funcs.metrics import BotMetrics, monitor_loop_lag, serve_metrics
+from funcs.profile import shutdown_compositor
+from funcs.profiler import Profiler
+from funcs.sharding import ShardPlan
+from funcs.startup import Startup
+from funcs.tracing import Tracer, JsonLinesExporter
+
+shard_plan = ShardPlan(SHARD_COUNT, SHARD_IDS, CRAWL_LEADER)
+
+
+class Zelma(commands.AutoShardedBot if shard_plan.sharded else commands.Bot):
+    async def setup_hook(self):
+        self.delivery = DeliveryDispatcher(self.rate_limits, workers=DISPATCH_WORKERS)
+        self.delivery.start()
 
+        self.image_cache = await self.loop.run_in_executor(None, ImageCache, IMAGE_CACHE_PATH, IMAGE_CACHE_MAX_BYTES)
+
+        self.metrics = BotMetrics(self)
+        self.loop.create_task(monitor_loop_lag(self.metrics.loop_lag))
+        self.metrics_runner = None
+        if METRICS_PORT is not None:
+            self.metrics_runner = await serve_metrics(self.metrics, METRICS_HOST, METRICS_PORT)
 
-class Zelma(commands.Bot):
-    async def setup_hook(self):
         initial_extensions = [
             'funcs.postgresql',
             'owner',
@@ -18,15 +41,37 @@ class Zelma(commands.Bot):
         for extension in initial_extensions:
             await bot.load_extension(extension)
 
+    async def close(self):
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        await super().close()
+        if self.tracer.exporter is not None:
+            await self.tracer.exporter.flush()
+        shutdown_compositor()
+
 
 intents = discord.Intents.default()
 
+rate_limits = RateLimitTracker(GLOBAL_RATE_LIMIT)
+
+shard_options = {'shard_count': shard_plan.shard_count, 'shard_ids': shard_plan.shard_ids} if shard_plan.sharded else {}
+
 description = "Weekly Comics"
 bot = Zelma(
     command_prefix=commands.when_mentioned_or(BOT_PREFIX),
     description=description,
     intents=intents,
-    max_messages=None)
+    max_messages=None,
+    http_trace=rate_limits.trace_config(),
+    **shard_options)
+
+bot.rate_limits = rate_limits
+bot.shard_plan = shard_plan
+bot.tracer = Tracer(JsonLinesExporter(TRACE_PATH) if TRACE_SAMPLE_RATE > 0 else None, TRACE_SAMPLE_RATE)
+bot.profiler = Profiler(PROFILE_INTERVAL, PROFILE_MEMORY_FRAMES)
+
+bot.startup = Startup()
+bot.startup.begin('gateway')
 
 bot.recent_cog = None
 
@@ -44,8 +89,10 @@ async def on_ready():
     print('Logged in as')
     print(bot.user.name)
     print(bot.user.id)
+    print(f'Running {bot.shard_plan}')
     print(discord.utils.utcnow().strftime("%d/%m/%Y %I:%M:%S:%f"))
     print('------')
+    bot.startup.done('gateway')
 
 
 @bot.check
@@ -53,4 +100,6 @@ async def globally_block_dms(ctx):
     return ctx.guild is not None
 
 
-bot.run(TOKEN, reconnect=True)
+# Compositor processes import this module too, and mustn't start a bot of their own
+if __name__ == '__main__':
+    bot.run(TOKEN, reconnect=True)
@@ -0,0 +1,64 @@
+-- Feed configurations and keyword filters, as the bot has always used them.
+-- Written to adopt existing deployments: nothing here fails if the tables are already there, unless they hold
+-- duplicate feeds, which are listed for an admin to resolve first.
+
+CREATE TABLE IF NOT EXISTS configuration (
+    server BIGINT NOT NULL,
+    brand TEXT NOT NULL,
+    format TEXT NOT NULL,
+    channel BIGINT NOT NULL,
+    day INTEGER NOT NULL,
+    ping BIGINT,
+    pin BOOLEAN NOT NULL DEFAULT FALSE,
+    check_key BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+-- The bot only ever keeps one feed per brand per server. Duplicates can differ in channel, day and format, and which
+-- one the bot has been using isn't known, so they are left for an admin to resolve rather than guessed at.
+DO $$
+DECLARE
+    conflicts TEXT;
+BEGIN
+    SELECT string_agg(format('(server %s, brand %s): %s', server, brand, feeds), E'\n' ORDER BY server, brand)
+    INTO conflicts
+    FROM (
+        SELECT server, brand,
+               string_agg(format('format %s, channel %s, day %s', format, channel, day), '; '
+                          ORDER BY channel, day, format) AS feeds
+        FROM configuration
+        GROUP BY server, brand
+        HAVING count(*) > 1
+    ) duplicates;
+
+    IF conflicts IS NOT NULL THEN
+        RAISE EXCEPTION 'configuration has several feeds for the same (server, brand); delete all but one of each:%',
+            E'\n' || conflicts;
+    END IF;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS configuration_server_brand_key ON configuration (server, brand);
+CREATE INDEX IF NOT EXISTS configuration_day_idx ON configuration (day) INCLUDE (server, brand);
+CREATE INDEX IF NOT EXISTS configuration_channel_idx ON configuration (channel);
+
+CREATE TABLE IF NOT EXISTS keywords (
+    server BIGINT NOT NULL,
+    keyword TEXT NOT NULL,
+    type INTEGER NOT NULL
+);
+
+-- Every column is part of the key, so duplicates are identical copies: keep the first of each, logging the rest
+DO $$
+DECLARE
+    removed RECORD;
+BEGIN
+    FOR removed IN
+        DELETE FROM keywords a USING keywords b
+        WHERE a.ctid > b.ctid AND a.server = b.server AND a.type = b.type AND a.keyword = b.keyword
+        RETURNING a.server, a.type, a.keyword
+    LOOP
+        RAISE NOTICE 'Removed duplicate keyword (server %, type %, keyword %)',
+            removed.server, removed.type, removed.keyword;
+    END LOOP;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS keywords_server_type_keyword_key ON keywords (server, type, keyword);
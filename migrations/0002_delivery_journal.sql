@@ -0,0 +1,19 @@
+-- Weekly delivery journal, with the measurements used to pack schedule offsets.
+
+CREATE TABLE IF NOT EXISTS delivery_journal (
+    server BIGINT NOT NULL,
+    brand TEXT NOT NULL,
+    week DATE NOT NULL,
+    status TEXT NOT NULL,
+    last_comic INTEGER,
+    lead_message BIGINT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (server, brand, week)
+);
+
+ALTER TABLE delivery_journal
+    ADD COLUMN IF NOT EXISTS duration REAL,
+    ADD COLUMN IF NOT EXISTS messages INTEGER,
+    ADD COLUMN IF NOT EXISTS rate_limited INTEGER;
+
+CREATE INDEX IF NOT EXISTS delivery_journal_week_idx ON delivery_journal (week);
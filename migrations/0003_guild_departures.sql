@@ -0,0 +1,7 @@
+-- Servers that still have configurations but the bot is no longer in, and since when.
+-- Their configurations are deleted once they have been gone for the grace period.
+
+CREATE TABLE IF NOT EXISTS guild_departure (
+    server BIGINT PRIMARY KEY,
+    missing_since TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,51 @@
+-- Every crawled weekly catalog, kept per (week, brand) after the live catalog moves on.
+
+CREATE TABLE IF NOT EXISTS archive_comic (
+    week DATE NOT NULL,
+    brand TEXT NOT NULL,
+    comic INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    issue_number TEXT,
+    format TEXT,
+    release_date DATE,
+    price REAL,
+    pages INTEGER,
+    description TEXT,
+    cover_image TEXT,
+    url TEXT,
+    series_url TEXT,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (week, brand, comic)
+);
+
+-- "When did this series last ship", and every week an issue appeared in
+CREATE INDEX IF NOT EXISTS archive_comic_series_idx ON archive_comic (series_url, release_date DESC);
+CREATE INDEX IF NOT EXISTS archive_comic_comic_idx ON archive_comic (comic);
+
+CREATE TABLE IF NOT EXISTS archive_creator (
+    week DATE NOT NULL,
+    brand TEXT NOT NULL,
+    comic INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT,
+    type TEXT,
+    url TEXT,
+    FOREIGN KEY (week, brand, comic) REFERENCES archive_comic ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS archive_creator_comic_idx ON archive_creator (week, brand, comic);
+CREATE INDEX IF NOT EXISTS archive_creator_name_idx ON archive_creator (name, week DESC);
+
+CREATE TABLE IF NOT EXISTS archive_character (
+    week DATE NOT NULL,
+    brand TEXT NOT NULL,
+    comic INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    real_name TEXT,
+    url TEXT,
+    FOREIGN KEY (week, brand, comic) REFERENCES archive_comic ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS archive_character_comic_idx ON archive_character (week, brand, comic);
+CREATE INDEX IF NOT EXISTS archive_character_name_idx ON archive_character (name, week DESC);
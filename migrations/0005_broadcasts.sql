@@ -0,0 +1,25 @@
+-- Owner broadcasts, with per-channel delivery state so an interrupted broadcast resumes where it stopped.
+
+CREATE TABLE IF NOT EXISTS broadcast (
+    id SERIAL PRIMARY KEY,
+    title TEXT,
+    message TEXT NOT NULL,
+    author BIGINT NOT NULL,
+    progress_channel BIGINT,
+    progress_message BIGINT,
+    status TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS broadcast_status_idx ON broadcast (status);
+
+CREATE TABLE IF NOT EXISTS broadcast_delivery (
+    broadcast INTEGER NOT NULL REFERENCES broadcast ON DELETE CASCADE,
+    channel BIGINT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    PRIMARY KEY (broadcast, channel)
+);
+
+CREATE INDEX IF NOT EXISTS broadcast_delivery_status_idx ON broadcast_delivery (broadcast, status);
@@ -0,0 +1,4 @@
+-- The server of each broadcast delivery, so every shard process resumes only its own servers' channels.
+-- Deliveries queued before this have none, and are left to the crawl leader.
+
+ALTER TABLE broadcast_delivery ADD COLUMN IF NOT EXISTS server BIGINT;
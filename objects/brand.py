@@ -1,123 +1,65 @@
-from enum import Enum
-from typing import Dict
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterator, List, Mapping, Optional
 
 from discord.app_commands import Choice
 
 from comic_types.brand import Brand
 
+BRANDS_PATH = Path(__file__).parent.parent / 'data' / 'brands.json'
 
-class BrandEnum(Enum):
-    Marvel = 'MARVEL'
-    DC = 'DC'
-    DarkHorse = 'DARK_HORSE'
-    IDW = 'IDW'
-    Image = 'IMAGE'
-
-
-class Marvel(Brand):
-    def __init__(self):
-        super().__init__(
-            id=BrandEnum.Marvel.value,
-            name="Marvel",
-            color=0xec1d24,
-            default_day=1,
-            autocomplete_choice=Choice(name='Marvel', value=BrandEnum.Marvel.value),
-            locg_id=2,
-        )
-
-
-class DC(Brand):
-    def __init__(self):
-        super().__init__(
-            id=BrandEnum.DC.value,
-            name="DC",
-            color=0x0074e8,
-            default_day=1,
-            autocomplete_choice=Choice(name='DC', value=BrandEnum.DC.value),
-            locg_id=1,
-        )
-
-
-class DarkHorse(Brand):
-    def __init__(self):
-        super().__init__(
-            id=BrandEnum.DarkHorse.value,
-            name="Dark Horse",
-            color=0x000000,
-            default_day=1,
-            autocomplete_choice=Choice(name='Dark Horse', value=BrandEnum.DarkHorse.value),
-            locg_id=5,
-        )
-
-
-class IDW(Brand):
-    def __init__(self):
-        super().__init__(
-            id=BrandEnum.IDW.value,
-            name="IDW",
-            color=0xf37164,
-            default_day=1,
-            autocomplete_choice=Choice(name='IDW', value=BrandEnum.IDW.value),
-            locg_id=6,
-        )
-
-
-class Image(Brand):
-    def __init__(self):
-        super().__init__(
-            id=BrandEnum.Image.value,
-            name="Image",
-            color=0xFFFFFF,
-            default_day=1,
-            autocomplete_choice=Choice(name='Image', value=BrandEnum.Image.value),
-            locg_id=7,
-        )
+# Brands the bot refers to directly, for its own colours and avatar
+MARVEL = 'MARVEL'
+DC = 'DC'
+
+
+def load_brands(path: Path = BRANDS_PATH) -> List[Brand]:
+    with open(path, encoding='utf-8') as f:
+        return [Brand(**{**b, 'color': int(b['color'], 16)}) for b in json.load(f)]
 
 
 class Brands:
-    Marvel = Marvel()
-    DC = DC()
-    DarkHorse = DarkHorse()
-    IDW = IDW()
-    Image = Image()
-
-    def __init__(self):
-        self.brands: Dict[str, Brand] = {
-            BrandEnum.Marvel.value: self.Marvel,
-            BrandEnum.DC.value: self.DC,
-            BrandEnum.DarkHorse.value: self.DarkHorse,
-            BrandEnum.IDW.value: self.IDW,
-            BrandEnum.Image.value: self.Image,
-        }
+    """
+    Every brand, loaded once from data/brands.json and shared: `Brands()` always returns the same registry. Add a
+    brand by adding it to the data file.
+    """
+    _instance: Optional['Brands'] = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._load(load_brands())
+        return cls._instance
+
+    def _load(self, brands: List[Brand]):
+        self.brands: Mapping[str, Brand] = MappingProxyType({b.id: b for b in brands})
+        self._by_locg_id: Mapping[int, Brand] = MappingProxyType({b.locg_id: b for b in brands})
+        self._by_locg_name: Mapping[str, Brand] = MappingProxyType({b.locg_publisher: b for b in brands})
 
     def __getitem__(self, item: str) -> Brand:
         return self.brands.get(item, None)
 
-    def __values__(self):
-        return self.brands.values()
-
     def __contains__(self, item: str) -> bool:
-        return item in self.brands.keys()
+        return item in self.brands
 
-    def __iter__(self):
+    def __iter__(self) -> Iterator[Brand]:
         return iter(self.brands.values())
 
+    def __len__(self):
+        return len(self.brands)
+
+    def from_locg_id(self, locg_id: int) -> Optional[Brand]:
+        return self._by_locg_id.get(locg_id)
+
     def from_locg_name(self, publisher: str) -> Brand:
         """Get brand from LOCG publisher name."""
-        if publisher == "Marvel Comics":
-            return self.Marvel
-        elif publisher == "DC Comics":
-            return self.DC
-        elif publisher == "Dark Horse Comics":
-            return self.DarkHorse
-        elif publisher == "IDW Publishing":
-            return self.IDW
-        elif publisher == "Image Comics":
-            return self.Image
-        else:
-            raise ValueError(f"Unknown LOCG publisher: {publisher}")
-
-
-BrandAutocomplete = [
+        try:
+            return self._by_locg_name[publisher]
+        except KeyError:
+            raise ValueError(f"Unknown LOCG publisher: {publisher}") from None
+
+
+BrandAutocomplete: List[Choice] = [
     brand.autocomplete_choice for brand in Brands()
 ]
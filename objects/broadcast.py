@@ -0,0 +1,109 @@
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from asyncpg import Record
+
+from funcs.database import Database
+
+
+class Status(Enum):
+    RUNNING = "running"
+    DONE = "done"
+
+
+class DeliveryStatus(Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class Broadcast:
+    def __init__(self, id_: int, title: Optional[str], message: str, author_id: int, status: Status, *,
+                 progress_channel: int = None, progress_message: int = None):
+        self.id = id_
+        self.title = title
+        self.message = message
+        self.author_id = author_id
+        self.status = status
+        self.progress_channel = progress_channel
+        self.progress_message = progress_message
+
+
+def broadcast_from_record(record: Record):
+    return Broadcast(
+        record['id'],
+        record['title'],
+        record['message'],
+        record['author'],
+        Status(record['status']),
+        progress_channel=record['progress_channel'],
+        progress_message=record['progress_message']
+    )
+
+
+async def create_broadcast(db: Database, title: Optional[str], message: str, author_id: int,
+                           channels: Dict[int, int]) -> Broadcast:
+    """Stores a broadcast with a pending delivery for each channel, given as channel id: server id."""
+    async with db.acquire() as conn:
+        async with conn.transaction():
+            record = await conn.fetchrow(
+                "INSERT INTO broadcast (title, message, author, status) VALUES ($1, $2, $3, $4) RETURNING *",
+                title, message, author_id, Status.RUNNING.value
+            )
+            await conn.copy_records_to_table(
+                'broadcast_delivery',
+                records=[(record['id'], c, server, DeliveryStatus.PENDING.value) for c, server in channels.items()],
+                columns=['broadcast', 'channel', 'server', 'status']
+            )
+    return broadcast_from_record(record)
+
+
+async def set_progress_message(db: Database, broadcast: Broadcast, channel_id: int, message_id: int):
+    broadcast.progress_channel, broadcast.progress_message = channel_id, message_id
+    await db.execute(
+        "UPDATE broadcast SET progress_channel = $2, progress_message = $3 WHERE id = $1",
+        broadcast.id, channel_id, message_id
+    )
+
+
+async def fetch_running_broadcasts(db: Database) -> List[Broadcast]:
+    records = await db.fetch('SELECT * FROM broadcast WHERE status = $1 ORDER BY id', Status.RUNNING.value)
+    return [broadcast_from_record(r) for r in records]
+
+
+async def fetch_pending_channels(db: Database, broadcast_id: int) -> Dict[int, Optional[int]]:
+    """Channels still to be sent to, as channel id: server id."""
+    records = await db.fetch(
+        'SELECT channel, server FROM broadcast_delivery WHERE broadcast = $1 AND status = $2',
+        broadcast_id, DeliveryStatus.PENDING.value
+    )
+    return {r['channel']: r['server'] for r in records}
+
+
+async def record_deliveries(db: Database, broadcast_id: int,
+                            results: List[Tuple[int, DeliveryStatus, Optional[str]]]):
+    """Saves the outcome of a batch of deliveries, as (channel, status, error), in one statement."""
+    await db.execute(
+        "UPDATE broadcast_delivery d SET status = r.status, error = r.error " +
+        "FROM unnest($2::BIGINT[], $3::TEXT[], $4::TEXT[]) AS r (channel, status, error) " +
+        "WHERE d.broadcast = $1 AND d.channel = r.channel",
+        broadcast_id, [c for c, _, _ in results], [s.value for _, s, _ in results], [e for _, _, e in results]
+    )
+
+
+async def count_deliveries(db: Database, broadcast_id: int) -> Dict[DeliveryStatus, int]:
+    records = await db.fetch(
+        'SELECT status, count(*) AS n FROM broadcast_delivery WHERE broadcast = $1 GROUP BY status',
+        broadcast_id
+    )
+    counts = {s: 0 for s in DeliveryStatus}
+    counts.update({DeliveryStatus(r['status']): r['n'] for r in records})
+    return counts
+
+
+async def finish_broadcast(db: Database, broadcast: Broadcast):
+    broadcast.status = Status.DONE
+    await db.execute(
+        "UPDATE broadcast SET status = $2, finished_at = now() WHERE id = $1",
+        broadcast.id, Status.DONE.value
+    )
@@ -0,0 +1,60 @@
+import datetime as dt
+from typing import Dict, List
+
+from asyncpg import Record
+
+from funcs.database import Database
+from objects.comic import Comic
+
+COMIC_COLUMNS = ['week', 'brand', 'comic', 'position', 'title', 'issue_number', 'format', 'release_date', 'price',
+                 'pages', 'description', 'cover_image', 'url', 'series_url']
+CREATOR_COLUMNS = ['week', 'brand', 'comic', 'name', 'role', 'type', 'url']
+CHARACTER_COLUMNS = ['week', 'brand', 'comic', 'name', 'real_name', 'url']
+
+
+async def archive_catalog(db: Database, brand_id: str, week: dt.date, comics: Dict[int, Comic], order: List[int]):
+    """
+    Replaces the archived catalog of a brand's week with `comics`, in `order`. Rows are bulk loaded with COPY, in
+    one transaction, so readers see either the old catalog or the new one.
+    """
+    comic_rows, creator_rows, character_rows = [], [], []
+    for position, comic_id in enumerate(order):
+        c = comics[comic_id]
+        comic_rows.append((week, brand_id, c.id, position, c.title, c.issueNumber, c.format, c.releaseDate,
+                           c.price, c.pages, c.description, c.coverImage, c.url, c.seriesUrl))
+        creator_rows += [(week, brand_id, c.id, p.name, p.role, p.type, p.url) for p in c.creators or []]
+        character_rows += [(week, brand_id, c.id, p.name, p.realName, p.url) for p in c.characters or []]
+
+    async with db.acquire() as conn:
+        async with conn.transaction():
+            # Creators and characters cascade
+            await conn.execute('DELETE FROM archive_comic WHERE week = $1 AND brand = $2', week, brand_id)
+            await conn.copy_records_to_table('archive_comic', records=comic_rows, columns=COMIC_COLUMNS)
+            await conn.copy_records_to_table('archive_creator', records=creator_rows, columns=CREATOR_COLUMNS)
+            await conn.copy_records_to_table('archive_character', records=character_rows, columns=CHARACTER_COLUMNS)
+
+
+class ArchivedComic:
+    """A comic from the archive, with what summaries show of it."""
+
+    def __init__(self, record: Record):
+        self.id = record['comic']
+        self.title = record['title']
+        self.format = record['format']
+        self.releaseDate = record['release_date']
+        self.url = record['url']
+        self.writer = record['writer'] or ''
+
+    @property
+    def more(self) -> str:
+        return self.url
+
+
+async def fetch_archived_week(db: Database, brand_id: str, week: dt.date) -> List[ArchivedComic]:
+    """A brand's archived catalog of the week within three days of `week`, in feed order."""
+    return [ArchivedComic(r) for r in await db.fetch_prepared('archive_week', week, brand_id)]
+
+
+async def fetch_series_releases(db: Database, series_url: str, limit: int = 10) -> List[Record]:
+    """The most recent archived releases of a series, latest first."""
+    return await db.fetch_prepared('archive_series_releases', series_url, limit)
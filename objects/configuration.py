@@ -1,10 +1,12 @@
 import datetime as dt
 from enum import Enum
+from typing import Optional
 
 import discord
-from asyncpg import Record, Pool
+from asyncpg import Record
 from discord import app_commands, utils
 
+from funcs.database import Database
 from objects.brand import Brands
 from comic_types.brand import Brand
 
@@ -15,12 +17,14 @@ class Format(Enum):
     FULL = "Full"
     COMPACT = "Compact"
     SUMMARY = "Summary"
+    COLLAGE = "Collage"
 
 
 format_autocomplete = [
     app_commands.Choice(name='Full', value='Full'),
     app_commands.Choice(name='Compact', value='Compact'),
-    app_commands.Choice(name='Summary', value='Summary')
+    app_commands.Choice(name='Summary', value='Summary'),
+    app_commands.Choice(name='Collage', value='Collage')
 ]
 
 
@@ -57,7 +61,7 @@ class Configuration:
         embed.set_footer(text=f"{self.server_id} · {self.brand.name}")
         return embed
 
-    async def upload_to_sql(self, db: Pool):
+    async def upload_to_sql(self, db: Database):
         await db.execute(
             "INSERT INTO configuration " +
             "(server, brand, format, channel, day, ping, pin, check_key) " +
@@ -66,7 +70,7 @@ class Configuration:
             self.check_keywords
         )
 
-    async def edit_sql(self, db: Pool):
+    async def edit_sql(self, db: Database):
         await db.execute(
             "UPDATE configuration " +
             "SET format = $3, channel = $4, day = $5, ping = $6, pin = $7, check_key = $8 " +
@@ -75,7 +79,7 @@ class Configuration:
             self.format.name, self.channel_id, self.day, self.ping, self.pin, self.check_keywords
         )
 
-    async def delete_from_sql(self, db: Pool):
+    async def delete_from_sql(self, db: Database):
         await db.execute(
             "DELETE FROM configuration WHERE server = $1 AND brand = $2",
             self.server_id, self.brand.id
@@ -107,3 +111,32 @@ def next_scheduled(day: int):
 
 def prev_scheduled(day: int):
     return next_scheduled(day) - dt.timedelta(days=7)
+
+
+def next_feed_time(day: int, offset: float, after: Optional[dt.datetime] = None) -> dt.datetime:
+    """
+    Next fire time of a feed on `day`, `offset` seconds into the day. Always later than `after`, if given.
+
+    This week's run stays ahead until its offset passes, even once the feed day has begun.
+    """
+    scheduled_time = prev_scheduled(day) + dt.timedelta(seconds=offset)
+    if scheduled_time <= utils.utcnow():
+        scheduled_time += dt.timedelta(days=7)
+
+    if after is not None and scheduled_time <= after:
+        scheduled_time += dt.timedelta(days=7)
+    return scheduled_time
+
+
+def last_feed_time(day: int, offset: float) -> dt.datetime:
+    """Latest fire time of a feed on `day`, `offset` seconds into the day, that has already passed."""
+    scheduled_time = prev_scheduled(day) + dt.timedelta(seconds=offset)
+    if scheduled_time > utils.utcnow():
+        scheduled_time -= dt.timedelta(days=7)
+    return scheduled_time
+
+
+def scheduled_week(day: int, when: dt.datetime) -> dt.date:
+    """The date of the feed weekday a run at `when` belongs to."""
+    date = when.date()
+    return date - dt.timedelta(days=(date.weekday() - day) % 7)
@@ -0,0 +1,242 @@
+import asyncio
+import copy
+import json
+import traceback
+import uuid
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from asyncpg import Connection
+
+from funcs.database import Database
+from objects.configuration import Configuration, config_from_record
+
+Key = Tuple[int, str]
+
+NOTIFY_CHANNEL = 'configuration_changed'
+
+# Postgres caps NOTIFY payloads at 8000 bytes
+_MAX_SERVERS_PER_NOTIFY = 300
+
+
+class ConfigurationStore:
+    """
+    Every feed configuration, held in memory and indexed by server, (server, brand), channel and day.
+
+    Reads never touch the database. Writes go through the store, which updates Postgres, its own indexes, and then
+    notifies other instances so they refresh the affected rows. Returned configurations are shared, so change them
+    with `update` rather than setting attributes directly. Rows refreshed from other instances replace the stored
+    configurations, so anything keeping configurations around should look them up again from its refresh listener.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.instance_id = uuid.uuid4().hex
+
+        self._by_key: Dict[Key, Configuration] = {}
+        self._by_server: Dict[int, Dict[str, Configuration]] = {}
+        self._by_channel: Dict[int, Dict[Key, Configuration]] = {}
+        self._by_day: Dict[int, Dict[Key, Configuration]] = {}
+
+        self._connect: Optional[Callable[[], Awaitable[Connection]]] = None
+        self._listener: Optional[Connection] = None
+        self._refresh_listeners: List[Callable[[Set[Key]], None]] = []
+        self._subscriptions: Dict[str, Callable[[str], None]] = {}
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def all(self) -> List[Configuration]:
+        return list(self._by_key.values())
+
+    def get(self, server_id: int, brand_id: str) -> Optional[Configuration]:
+        return self._by_key.get((server_id, brand_id))
+
+    def for_server(self, server_id: int) -> Dict[str, Configuration]:
+        return dict(self._by_server.get(server_id, {}))
+
+    def for_channel(self, channel_id: int) -> List[Configuration]:
+        return list(self._by_channel.get(channel_id, {}).values())
+
+    def for_day(self, day: int) -> List[Configuration]:
+        return list(self._by_day.get(day, {}).values())
+
+    def servers(self) -> Set[int]:
+        return set(self._by_server)
+
+    def channels(self) -> Set[int]:
+        return set(self._by_channel)
+
+    # Indexes
+
+    def _index(self, config: Configuration):
+        key = (config.server_id, config.brand.id)
+        self._unindex(key)
+        self._by_key[key] = config
+        self._by_server.setdefault(config.server_id, {})[config.brand.id] = config
+        self._by_channel.setdefault(config.channel_id, {})[key] = config
+        self._by_day.setdefault(config.day, {})[key] = config
+
+    def _unindex(self, key: Key) -> Optional[Configuration]:
+        config = self._by_key.pop(key, None)
+        if config is None:
+            return None
+        for index, value in [(self._by_server, config.server_id),
+                             (self._by_channel, config.channel_id),
+                             (self._by_day, config.day)]:
+            entries = index.get(value, {})
+            entries.pop(config.brand.id if index is self._by_server else key, None)
+            if not entries:
+                index.pop(value, None)
+        return config
+
+    async def load(self) -> Set[Key]:
+        """Replaces every configuration with the database's. Returns the keys of those removed or loaded."""
+        records = await self.db.fetch('SELECT * FROM configuration')
+        keys = set(self._by_key)
+        for k in list(self._by_key):
+            self._unindex(k)
+        for r in records:
+            config = config_from_record(r)
+            if config.brand is not None:
+                self._index(config)
+                keys.add((config.server_id, config.brand.id))
+        return keys
+
+    # Writes
+
+    async def add(self, config: Configuration):
+        await config.upload_to_sql(self.db)
+        self._index(config)
+        await self._notify('upsert', [config.server_id], config.brand.id)
+
+    async def update(self, config: Configuration, **attributes):
+        """Sets `attributes` on a stored configuration and saves it. Nothing changes if the save fails."""
+        edited = copy.copy(config)
+        for a, v in attributes.items():
+            setattr(edited, a, v)
+        await edited.edit_sql(self.db)
+
+        self._unindex((config.server_id, config.brand.id))
+        for a, v in attributes.items():
+            setattr(config, a, v)
+        self._index(config)
+        await self._notify('upsert', [config.server_id], config.brand.id)
+
+    async def delete(self, config: Configuration):
+        await config.delete_from_sql(self.db)
+        self._unindex((config.server_id, config.brand.id))
+        await self._notify('delete', [config.server_id], config.brand.id)
+
+    async def delete_servers(self, server_ids: Iterable[int]) -> List[Configuration]:
+        """Deletes every configuration of the given servers in one statement. Returns the deleted configurations."""
+        server_ids = list(server_ids)
+        await self.db.execute('DELETE FROM configuration WHERE server = ANY($1)', server_ids)
+
+        deleted = []
+        for server_id in server_ids:
+            for brand_id in list(self._by_server.get(server_id, {})):
+                deleted.append(self._unindex((server_id, brand_id)))
+
+        for i in range(0, len(server_ids), _MAX_SERVERS_PER_NOTIFY):
+            await self._notify('delete', server_ids[i:i + _MAX_SERVERS_PER_NOTIFY])
+        return deleted
+
+    # Notifications
+
+    async def _notify(self, op: str, server_ids: List[int], brand_id: str = None):
+        payload = json.dumps({'op': op, 'servers': server_ids, 'brand': brand_id, 'origin': self.instance_id})
+        await self.db.execute('SELECT pg_notify($1, $2)', NOTIFY_CHANNEL, payload)
+
+    async def listen(self, connect: Callable[[], Awaitable[Connection]]):
+        """Follows other instances' changes on a dedicated connection, reconnecting (and reloading) if it drops."""
+        self._connect = connect
+        self._listener = await connect()
+        await self._listener.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        for channel in self._subscriptions:
+            await self._listener.add_listener(channel, self._on_subscribed)
+        self._listener.add_termination_listener(self._on_terminate)
+
+    async def close(self):
+        if self._listener is not None:
+            self._connect = None
+            await self._listener.close()
+            self._listener = None
+
+    async def subscribe(self, channel: str, callback: Callable[[str], None]):
+        """
+        Follows another notification channel on the store's listener connection, so other parts of the bot needn't
+        hold a connection of their own. `callback` gets each payload, including this instance's own.
+        """
+        self._subscriptions[channel] = callback
+        if self._listener is not None:
+            await self._listener.add_listener(channel, self._on_subscribed)
+
+    async def unsubscribe(self, channel: str):
+        if self._subscriptions.pop(channel, None) is not None and self._listener is not None:
+            await self._listener.remove_listener(channel, self._on_subscribed)
+
+    def _on_subscribed(self, _connection, _pid, channel: str, payload: str):
+        try:
+            self._subscriptions[channel](payload)
+        except Exception:
+            traceback.print_exc()
+
+    def add_refresh_listener(self, callback: Callable[[Set[Key]], None]):
+        """Calls `callback` with the keys of the configurations refreshed or removed by other instances' changes."""
+        self._refresh_listeners.append(callback)
+
+    def remove_refresh_listener(self, callback: Callable[[Set[Key]], None]):
+        if callback in self._refresh_listeners:
+            self._refresh_listeners.remove(callback)
+
+    def _refreshed(self, keys: Set[Key]):
+        for callback in self._refresh_listeners:
+            try:
+                callback(keys)
+            except Exception:
+                traceback.print_exc()
+
+    def _on_notify(self, _connection, _pid, _channel, payload: str):
+        message = json.loads(payload)
+        if message['origin'] == self.instance_id:
+            return
+        asyncio.get_event_loop().create_task(self._refresh(message['servers'], message['brand']))
+
+    async def _refresh(self, server_ids: List[int], brand_id: Optional[str]):
+        try:
+            if brand_id is None:
+                records = await self.db.fetch_prepared('configuration_by_servers', server_ids)
+            else:
+                records = await self.db.fetch_prepared('configuration_by_servers_brand', server_ids, brand_id)
+
+            keys: Set[Key] = set()
+            for server_id in server_ids:
+                brands = [brand_id] if brand_id else list(self._by_server.get(server_id, {}))
+                for b in brands:
+                    self._unindex((server_id, b))
+                    keys.add((server_id, b))
+            for r in records:
+                config = config_from_record(r)
+                if config.brand is not None:
+                    self._index(config)
+                    keys.add((config.server_id, config.brand.id))
+        except Exception:
+            traceback.print_exc()
+            return
+        self._refreshed(keys)
+
+    def _on_terminate(self, _connection):
+        if self._connect is not None:
+            asyncio.get_event_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while self._connect is not None:
+            try:
+                await self.listen(self._connect)
+                # Notifications sent while disconnected are lost
+                self._refreshed(await self.load())
+                print("[Configuration Store] Reconnected listener and reloaded configurations")
+                return
+            except Exception:
+                traceback.print_exc()
+                await asyncio.sleep(5)
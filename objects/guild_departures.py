@@ -0,0 +1,21 @@
+import datetime as dt
+from typing import Dict, Iterable
+
+from funcs.database import Database
+
+
+async def fetch_guild_departures(db: Database) -> Dict[int, dt.datetime]:
+    records = await db.fetch('SELECT server, missing_since FROM guild_departure')
+    return {r['server']: r['missing_since'] for r in records}
+
+
+async def record_guild_departures(db: Database, server_ids: Iterable[int]):
+    """Starts the grace period of each server, unless it has already started."""
+    await db.execute(
+        "INSERT INTO guild_departure (server) SELECT unnest($1::BIGINT[]) ON CONFLICT (server) DO NOTHING",
+        list(server_ids)
+    )
+
+
+async def clear_guild_departures(db: Database, server_ids: Iterable[int]):
+    await db.execute('DELETE FROM guild_departure WHERE server = ANY($1)', list(server_ids))
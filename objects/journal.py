@@ -0,0 +1,102 @@
+import datetime as dt
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+from asyncpg import Record
+
+from funcs.database import Database
+
+
+# Schema version that created the journal table
+JOURNAL_MIGRATION = 2
+
+
+class Status(Enum):
+    SENDING = "sending"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JournalEntry:
+    def __init__(self, server_id: int, brand_id: str, week: dt.date, status: Status, *,
+                 last_comic: int = None, lead_message: int = None):
+        self.server_id = server_id
+        self.brand_id = brand_id
+        self.week = week
+        self.status = status
+        self.last_comic = last_comic
+        self.lead_message = lead_message
+
+    @property
+    def finished(self) -> bool:
+        return self.status in [Status.DONE, Status.FAILED]
+
+
+class DeliveryStats:
+    def __init__(self, duration: float, messages: int, rate_limited: int):
+        self.duration = duration
+        self.messages = messages
+        self.rate_limited = rate_limited
+
+    @property
+    def request_rate(self) -> float:
+        return self.messages / self.duration if self.duration > 0 else 0.0
+
+
+def journal_from_record(record: Record):
+    return JournalEntry(
+        record['server'],
+        record['brand'],
+        record['week'],
+        Status(record['status']),
+        last_comic=record['last_comic'],
+        lead_message=record['lead_message']
+    )
+
+
+async def fetch_journal_entry(db: Database, server_id: int, brand_id: str, week: dt.date) -> Optional[JournalEntry]:
+    record = await db.fetchrow_prepared('journal_entry', server_id, brand_id, week)
+    return journal_from_record(record) if record else None
+
+
+async def fetch_journal_since(db: Database, since: dt.date) -> Dict[Tuple[int, str, dt.date], JournalEntry]:
+    records = await db.fetch('SELECT * FROM delivery_journal WHERE week >= $1', since)
+    entries = [journal_from_record(r) for r in records]
+    return {(e.server_id, e.brand_id, e.week): e for e in entries}
+
+
+async def start_delivery(db: Database, server_id: int, brand_id: str, week: dt.date, lead_message: int = None):
+    await db.execute(
+        "INSERT INTO delivery_journal (server, brand, week, status, lead_message) " +
+        "VALUES ($1, $2, $3, $4, $5) " +
+        "ON CONFLICT (server, brand, week) DO UPDATE " +
+        "SET status = $4, lead_message = $5, last_comic = NULL, updated_at = now()",
+        server_id, brand_id, week, Status.SENDING.value, lead_message
+    )
+
+
+async def record_progress(db: Database, server_id: int, brand_id: str, week: dt.date, last_comic: int):
+    await db.execute_prepared('journal_progress', server_id, brand_id, week, last_comic)
+
+
+async def finish_delivery(db: Database, server_id: int, brand_id: str, week: dt.date, status: Status = Status.DONE,
+                          stats: DeliveryStats = None):
+    duration, messages, rate_limited = (stats.duration, stats.messages, stats.rate_limited) if stats else (None,) * 3
+    await db.execute(
+        "INSERT INTO delivery_journal (server, brand, week, status, duration, messages, rate_limited) " +
+        "VALUES ($1, $2, $3, $4, $5, $6, $7) " +
+        "ON CONFLICT (server, brand, week) DO UPDATE " +
+        "SET status = $4, duration = $5, messages = $6, rate_limited = $7, updated_at = now()",
+        server_id, brand_id, week, status.value, duration, messages, rate_limited
+    )
+
+
+async def fetch_delivery_stats(db: Database) -> Dict[Tuple[int, str], DeliveryStats]:
+    """The most recent measured delivery of each feed."""
+    records = await db.fetch(
+        "SELECT DISTINCT ON (server, brand) server, brand, duration, messages, rate_limited " +
+        "FROM delivery_journal WHERE status = $1 AND duration IS NOT NULL " +
+        "ORDER BY server, brand, week DESC",
+        Status.DONE.value
+    )
+    return {(r['server'], r['brand']): DeliveryStats(r['duration'], r['messages'], r['rate_limited']) for r in records}
@@ -1,8 +1,9 @@
 from enum import Enum
 from typing import List
 
-from asyncpg import Record, Pool
+from asyncpg import Record
 
+from funcs.database import Database
 from objects.comic import Comic
 
 
@@ -57,12 +58,12 @@ def keywords_from_records(records: List[Record], server_id: int):
     )
 
 
-async def fetch_keywords(db: Pool, server_id: int):
-    kw = await db.fetch('SELECT * FROM keywords WHERE server = $1', server_id)
+async def fetch_keywords(db: Database, server_id: int):
+    kw = await db.fetch_prepared('keywords_by_server', server_id)
     return keywords_from_records(kw, server_id)
 
 
-async def add_keyword(db: Pool, server_id: int, keyword: str, _type: Types):
+async def add_keyword(db: Database, server_id: int, keyword: str, _type: Types):
     keyword = sanitise(keyword)
     kw = await db.fetch('SELECT * FROM keywords WHERE server = $1 AND keyword = $2 AND type = $3',
                         server_id, keyword, _type.value)
@@ -74,7 +75,7 @@ async def add_keyword(db: Pool, server_id: int, keyword: str, _type: Types):
     return True
 
 
-async def delete_keyword(db: Pool, server_id: int, keyword: str, _type: Types):
+async def delete_keyword(db: Database, server_id: int, keyword: str, _type: Types):
     keyword = sanitise(keyword)
     kw = await db.fetch('SELECT * FROM keywords WHERE server = $1 AND keyword = $2 AND type = $3',
                         server_id, keyword, _type.value)
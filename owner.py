@@ -1,4 +1,5 @@
 import traceback
+from io import BytesIO
 from typing import Optional, Literal
 
 import discord
@@ -6,6 +7,7 @@ from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands import Context, Greedy
 
+from funcs.profiler import TARGETS, profile_files
 from funcs.utils import is_owner
 from config import ADMIN_GUILD_IDS
 
@@ -17,7 +19,7 @@ class OwnerCog(commands.Cog, name="Owner"):
         self.bot = bot
 
         self.bot.cmds = {}
-        self.bot.loop.create_task(self.load_cmds())
+        self.bot.loop.create_task(self.bot.startup.run('commands', self.load_cmds()))
 
     async def load_cmds(self):
         cmds = await self.bot.tree.fetch_commands()
@@ -26,6 +28,11 @@ class OwnerCog(commands.Cog, name="Owner"):
     async def cog_check(self, ctx):
         return await self.bot.is_owner(ctx.author)
 
+    @commands.command()
+    async def startup(self, ctx):
+        """Shows how long each startup stage took"""
+        await ctx.send(f"```\n{self.bot.startup.report()}\n```")
+
     @commands.command()
     async def shutdown(self, ctx):
         """Shuts down the bot"""
@@ -176,6 +183,43 @@ class OwnerCog(commands.Cog, name="Owner"):
 
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="profile")
+    @app_commands.guilds(*ADMIN_GUILD_IDS or None)
+    @app_commands.check(is_owner)
+    @app_commands.describe(
+        until="What to profile. Crawls and feed batches are profiled from when the next one starts.",
+        seconds="How long to profile for, or the most to profile a crawl or feed batch for.",
+        memory="Also trace allocations with tracemalloc, which slows the bot down while profiling.",
+        top="How many functions, stacks and allocation lines to list."
+    )
+    @app_commands.choices(until=[app_commands.Choice(name=v.capitalize(), value=k) for k, v in TARGETS.items()])
+    async def profile(self, interaction: discord.Interaction, until: str = 'time',
+                      seconds: app_commands.Range[int, 1, 3600] = 60, memory: bool = True,
+                      top: app_commands.Range[int, 5, 200] = 30):
+        """Profiles the bot's CPU and memory use, dev-only."""
+        try:
+            session = self.bot.profiler.start(until, seconds, memory, top)
+        except RuntimeError as e:
+            return await interaction.response.send_message(str(e), ephemeral=True)
+
+        await interaction.response.send_message(f"Profiling {session.description}…")
+        await session.done.wait()
+
+        # The interaction's followups expire after 15 minutes, so the results go to the channel
+        files = [discord.File(BytesIO(data), filename=name) for name, data in profile_files(session).items()]
+        await interaction.channel.send(f"{interaction.user.mention} Profile of {session.description} finished.",
+                                       files=files)
+
+    @app_commands.command(name="profile-stop")
+    @app_commands.guilds(*ADMIN_GUILD_IDS or None)
+    @app_commands.check(is_owner)
+    async def profile_stop(self, interaction: discord.Interaction):
+        """Ends the running profile early, dev-only."""
+        session = self.bot.profiler.stop()
+        if session is None:
+            return await interaction.response.send_message("Nothing is being profiled.", ephemeral=True)
+        await interaction.response.send_message(f"Stopped profiling {session.description}.")
+
 
 async def setup(bot):
     await bot.add_cog(OwnerCog(bot))
@@ -3,8 +3,9 @@ import copy
 import datetime as dt
 import random
 import traceback
-from asyncio import Task
-from typing import Dict, List, Any, Union, Tuple
+from io import BytesIO
+from time import perf_counter
+from typing import Dict, List, Any, Union, Tuple, Optional, Set
 
 from discord import Interaction, app_commands, utils, Activity, ActivityType, Forbidden, Embed, File, \
     TextChannel, Role
@@ -12,19 +13,31 @@ from discord.app_commands import checks
 from discord.ext import commands
 
 from comic_types.brand import Brand
-from comic_types.locg import ComicDetails
-from config import ADMIN_GUILD_IDS
+from config import ADMIN_GUILD_IDS, CATCHUP_WINDOW_HOURS, CATCHUP_BATCH_SIZE, CATCHUP_BATCH_INTERVAL, \
+    CATALOG_SNAPSHOT_PATH, CATALOG_POLL_INTERVAL, GLOBAL_RATE_LIMIT, CRAWL_MAX_AGE, FEED_FRESHNESS, CRAWL_LEAD, \
+    VALIDATION_BATCH_SIZE, GUILD_GRACE_PERIOD, GUILD_RECONCILE_INTERVAL, FEED_REPLAN_LEAD
+from funcs.collage import CollageRenderer
+from funcs.crawl import CrawlCoordinator
+from funcs.feed_scheduler import FeedScheduler
+from funcs.snapshot import write_snapshot, read_snapshot
 from funcs.utils import f_date, week_of_date, is_owner
-from funcs.discord_functions import on_app_command_error, cmd_ping, pin, profile_pic
-from funcs.pull_functions import validate_config_accessibility, summary_embed
-from funcs.postgresql import fetch_configs
-from objects.brand import Brands, BrandEnum, BrandAutocomplete, Marvel
+from funcs.discord_functions import on_app_command_error, cmd_ping, profile_pic
+from funcs.pull_functions import validate_configs_batched, summary_embed, estimate_duration, \
+    delivery_concurrency, pack_schedule_offsets, catalog_order
+from objects.brand import Brands, BrandAutocomplete, MARVEL, DC
+from objects.catalog_archive import archive_catalog, fetch_archived_week, fetch_series_releases
 from objects.comic import Comic, ComicMessage
-from objects.configuration import Configuration, Format, config_from_record, format_autocomplete, \
-    WEEKDAYS, next_scheduled
+from objects.configuration import Configuration, Format, format_autocomplete, \
+    WEEKDAYS, next_scheduled, scheduled_week, next_feed_time, last_feed_time
+from objects.journal import JOURNAL_MIGRATION, fetch_journal_entry, fetch_journal_since, start_delivery, \
+    record_progress, finish_delivery, fetch_delivery_stats, Status, DeliveryStats
+from objects.guild_departures import fetch_guild_departures, record_guild_departures, clear_guild_departures
 from objects.keywords import fetch_keywords
 from services.comic_releases import fetch_comic_releases_detailed
 
+# Followers ask the crawl leader to refetch the comics on this notification channel
+REFETCH_CHANNEL = 'refetch_comics'
+
 
 class PullsCog(commands.Cog, name="Pulls"):
     def __init__(self, bot):
@@ -40,49 +53,172 @@ class PullsCog(commands.Cog, name="Pulls"):
         self.locks: Dict[int, asyncio.Lock] = {}
 
         self.schedule_offsets: Dict[Tuple[int, str], float] = {}
+        self.journal_existed = False
+
+        self.crawler = CrawlCoordinator(self.crawl_brands)
+        self.snapshot_mtime: Optional[float] = None
+        self.collages = CollageRenderer(self.bot.image_cache)
 
-        self.feed_schedules: Dict[(int, str), Task] = {}
+        self.feed_scheduler = FeedScheduler(self.run_feed)
+        self.feed_scheduler.start(self.bot.loop)
+
+        # The catalog starts empty again when the cog is reloaded
+        self.bot.startup.begin('catalog')
+        self.bot.startup.begin('feeds')
+        self.warm_start_task = self.bot.loop.create_task(self.warm_start())
         self.bot.loop.create_task(self.on_startup_scheduler())
 
+    async def cog_unload(self):
+        self.feed_scheduler.stop()
+        if hasattr(self.bot, 'configs'):
+            self.bot.configs.remove_refresh_listener(self.configs_refreshed)
+            await self.bot.configs.unsubscribe(REFETCH_CHANNEL)
+
     async def check_lock(self, id_: int):
         async with self.access_lock:
             if id_ not in self.locks:
                 self.locks[id_] = asyncio.Lock()
 
     async def on_startup_scheduler(self):
-        while not self.bot.postgresql_loaded:
-            await asyncio.sleep(0.1)
-        self.bot.loop.create_task(self.schedule_feeds())
-        self.bot.loop.create_task(self.schedule_crawl())
         self.bot.loop.create_task(self.schedule_pfp())
         self.bot.loop.create_task(self.schedule_activity())
 
+        await self.bot.startup.wait('db')
+        self.bot.configs.add_refresh_listener(self.configs_refreshed)
+        if self.bot.shard_plan.crawl_leader:
+            await self.bot.configs.subscribe(REFETCH_CHANNEL, self.refetch_requested)
+        self.journal_existed = JOURNAL_MIGRATION not in [m.version for m in self.bot.migrations_applied]
+        self.bot.loop.create_task(self.schedule_feeds())
+        self.bot.loop.create_task(self.schedule_replans())
+        self.bot.loop.create_task(self.schedule_crawl())
+        self.bot.loop.create_task(self.schedule_reconcile())
+
     async def schedule_crawl(self):
+        """
+        Keeps the catalog fresh: crawls whenever it is older than CRAWL_MAX_AGE, and just ahead of each feed batch
+        whose brands would otherwise go out with data older than FEED_FRESHNESS.
+        """
+        # Whatever the snapshot restored doesn't need crawling again
+        await self.warm_start_task
+
+        if not self.bot.shard_plan.crawl_leader:
+            return await self.follow_shared_catalog()
+
         while not self.bot.is_closed():
-            print(f"Starting scheduled crawl.")
             try:
-                await self.fetch_comics()
+                await self.crawler.ensure_fresh([b.id for b in self.brands], CRAWL_MAX_AGE)
             except Exception:
                 traceback.print_exc()
 
-            # Calculate next scheduled time (11:45 UTC or 23:45 UTC)
             now = utils.utcnow()
-            today = now.date()
-            times = [(11, 45), (23, 45)]
-            target_times = [dt.datetime.combine(today, dt.time(*t), tzinfo=dt.timezone.utc) for t in times]
-            target_times.append(
-                dt.datetime.combine(today + dt.timedelta(days=1), dt.time(*times[0]), tzinfo=dt.timezone.utc))
-
-            next_time = next(t for t in target_times if t > now)
+            next_time = min(self.crawler.fetched_at.values(), default=now) + CRAWL_MAX_AGE
+
+            batch = self.next_feed_batch()
+            if batch is not None:
+                batch_time, brand_ids = batch
+                if self.crawler.stale(brand_ids, FEED_FRESHNESS, at=batch_time):
+                    if batch_time - CRAWL_LEAD <= now:
+                        print(f"Crawling ahead of the feed batch at {batch_time.strftime('%Y-%m-%d %H:%M:%S UTC')}.")
+                        try:
+                            await self.crawler.ensure_fresh(brand_ids, FEED_FRESHNESS, at=batch_time)
+                        except Exception:
+                            traceback.print_exc()
+                    else:
+                        next_time = min(next_time, batch_time - CRAWL_LEAD)
+
+            # Anything still due now failed to crawl, so wait until the coordinator allows a retry
+            if next_time <= now:
+                next_time = now + self.crawler.retry_after
+
+            # Wake at least hourly, in case feeds were set up for an earlier day in the meantime
+            next_time = min(next_time, now + dt.timedelta(hours=1))
             sleep_duration = next_time - now
 
-            print(f"Next crawl in {sleep_duration.total_seconds()}s (in {sleep_duration}) at {next_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+            print(f"Next crawl check in {sleep_duration.total_seconds()}s (in {sleep_duration}) "
+                  f"at {next_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
             await asyncio.sleep(sleep_duration.total_seconds())
-            print(f"Next crawl initiating:")
+
+    def refetch_requested(self, payload: str):
+        print(f"[Crawl] Refetch requested from another process by {payload}")
+        self.bot.loop.create_task(self.refetch())
+
+    async def refetch(self):
+        try:
+            # Joins the scheduled crawl instead of running a second one if it's already in progress
+            await self.crawler.crawl([b.id for b in self.brands])
+        except Exception:
+            traceback.print_exc()
+
+    def next_feed_batch(self) -> Optional[Tuple[dt.datetime, Set[str]]]:
+        """
+        The next time feeds are due, and the brands they need. Covers every shard's feeds, since followers' batches
+        rely on the leader's crawl too.
+        """
+        by_time: Dict[dt.datetime, Set[str]] = {}
+        for day in range(len(WEEKDAYS)):
+            configs = self.bot.configs.for_day(day)
+            if configs:
+                by_time.setdefault(next_scheduled(day), set()).update(c.brand.id for c in configs)
+        if not by_time:
+            return None
+        batch_time = min(by_time)
+        return batch_time, by_time[batch_time]
+
+    async def crawl_brands(self, brand_ids: Set[str]) -> Set[str]:
+        with self.bot.profiler.phase('crawl'):
+            if not self.bot.shard_plan.crawl_leader:
+                # Nothing was crawled here: the snapshot restores when the leader actually fetched each brand
+                await self.load_snapshot()
+                return set()
+            return await self.fetch_comics(brand_ids)
+
+    async def warm_start(self):
+        """
+        Loads the last crawled catalog from its snapshot, so comics are available straight away. The crawl schedule
+        then refreshes whatever is older than its freshness limits.
+        """
+        try:
+            await self.load_snapshot()
+        except FileNotFoundError:
+            print("~~ No catalog snapshot ~~")
+        except Exception as e:
+            print(f"~~ Catalog snapshot not loaded ~~   {e!r}")
+
+    async def load_snapshot(self) -> Set[str]:
+        started = self.bot.loop.time()
+        mtime = CATALOG_SNAPSHOT_PATH.stat().st_mtime
+        comics, order, fetched_at = await self.bot.loop.run_in_executor(None, read_snapshot, CATALOG_SNAPSHOT_PATH)
+        self.bot.comics, self.bot.order = comics, order
+        self.crawler.fetched_at.update(fetched_at)
+        self.snapshot_mtime = mtime
+        self.catalog_loaded()
+        print(f"~~ Loaded catalog snapshot ~~   {sum(len(v) for v in comics.values())} comics "
+              f"in {(self.bot.loop.time() - started) * 1000:.1f}ms")
+        return set(fetched_at)
+
+    def catalog_loaded(self):
+        if self.bot.comics:
+            self.bot.startup.done('catalog')
+
+    async def follow_shared_catalog(self):
+        """Loads the catalog snapshot published by the crawl leader instead of crawling, whenever it changes."""
+        while not self.bot.is_closed():
+            try:
+                if CATALOG_SNAPSHOT_PATH.stat().st_mtime != self.snapshot_mtime:
+                    await self.crawler.crawl([b.id for b in self.brands])
+            except FileNotFoundError:
+                pass
+            except Exception:
+                traceback.print_exc()
+
+            await asyncio.sleep(CATALOG_POLL_INTERVAL)
 
     async def schedule_pfp(self):
-        while not self.bot.comics:
-            await asyncio.sleep(60)
+        # The avatar is shared by every shard, so only the crawl leader updates it
+        if not self.bot.shard_plan.crawl_leader:
+            return
+
+        await self.bot.startup.wait('catalog', 'gateway')
 
         while not self.bot.is_closed():
             now = utils.utcnow()
@@ -95,8 +231,8 @@ class PullsCog(commands.Cog, name="Pulls"):
 
             try:
                 await profile_pic(
-                    list(self.bot.comics[BrandEnum.Marvel.value].values()),
-                    list(self.bot.comics[BrandEnum.DC.value].values()),
+                    list(self.bot.comics[MARVEL].values()),
+                    list(self.bot.comics[DC].values()),
                     self.bot)
             except Exception as e:
                 print(f"Error while updating profile picture: {e}")
@@ -104,8 +240,7 @@ class PullsCog(commands.Cog, name="Pulls"):
                 return None
 
     async def schedule_activity(self):
-        while not self.bot.comics:
-            await asyncio.sleep(10)
+        await self.bot.startup.wait('catalog', 'gateway')
 
         while not self.bot.is_closed():
             comics = []
@@ -119,22 +254,76 @@ class PullsCog(commands.Cog, name="Pulls"):
 
             await asyncio.sleep(random.randint(600, 3000))
 
+    async def schedule_reconcile(self):
+        await self.bot.startup.wait('gateway')
+
+        # schedule_feeds reconciles at startup, before validating
+        while not self.bot.is_closed():
+            await asyncio.sleep(GUILD_RECONCILE_INTERVAL.total_seconds())
+            try:
+                await self.reconcile_guilds()
+            except Exception:
+                traceback.print_exc()
+
+    async def reconcile_guilds(self) -> List[Configuration]:
+        """
+        Deletes the configurations of servers the bot has not been in for GUILD_GRACE_PERIOD, including servers it
+        left while offline, and cancels their feeds. Returns the deleted configurations.
+        """
+        plan = self.bot.shard_plan
+        present = {g.id for g in self.bot.guilds}
+        missing = {s for s in self.bot.configs.servers() if plan.owns(s) and s not in present}
+
+        departures = {s: t for s, t in (await fetch_guild_departures(self.bot.db)).items() if plan.owns(s)}
+        returned = [s for s in departures if s not in missing]
+        if returned:
+            await clear_guild_departures(self.bot.db, returned)
+        new = [s for s in missing if s not in departures]
+        if new:
+            await record_guild_departures(self.bot.db, new)
+
+        now = utils.utcnow()
+        expired = [s for s in missing if s in departures and now - departures[s] >= GUILD_GRACE_PERIOD]
+        print(f"[Guild Reconcile] {len(missing)} servers missing ({len(new)} new, {len(returned)} returned), "
+              f"{len(expired)} past the grace period")
+        if not expired:
+            return []
+
+        configs = await self.bot.configs.delete_servers(expired)
+        await clear_guild_departures(self.bot.db, expired)
+        for config in configs:
+            self.cancel_feed(config)
+
+        print(f"[Guild Reconcile] Deleted {len(configs)} configs of {len(expired)} servers")
+        return configs
+
     async def schedule_feeds(self):
-        configs = await self.bot.db.fetch('SELECT * FROM configuration')
-        all_configs = [config_from_record(c) for c in configs]
+        await self.bot.startup.wait('gateway')
+
+        # Drop servers the bot has long since left, so they aren't validated every restart
+        try:
+            await self.reconcile_guilds()
+        except Exception:
+            traceback.print_exc()
 
-        await self.bot.wait_until_ready()
+        all_configs = [c for c in self.bot.configs.all() if self.bot.shard_plan.owns(c.server_id)]
 
-        # Filter out inaccessible configurations
+        # Filter out inaccessible configurations, scheduling each valid batch straight away
         valid_configs = []
         inaccessible_configs = []
+        member_counts: Dict[int, int] = {}
 
-        for config in all_configs:
-            is_accessible, reason = await validate_config_accessibility(self.bot, config)
-            if is_accessible:
-                valid_configs.append(config)
-            else:
-                inaccessible_configs.append((config, reason))
+        started = self.bot.loop.time()
+        async for batch in validate_configs_batched(self.bot, all_configs, VALIDATION_BATCH_SIZE):
+            for config in batch.valid:
+                self.schedule_feed(config, log=False)
+            valid_configs += batch.valid
+            inaccessible_configs += batch.inaccessible
+            member_counts.update(batch.member_counts)
+
+            print(f"[Pull Feed Scheduler] Validated {len(valid_configs) + len(inaccessible_configs)}"
+                  f"/{len(all_configs)} configs ({len(valid_configs)} valid) "
+                  f"in {self.bot.loop.time() - started:.2f}s")
 
         # Log inaccessible configurations
         if inaccessible_configs:
@@ -145,7 +334,8 @@ class PullsCog(commands.Cog, name="Pulls"):
             guild_not_found = [str(config.server_id) for config, reason in inaccessible_configs if
                                reason == "Guild not found"]
             if guild_not_found:
-                print(f"[Pull Feed Scheduler] Guild not found IDs: {' '.join(guild_not_found)}")
+                print(f"[Pull Feed Scheduler] Guild not found IDs (deleted after the grace period): "
+                      f"{' '.join(guild_not_found)}")
 
         # Group valid configs by day
         by_day: Dict[int, List[Configuration]] = {}
@@ -153,219 +343,440 @@ class PullsCog(commands.Cog, name="Pulls"):
             by_day.setdefault(config.day, []).append(config)
 
         # Calculate offsets for each day
+        stats = await fetch_delivery_stats(self.bot.db)
         self.schedule_offsets: Dict[Tuple[int, str], float] = {}
         for day_configs in by_day.values():
-            offsets = await self.calculate_schedule_offsets(day_configs)
+            offsets = await self.calculate_schedule_offsets(day_configs, stats, member_counts)
             self.schedule_offsets.update(offsets)
 
-        # Schedule all valid feeds
+        # Move every feed to its final offset
         for config in valid_configs:
-            self.schedule_feed(config)
+            self.schedule_feed(config, log=False)
 
         print(f"[Pull Feed Scheduler] Scheduled {len(valid_configs)} feeds, "
-              f"skipped {len(inaccessible_configs)} inaccessible")
-
-    async def calculate_schedule_offsets(self, configs: List[Configuration]) -> Dict[Tuple[int, str], float]:
-        """Calculate time offsets for configs to spread out execution."""
-        # Configuration for timing (easily adjustable)
-        COMPACT_INTERVAL = 0.5  # seconds between compact feeds
-        SUMMARY_INTERVAL = 0.5  # seconds between summary feeds
-        FULL_INTERVAL = 15.0  # seconds for full feeds
-
+              f"skipped {len(inaccessible_configs)} inaccessible, "
+              f"in {self.bot.loop.time() - started:.2f}s")
+        self.bot.startup.done('feeds')
+
+        # A fresh journal has no history, so anything "missed" may well have been delivered before it existed
+        if self.journal_existed:
+            await self.catch_up_feeds(valid_configs)
+
+    async def schedule_replans(self):
+        """
+        Recalculates each day's offsets FEED_REPLAN_LEAD ahead of its batch, so the batch is packed from the delivery
+        stats of the days since startup rather than from the ones read then.
+        """
+        await self.bot.startup.wait('feeds')
+
+        replanned: Dict[int, dt.datetime] = {}
+        while not self.bot.is_closed():
+            now = utils.utcnow()
+            batches = {day: next_scheduled(day) for day in range(len(WEEKDAYS))}
+            for day, batch_time in batches.items():
+                if batch_time - FEED_REPLAN_LEAD <= now and replanned.get(day) != batch_time:
+                    try:
+                        await self.replan_day(day)
+                    except Exception:
+                        traceback.print_exc()
+                    replanned[day] = batch_time
+
+            next_time = min((t - FEED_REPLAN_LEAD for day, t in batches.items() if replanned.get(day) != t),
+                            default=now + dt.timedelta(hours=1))
+            await asyncio.sleep(max((next_time - utils.utcnow()).total_seconds(), 0.0))
+
+    async def replan_day(self, day: int):
+        """Recalculates the offsets of one day's scheduled feeds from fresh delivery stats, and reschedules them."""
+        configs = [c for c in map(self.scheduled_config, self.feed_scheduler.keys()) if c is not None and c.day == day]
+        if not configs:
+            return
+
+        started = self.bot.loop.time()
+        stats = await fetch_delivery_stats(self.bot.db)
+        member_counts = {}
+        for config in configs:
+            guild = self.bot.get_guild(config.server_id)
+            member_counts[config.server_id] = (guild.member_count or 0) if guild else 0
+
+        self.schedule_offsets.update(await self.calculate_schedule_offsets(configs, stats, member_counts))
+        for config in configs:
+            self.schedule_feed(config, log=False)
+
+        print(f"[Pull Feed Scheduler] Recalculated the offsets of {len(configs)} {WEEKDAYS[day]} feeds "
+              f"in {self.bot.loop.time() - started:.2f}s")
+
+    async def catch_up_feeds(self, configs: List[Configuration]):
+        """Sends feeds whose last run was missed or cut short while the bot was offline, in rate-limited batches."""
+        now = utils.utcnow()
+        window = dt.timedelta(hours=CATCHUP_WINDOW_HOURS)
+        journal = await fetch_journal_since(self.bot.db, (now - window - dt.timedelta(days=1)).date())
+
+        missed: List[Tuple[Configuration, dt.date]] = []
+        for config in configs:
+            last_time = last_feed_time(config.day, self.feed_offset(config))
+            if last_time > now or now - last_time > window:
+                continue
+            week = scheduled_week(config.day, last_time)
+            entry = journal.get((config.server_id, config.brand.id, week))
+            if entry is None or not entry.finished:
+                missed.append((config, week))
+
+        if not missed:
+            return
+
+        print(f"[Pull Feed Scheduler] Catching up on {len(missed)} missed feeds")
+        await self.bot.startup.wait('catalog')
+
+        for i in range(0, len(missed), CATCHUP_BATCH_SIZE):
+            batch = missed[i:i + CATCHUP_BATCH_SIZE]
+            results = await asyncio.gather(*(self.send_comics(c, week) for c, week in batch), return_exceptions=True)
+            for (config, week), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) "
+                          f"Catch-up failed: {result!r}")
+            await asyncio.sleep(CATCHUP_BATCH_INTERVAL)
+
+        print(f"[Pull Feed Scheduler] Caught up on {len(missed)} feeds")
+
+    async def calculate_schedule_offsets(self, configs: List[Configuration],
+                                         stats: Dict[Tuple[int, str], DeliveryStats],
+                                         member_counts: Dict[int, int]) -> Dict[Tuple[int, str], float]:
+        """
+        Calculate time offsets for configs to spread out execution.
+
+        Each feed is expected to take as long as its last measured delivery, and as many feeds run side by side as
+        the observed request rates allow under the global rate limit.
+        """
         # Sort by priority: format type, then server size (member count)
         def get_priority(cfg: Configuration) -> Tuple[int, int]:
-            guild = self.bot.get_guild(cfg.server_id)
-            member_count = guild.member_count if guild else 0
+            member_count = member_counts.get(cfg.server_id, 0)
 
             # Lower number = higher priority
             format_priority = {
                 Format.COMPACT: 0,
                 Format.SUMMARY: 1,
+                Format.COLLAGE: 1,
                 Format.FULL: 2
             }
             return format_priority.get(cfg.format, 3), -member_count
 
         sorted_configs = sorted(configs, key=get_priority)
 
-        # Assign offsets
-        offsets = {}
-        current_offset = 0.0
+        durations = {(c.server_id, c.brand.id): estimate_duration(c, stats.get((c.server_id, c.brand.id)))
+                     for c in sorted_configs}
+        lanes = delivery_concurrency(stats, GLOBAL_RATE_LIMIT)
 
-        for config in sorted_configs:
-            offsets[(config.server_id, config.brand.id)] = current_offset
+        return pack_schedule_offsets(sorted_configs, durations, lanes)
 
-            if config.format == Format.FULL:
-                current_offset += FULL_INTERVAL
-            elif config.format == Format.COMPACT:
-                current_offset += COMPACT_INTERVAL
-            else:  # SUMMARY
-                current_offset += SUMMARY_INTERVAL
+    def feed_offset(self, config: Configuration) -> float:
+        """Seconds into its day a feed is sent, 0.0 until offsets are calculated."""
+        return self.schedule_offsets.get((config.server_id, config.brand.id), 0.0)
 
-        return offsets
+    def feed_time(self, config: Configuration, after: Optional[dt.datetime] = None) -> dt.datetime:
+        """Next fire time of a feed, including its offset. Always later than `after`, if given."""
+        return next_feed_time(config.day, self.feed_offset(config), after)
 
-    def schedule_feed(self, config: Configuration):
+    def schedule_feed(self, config: Configuration, after: Optional[dt.datetime] = None, log: bool = True):
         try:
-            self.feed_schedules[(config.server_id, config.brand.id)] = self.bot.loop.create_task(self.scheduler(config))
+            scheduled_time = self.feed_time(config, after)
+            self.feed_scheduler.schedule((config.server_id, config.brand.id), scheduled_time)
         except AttributeError:
-            pass
+            return
 
-    async def scheduler(self, config: Configuration):
-        # Get the base scheduled time
-        base_time = next_scheduled(config.day)
+        if log:
+            print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) "
+                  f"Timer: {scheduled_time - utils.utcnow()}")
+
+    def scheduled_config(self, key: Tuple[int, str]) -> Optional[Configuration]:
+        return self.bot.configs.get(*key)
+
+    def configs_refreshed(self, keys: Set[Tuple[int, str]]):
+        """
+        Follows other instances' edits: feeds this process sends are rescheduled for their new day, or cancelled if
+        deleted, and feeds set up elsewhere for this process's servers are scheduled.
+        """
+        if not self.bot.startup.is_done('feeds'):
+            # schedule_feeds reads the store afresh
+            return
+        for key in keys:
+            config = self.scheduled_config(key)
+            if config is None or not self.bot.shard_plan.owns(key[0]):
+                if self.feed_scheduler.cancel(key):
+                    print(f"[Pull Feed Scheduler] {key} Cancelled after an edit elsewhere.")
+            else:
+                self.schedule_feed(config)
 
-        # Add the offset for this specific config (0.0 if not found)
-        offset = self.schedule_offsets.get((config.server_id, config.brand.id), 0.0)
-        scheduled_time = base_time + dt.timedelta(seconds=offset)
+    async def run_feed(self, key: Tuple[int, str], _, scheduled_time: dt.datetime):
+        # Looked up when it fires, so it goes out with any edits made since it was scheduled
+        config = self.scheduled_config(key)
+        if config is None:
+            print(f"[Pull Feed Scheduler] {key} No longer configured, dropped.")
+            return
 
-        sleep_duration = scheduled_time - utils.utcnow()
+        print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) Executing. {utils.utcnow()}")
+        self.bot.metrics.feed_lag.observe(value=max(0.0, (utils.utcnow() - scheduled_time).total_seconds()))
 
-        if sleep_duration.total_seconds() > 0:
-            print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) "
-                  f"Timer: {sleep_duration} (offset: {offset:.1f}s)")
-            await asyncio.sleep(sleep_duration.total_seconds())
+        # Queue next week's run before sending, so a slow or failing send can't drop the feed
+        self.schedule_feed(config, after=scheduled_time)
 
-        print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) Executing. {utils.utcnow()}")
-        try:
-            await self.send_comics(config)
-        except KeyError:
-            print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) KeyError, "
-                  f"probably comics not fetched yet.")
+        week = scheduled_week(config.day, scheduled_time)
+        with self.bot.profiler.phase('feeds', week):
+            try:
+                await self.crawler.ensure_fresh([config.brand.id], FEED_FRESHNESS)
+            except Exception:
+                # Stale data is better than no feed
+                traceback.print_exc()
 
-        await self.scheduler(config)
+            try:
+                await self.send_comics(config, week)
+            except KeyError:
+                print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) KeyError, "
+                      f"probably comics not fetched yet.")
 
     def cancel_feed(self, config: Configuration):
-        self.feed_schedules[(config.server_id, config.brand.id)].cancel()
-        print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) Cancelled.")
+        if self.feed_scheduler.cancel((config.server_id, config.brand.id)):
+            print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) Cancelled.")
 
-    async def fetch_comics(self):
+    async def fetch_comics(self, brand_ids: Set[str] = None) -> Set[str]:
+        """Crawls the given brands (all by default), replacing each brand's catalog once it is fetched."""
         print(f"~~ Fetching comics ~~   {utils.utcnow()}")
-        self.bot.comics = {}
-        self.bot.order = {}
+        fetched = set()
 
         for current_brand in self.brands:
+            if brand_ids is not None and current_brand.id not in brand_ids:
+                continue
             print(f" > Fetching {current_brand.name}")
+            started = self.bot.loop.time()
             try:
                 comics = await fetch_comic_releases_detailed(publisher=current_brand.locg_id)
-                comic_dict = {comic.id: comic for comic in comics}
-                self.bot.comics[current_brand.id] = comic_dict
-                self.sort_order(comic_dict, current_brand)
-                date = week_of_date(comics)
-                print(
-                    f"   > {len(self.bot.comics[current_brand.id])} loaded for the week of {f_date(date)} ")
             except Exception as e:
                 print(f"   ! Error fetching {current_brand.name} comics: {e}")
+                self.bot.metrics.crawl_errors.inc(current_brand.id)
                 traceback.print_exc()
+                continue
 
-        print(f"~~ Comics fetched ~~   {utils.utcnow()}")
+            self.bot.metrics.crawl_duration.observe(current_brand.id, value=self.bot.loop.time() - started)
+            comic_dict = {comic.id: comic for comic in comics}
+            order = catalog_order(comic_dict)
+            date = week_of_date(comics)
+            print(f"   > {len(comic_dict)} loaded for the week of {f_date(date)} ")
 
-    def sort_order(self, comic_dict: Dict[int, ComicDetails], brand: Brand):
-        format_order = ["Comic", "Trade Paperback", "Hardcover"]
+            # An archiving failure doesn't stop the catalog from being used
+            if comic_dict:
+                try:
+                    await archive_catalog(self.bot.db, current_brand.id, date, comic_dict, order)
+                except Exception as e:
+                    print(f"   ! Error archiving {current_brand.name} comics: {e}")
+                    traceback.print_exc()
 
-        self.bot.order[brand.id] = sorted(
-            comic_dict.keys(),
-            key=lambda x: (
-                format_order.index(comic_dict[x].format) if comic_dict[x].format in format_order else len(format_order),
-                comic_dict[x].title,
-                comic_dict[x].releaseDate,
-            )
-        )
+            self.bot.comics[current_brand.id] = comic_dict
+            self.bot.order[current_brand.id] = order
+            fetched.add(current_brand.id)
 
-    async def send_comics(self, config: Configuration):
-        await self.check_lock(config.channel_id)
-        async with self.locks[config.channel_id]:
-            _format = config.format
+        print(f"~~ Comics fetched ~~   {utils.utcnow()}")
+        self.catalog_loaded()
 
-            channel = self.bot.get_channel(config.channel_id)
-            if channel is None:
-                print(f"Channel {config.channel_id} not found for {config.brand.name} feed in {config.server_id}.")
-                return
+        if fetched:
+            fetched_at = {**self.crawler.fetched_at, **{b: utils.utcnow() for b in fetched}}
+            try:
+                await self.bot.loop.run_in_executor(
+                    None, write_snapshot, CATALOG_SNAPSHOT_PATH, self.bot.comics, self.bot.order, fetched_at)
+            except Exception as e:
+                print(f"   ! Error writing catalog snapshot: {e}")
+                traceback.print_exc()
 
-            comics: Dict[int, Union[Comic, ComicMessage]] = self.bot.comics[config.brand.id].copy()
+        return fetched
 
-            if config.check_keywords:
-                kw = await fetch_keywords(self.bot.db, config.server_id)
-                comics = {k: v for k, v in comics.items() if kw.check_comic(v)}
+    async def send_comics(self, config: Configuration, week: dt.date = None):
+        """
+        Posts this week's comics to a feed's channel.
 
-            try:
-                if comics:
-                    lead_msg = None
-                    if _format in [Format.FULL, Format.COMPACT]:
-                        date = week_of_date(list(comics.values()))
-                        lead_msg = await channel.send(f"## {config.brand.name} Comics - {f_date(date)}")
-                        if config.pin:
-                            await pin(self.bot.user.id, lead_msg)
-                        if channel.guild.id == 281648235557421056: print("finished pin")
+        Scheduled runs pass the feed's `week`, which journals the delivery: a finished week is never sent again, and a
+        partially sent one resumes after the last comic that was posted.
 
-                    if config.ping:
-                        await channel.send(f"<@&{config.ping}>")
+        Each phase is traced as a span of the delivery, for the share of deliveries sampled.
+        """
+        tracer = self.bot.tracer
+        with tracer.span('send_comics', guild=config.server_id, brand=config.brand.id, format=config.format.value,
+                         week=week and week.isoformat()):
+            with tracer.span('lock_wait'):
+                await self.check_lock(config.channel_id)
+                await self.locks[config.channel_id].acquire()
+            try:
+                await self.deliver_comics(config, week)
+            finally:
+                self.locks[config.channel_id].release()
+
+    async def deliver_comics(self, config: Configuration, week: Optional[dt.date]):
+        tracer = self.bot.tracer
+        _format = config.format
+
+        entry = None
+        if week is not None:
+            with tracer.span('journal_fetch'):
+                entry = await fetch_journal_entry(self.bot.db, config.server_id, config.brand.id, week)
+            if entry and entry.finished:
+                print(f"[Pull Feed Scheduler] ({config.server_id}, {config.brand.name}) "
+                      f"Already delivered for {week}.")
+                return
 
-                    if _format in [Format.FULL, Format.COMPACT]:
-                        embeds = {k: c.to_embed(_format == Format.FULL) for k, c in comics.items()}
+        channel = self.bot.get_channel(config.channel_id)
+        if channel is None:
+            print(f"Channel {config.channel_id} not found for {config.brand.name} feed in {config.server_id}.")
+            return
 
-                        instances = {}
+        started = self.bot.loop.time()
+        sent_before, limited_before = self.delivery_counters(channel.id)
 
-                        for cid in self.bot.order[config.brand.id]:
-                            if cid in comics:
-                                try:
-                                    msg = await channel.send(embed=embeds[cid])
-                                    instances[cid] = comics[cid].to_instance(msg)
-                                except Exception:
-                                    pass
+        comics: Dict[int, Union[Comic, ComicMessage]] = self.bot.comics[config.brand.id].copy()
 
-                        comics = instances
+        if config.check_keywords:
+            with tracer.span('keywords_fetch'):
+                kw = await fetch_keywords(self.bot.db, config.server_id)
+            with tracer.span('keywords_filter', comics=len(comics)) as span:
+                comics = {k: v for k, v in comics.items() if kw.check_comic(v)}
+                span.set(matched=len(comics))
 
+        try:
+            if comics:
+                lead_msg = None
+                if entry is None:
+                    with tracer.span('announce'):
+                        if _format in [Format.FULL, Format.COMPACT]:
+                            date = week_of_date(list(comics.values()))
+                            lead_msg = await self.bot.delivery.send(
+                                channel, f"## {config.brand.name} Comics - {f_date(date)}")
+                            if config.pin:
+                                with tracer.span('pin'):
+                                    await self.bot.delivery.pin(self.bot.user.id, lead_msg)
+
+                        if config.ping:
+                            await self.bot.delivery.send(channel, f"<@&{config.ping}>")
+
+                        if week is not None:
+                            await start_delivery(self.bot.db, config.server_id, config.brand.id, week,
+                                                 lead_msg.id if lead_msg else None)
+                elif entry.lead_message:
+                    lead_msg = channel.get_partial_message(entry.lead_message)
+
+                if _format in [Format.FULL, Format.COMPACT]:
+                    order = [cid for cid in self.bot.order[config.brand.id] if cid in comics]
+
+                    # Comics posted before a restart keep their plain links in the summary
+                    start = 0
+                    if entry is not None and entry.last_comic in order:
+                        start = order.index(entry.last_comic) + 1
+                    instances = {cid: comics[cid] for cid in order[:start]}
+
+                    with tracer.span('comic_sends', comics=len(order) - start) as span:
+                        render_time = 0.0
+                        for cid in order[start:]:
+                            try:
+                                rendered = perf_counter()
+                                embed = comics[cid].to_embed(_format == Format.FULL)
+                                render_time += perf_counter() - rendered
+                                msg = await self.bot.delivery.send(channel, embed=embed)
+                                instances[cid] = comics[cid].to_instance(msg)
+                            except Exception:
+                                pass
+
+                            if week is not None:
+                                await record_progress(self.bot.db, config.server_id, config.brand.id, week, cid)
+                        # Rendering is interleaved with sending, so it's totalled rather than given its own spans
+                        span.set(render_ms=round(render_time * 1000, 3))
+
+                    comics = instances
+
+                # Collages go out with the first summary message
+                files: List[File] = []
+                if _format == Format.COLLAGE:
+                    # Permissions may have changed since the feed was validated
+                    if channel.permissions_for(channel.guild.me).attach_files:
+                        with tracer.span('collage'):
+                            files = await self.collage_files(config.brand, comics)
+                    else:
+                        print(f"[Collage] Missing Attach Files in {channel.guild.name} ({channel.guild.id}), "
+                              f"sending the summary without the collage")
+
+                with tracer.span('summary_build'):
                     summary_embeds = await summary_embed(self.bot.order, comics, config.brand, lead_msg)
 
-                    embed_selection: List[Embed] = []
-                    first_msg = None
+                embed_selection: List[Embed] = []
+                first_msg = None
 
+                with tracer.span('summary_send', embeds=len(summary_embeds)):
                     for embed in summary_embeds:
                         if sum(len(e) for e in embed_selection) + len(embed) > 6000:
-                            msg = await channel.send(embeds=embed_selection)
+                            msg = await self.bot.delivery.send(channel, embeds=embed_selection,
+                                                               **({'files': files} if files else {}))
+                            files = []
                             if first_msg is None:
                                 first_msg = msg
                             embed_selection = []
                         embed_selection.append(embed)
 
                     if embed_selection:
-                        msg = await channel.send(embeds=embed_selection)
+                        msg = await self.bot.delivery.send(channel, embeds=embed_selection,
+                                                           **({'files': files} if files else {}))
                         if first_msg is None:
                             first_msg = msg
 
-                    if config.pin and _format == Format.SUMMARY and first_msg:
-                        await pin(self.bot.user.id, lead_msg)
+                if config.pin and _format in [Format.SUMMARY, Format.COLLAGE] and first_msg:
+                    with tracer.span('pin'):
+                        await self.bot.delivery.pin(self.bot.user.id, first_msg)
 
-                else:
-                    await channel.send(f"There are no {config.brand.name} comics this week.")
-            except Forbidden:
-                print(f"Missing permissions in {channel.guild.name} ({channel.guild.id})")
+            else:
+                await self.bot.delivery.send(channel, f"There are no {config.brand.name} comics this week.")
+
+            sent, limited = self.delivery_counters(channel.id)
+            stats = DeliveryStats(self.bot.loop.time() - started, sent - sent_before, limited - limited_before)
+            self.record_delivery_metrics(config, stats)
+            if week is not None:
+                with tracer.span('journal_finish'):
+                    await finish_delivery(self.bot.db, config.server_id, config.brand.id, week, stats=stats)
+        except Forbidden:
+            print(f"Missing permissions in {channel.guild.name} ({channel.guild.id})")
+            self.bot.metrics.feeds_delivered.inc(config.brand.id, _format.value, 'forbidden')
+            if week is not None:
+                await finish_delivery(self.bot.db, config.server_id, config.brand.id, week, Status.FAILED)
+
+    async def collage_files(self, brand: Brand, comics: Dict[int, Comic]) -> List[File]:
+        """The collage sheets of `comics`, rendered once per catalog version and shared by every feed."""
+        order = [cid for cid in self.bot.order[brand.id] if cid in comics]
+        try:
+            sheets = await self.collages.render(brand.id, self.crawler.fetched_at.get(brand.id),
+                                                [comics[cid] for cid in order])
+        except Exception as e:
+            # The summary still goes out without them
+            print(f"[Collage] Error rendering {brand.name} collage: {e}")
+            traceback.print_exc()
+            return []
+        return [File(BytesIO(sheet), filename=f"{brand.id.lower()}-{n + 1}.jpg") for n, sheet in enumerate(sheets)]
+
+    def record_delivery_metrics(self, config: Configuration, stats: DeliveryStats):
+        labels = (config.brand.id, config.format.value)
+        self.bot.metrics.feed_duration.observe(*labels, value=stats.duration)
+        self.bot.metrics.feed_messages.inc(*labels, amount=stats.messages)
+        self.bot.metrics.feeds_delivered.inc(*labels, 'delivered')
+
+    def delivery_counters(self, channel_id: int) -> Tuple[int, int]:
+        """Requests sent and 429s received so far on a channel's routes."""
+        routes = [('channel', channel_id), ('pin', channel_id)]
+        return (sum(self.bot.delivery.sent[r] for r in routes),
+                sum(self.bot.rate_limits.rate_limited[r] for r in routes))
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
         """Clean up configurations when the bot leaves a server."""
         try:
-            # Fetch all configurations for this server
-            configs = await self.bot.db.fetch(
-                'SELECT * FROM configuration WHERE server = $1',
-                guild.id
-            )
-
-            if not configs:
+            if not self.bot.configs.for_server(guild.id):
                 return
 
-            # Cancel all scheduled feeds and delete from database
-            for record in configs:
-                config = config_from_record(record)
-                try:
-                    self.cancel_feed(config)
-                except (KeyError, AttributeError):
-                    pass
+            configs = await self.bot.configs.delete_servers([guild.id])
 
-            # Delete all configurations from database
-            await self.bot.db.execute(
-                'DELETE FROM configuration WHERE server = $1',
-                guild.id
-            )
+            # Cancel all scheduled feeds
+            for config in configs:
+                self.cancel_feed(config)
 
             print(f"[Guild Remove] Left server {guild.id} ({guild.name}). "
                   f"Cleaned up {len(configs)} feed(s).")
@@ -384,13 +795,9 @@ class PullsCog(commands.Cog, name="Pulls"):
         if not self.bot.comics:
             return await interaction.followup.send("Comics are not yet fetched.")
 
-        con = await self.bot.db.fetch(
-            'SELECT * FROM configuration WHERE server = $1 AND brand = $2',
-            interaction.guild_id, Marvel.id
-        )
-
-        for c in con:
-            await self.send_comics(config_from_record(c))
+        config = self.bot.configs.get(interaction.guild_id, MARVEL)
+        if config:
+            await self.send_comics(config)
 
         await interaction.followup.send("Done.")
 
@@ -405,8 +812,8 @@ class PullsCog(commands.Cog, name="Pulls"):
             return await interaction.followup.send("Comics are not yet fetched.")
 
         img = await profile_pic(
-                    list(self.bot.comics[BrandEnum.Marvel.value].values()),
-                    list(self.bot.comics[BrandEnum.DC.value].values()),
+                    list(self.bot.comics[MARVEL].values()),
+                    list(self.bot.comics[DC].values()),
                     self.bot)
         await interaction.followup.send(file=File(fp=img, filename="my_file.png"))
 
@@ -417,10 +824,18 @@ class PullsCog(commands.Cog, name="Pulls"):
         """Manually trigger comic fetching. Dev-only."""
         await interaction.response.defer()
 
+        # Followers only load the leader's snapshot, so the crawl has to happen there
+        if not self.bot.shard_plan.crawl_leader:
+            await self.bot.db.execute('SELECT pg_notify($1, $2)', REFETCH_CHANNEL, str(interaction.user))
+            return await interaction.followup.send(
+                "📨 This instance doesn't crawl, so the crawl leader was asked to refetch the comics. This instance "
+                f"loads the new catalog within {CATALOG_POLL_INTERVAL:g}s of the leader finishing.")
+
         await interaction.followup.send("Starting comic fetch...")
 
         try:
-            await self.fetch_comics()
+            # Joins the scheduled crawl instead of running a second one if it's already in progress
+            await self.crawler.crawl([b.id for b in self.brands])
             await interaction.followup.send("✅ Comics fetched successfully!")
         except Exception as e:
             await interaction.followup.send(f"❌ Error fetching comics: {e}")
@@ -439,13 +854,8 @@ class PullsCog(commands.Cog, name="Pulls"):
 
         comics = self.bot.comics[b.id]
 
-        con = await self.bot.db.fetch(
-            'SELECT * FROM configuration WHERE server = $1 and brand = $2',
-            interaction.guild_id, b.id
-        )
-
-        if con:
-            config = config_from_record(con[0])
+        config = self.bot.configs.get(interaction.guild_id, b.id)
+        if config:
             if config.check_keywords:
                 kw = await fetch_keywords(self.bot.db, config.server_id)
                 comics = {k: v for k, v in comics.items() if kw.check_comic(v)}
@@ -453,6 +863,48 @@ class PullsCog(commands.Cog, name="Pulls"):
         embeds = await summary_embed(self.bot.order, comics, b)
         await interaction.followup.send(embeds=embeds)
 
+    @app_commands.command(name="comics-past-week")
+    @app_commands.describe(brand="The comic brand to list.", weeks_ago="How many weeks before this one.")
+    @app_commands.choices(brand=BrandAutocomplete)
+    async def comics_past_week(self, interaction: Interaction, brand: str, weeks_ago: app_commands.Range[int, 1, 520]):
+        """Lists a past week's comics!"""
+        await interaction.response.defer(
+            ephemeral=not interaction.channel.permissions_for(interaction.user).embed_links)
+        b = self.brands[brand]
+
+        current = week_of_date(list(self.bot.comics.get(b.id, {}).values()))
+        archived = await fetch_archived_week(self.bot.db, b.id, current - dt.timedelta(weeks=weeks_ago))
+        if not archived:
+            return await interaction.followup.send(f"There are no archived {b.name} comics from that week.")
+
+        embeds = await summary_embed({b.id: [c.id for c in archived]}, {c.id: c for c in archived}, b)
+        await interaction.followup.send(embeds=embeds)
+
+    @app_commands.command(name="series-history")
+    @app_commands.describe(comic="A comic out this week.")
+    async def series_history(self, interaction: Interaction, comic: str):
+        """Lists when a series last shipped!"""
+        await interaction.response.defer()
+
+        current = next((c for brand_comics in self.bot.comics.values() for c in brand_comics.values()
+                        if str(c.id) == comic), None)
+        if current is None or not current.seriesUrl:
+            return await interaction.followup.send("That comic isn't out this week.")
+
+        releases = await fetch_series_releases(self.bot.db, current.seriesUrl)
+        embed = Embed(title=f"Recent releases · {current.title}", color=current.brand_obj.color)
+        embed.description = "\n".join(f"{f_date(r['release_date'])} · [{r['title']}]({r['url']})"
+                                       for r in releases) or "No releases archived yet."
+        await interaction.followup.send(embed=embed)
+
+    @series_history.autocomplete("comic")
+    async def series_history_autocomplete(self, interaction: Interaction, current: str):
+        current = current.lower()
+        comics = [c for brand_comics in self.bot.comics.values() for c in brand_comics.values()
+                  if current in c.title.lower()]
+        comics.sort(key=lambda c: (not c.title.lower().startswith(current), c.title))
+        return [app_commands.Choice(name=c.title[:100], value=str(c.id)) for c in comics][:25]
+
     @app_commands.command(name="trigger-feed")
     @checks.has_permissions(manage_guild=True)
     @app_commands.choices(brand=BrandAutocomplete)
@@ -465,21 +917,15 @@ class PullsCog(commands.Cog, name="Pulls"):
             return await interaction.followup.send(
                 "Comics are not yet fetched. Please wait a few moments and try again.")
 
-        con = await self.bot.db.fetch(
-            'SELECT * FROM configuration WHERE server = $1 and brand = $2',
-            interaction.guild_id, b.id
-        )
+        config = self.bot.configs.get(interaction.guild_id, b.id)
 
-        if not con:
+        if not config:
             return await interaction.followup.send(
                 f"You have not set up a {b.name} feed yet in this server! Use {cmd_ping(self.bot.cmds, 'setup')} to set one up!")
 
-        configs = [config_from_record(c) for c in con]
-        for c in configs:
-            await self.send_comics(c)
+        await self.send_comics(config)
 
-        await interaction.followup.send(
-            f"Feed successfully triggered in {', '.join(f'<#{cc.channel_id}>' for cc in configs)}")
+        await interaction.followup.send(f"Feed successfully triggered in <#{config.channel_id}>")
 
     @app_commands.command(name="setup")
     @checks.has_permissions(manage_guild=True)
@@ -500,7 +946,7 @@ class PullsCog(commands.Cog, name="Pulls"):
 
         b = self.brands[brand]
         f = Format(_format)
-        configs = await fetch_configs(self.bot.db, interaction.guild_id)
+        configs = self.bot.configs.for_server(interaction.guild_id)
 
         if channel is None:
             channel = interaction.channel
@@ -514,7 +960,7 @@ class PullsCog(commands.Cog, name="Pulls"):
             brand=b, _format=f, day=b.default_day
         )
 
-        await new_config.upload_to_sql(self.bot.db)
+        await self.bot.configs.add(new_config)
 
         self.schedule_feed(new_config)
 
@@ -0,0 +1,100 @@
+import asyncio
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from funcs.collage import CollageRenderer
+from funcs.profile import load_images
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def comic(id_: int):
+    return SimpleNamespace(id=id_, coverImage=f"https://covers.example/{id_}.jpg")
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    rendered = []
+
+    async def render(self, comics):
+        rendered.append(tuple(c.id for c in comics))
+        return [b'sheet']
+
+    monkeypatch.setattr(CollageRenderer, '_render', render)
+    return rendered
+
+
+def test_renders_are_shared_until_the_version_changes(loop, renders):
+    renderer = CollageRenderer(None, max_renders=4)
+    for version in [1, 1, 2]:
+        assert loop.run_until_complete(renderer.render('MARVEL', version, [comic(1), comic(2)])) == [b'sheet']
+    assert renders == [(1, 2), (1, 2)]
+
+
+def test_least_recently_used_render_is_evicted(loop, renders):
+    renderer = CollageRenderer(None, max_renders=2)
+    for ids in [[1], [2], [1], [3], [1], [2]]:
+        loop.run_until_complete(renderer.render('MARVEL', 1, [comic(i) for i in ids]))
+
+    # [1] stayed in use, so [2] was the one evicted when [3] came in
+    assert renders == [(1,), (2,), (3,), (2,)]
+    assert len(renderer._renders['MARVEL'][1]) == 2
+
+
+class FakeResponse:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        self.session.active += 1
+        self.session.peak = max(self.session.peak, self.session.active)
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.session.active -= 1
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        buffer = BytesIO()
+        Image.new('RGB', (4, 6)).save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+class FakeSession:
+    def __init__(self):
+        self.active = self.peak = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def get(self, url):
+        return FakeResponse(self)
+
+
+def test_downloads_are_limited(loop, monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr('funcs.profile.aiohttp.ClientSession', lambda: session)
+
+    async def load():
+        return await load_images([f"https://covers.example/{i}.jpg" for i in range(10)],
+                                 downloads=asyncio.Semaphore(3))
+
+    images = loop.run_until_complete(load())
+    assert len(images) == 10 and images[0].size == (4, 6)
+    assert session.peak == 3
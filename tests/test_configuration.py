@@ -0,0 +1,40 @@
+import datetime as dt
+
+import pytest
+from discord import utils
+
+from objects.configuration import next_feed_time, last_feed_time
+
+MONDAY = 0
+# A Monday, five minutes into the feed day
+RESTART = dt.datetime(2026, 10, 26, 0, 5, tzinfo=dt.timezone.utc)
+TODAY = dt.datetime(2026, 10, 26, tzinfo=dt.timezone.utc)
+WEEK = dt.timedelta(days=7)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    monkeypatch.setattr(utils, 'utcnow', lambda: RESTART)
+    return RESTART
+
+
+@pytest.mark.parametrize('offset', [600, 3600])
+def test_restart_inside_offset_window_keeps_todays_run(now, offset):
+    assert next_feed_time(MONDAY, offset) == TODAY + dt.timedelta(seconds=offset)
+    assert last_feed_time(MONDAY, offset) == TODAY + dt.timedelta(seconds=offset) - WEEK
+
+
+def test_restart_after_offset_passed_waits_a_week(now):
+    assert next_feed_time(MONDAY, 60) == TODAY + dt.timedelta(seconds=60) + WEEK
+    assert last_feed_time(MONDAY, 60) == TODAY + dt.timedelta(seconds=60)
+
+
+def test_next_run_is_after_the_current_one(now):
+    current = TODAY + dt.timedelta(seconds=600)
+    assert next_feed_time(MONDAY, 600, after=current) == current + WEEK
+
+
+def test_other_days(now):
+    # Sunday's slot passed yesterday; Tuesday's is tomorrow
+    assert last_feed_time(6, 0) == TODAY - dt.timedelta(days=1)
+    assert next_feed_time(1, 0) == TODAY + dt.timedelta(days=1)
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from objects.brand import Brands
+from objects.configuration import Configuration, Format
+from objects.configuration_store import ConfigurationStore
+
+MARVEL, DC = Brands()['MARVEL'], Brands()['DC']
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.records = []
+        self.fail = False
+        self.executed = []
+
+    async def execute(self, query, *args):
+        if self.fail and query.startswith('UPDATE'):
+            raise ConnectionError("connection lost")
+        self.executed.append(query)
+
+    async def fetch(self, query, *args):
+        return self.records
+
+    async def fetch_prepared(self, name, server_ids, brand_id=None):
+        return [r for r in self.records if r['server'] in server_ids and brand_id in (None, r['brand'])]
+
+
+def record(server, brand, channel, day):
+    return {'server': server, 'brand': brand.id, 'channel': channel, 'day': day, 'format': 'SUMMARY',
+            'ping': None, 'pin': False, 'check_key': False}
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture
+def store(loop):
+    db = FakeDatabase()
+    db.records = [record(1, MARVEL, 10, 2), record(1, DC, 11, 2), record(2, MARVEL, 20, 3)]
+    store = ConfigurationStore(db)
+    loop.run_until_complete(store.load())
+    return store
+
+
+def test_update_reindexes(loop, store):
+    config = store.get(1, MARVEL.id)
+    loop.run_until_complete(store.update(config, day=4, channel_id=12))
+
+    assert store.get(1, MARVEL.id) is config and config.day == 4
+    assert config in store.for_day(4) and config not in store.for_day(2)
+    assert store.for_channel(12) == [config] and store.for_channel(10) == []
+
+
+def test_failed_update_changes_nothing(loop, store):
+    config = store.get(1, MARVEL.id)
+    store.db.fail = True
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(store.update(config, day=4, format=Format.FULL))
+
+    assert config.day == 2
+    assert config in store.for_day(2) and store.for_day(4) == []
+    assert not any('pg_notify' in q for q in store.db.executed)
+
+
+def test_refresh_tells_listeners_what_changed(loop, store):
+    refreshed = []
+    store.add_refresh_listener(refreshed.append)
+
+    # Server 1's Marvel feed moved to another day, and its DC feed was deleted
+    store.db.records = [record(1, MARVEL, 10, 5), record(2, MARVEL, 20, 3)]
+    loop.run_until_complete(store._refresh([1], None))
+
+    assert refreshed == [{(1, MARVEL.id), (1, DC.id)}]
+    assert store.get(1, MARVEL.id).day == 5
+    assert store.get(1, DC.id) is None
+
+
+def test_removed_listener_is_not_called(loop, store):
+    refreshed = []
+    store.add_refresh_listener(refreshed.append)
+    store.remove_refresh_listener(refreshed.append)
+
+    loop.run_until_complete(store._refresh([2], MARVEL.id))
+    assert refreshed == []
+
+
+class FakeListener:
+    def __init__(self):
+        self.channels = {}
+
+    async def add_listener(self, channel, callback):
+        self.channels[channel] = callback
+
+    async def remove_listener(self, channel, callback):
+        self.channels.pop(channel, None)
+
+    def add_termination_listener(self, callback):
+        pass
+
+
+def test_subscriptions_follow_the_listener_connection(loop, store):
+    payloads = []
+    loop.run_until_complete(store.subscribe('refetch_comics', payloads.append))
+
+    # Subscribed before listening, and again on the new connection after a reconnect
+    for _ in range(2):
+        listener = FakeListener()
+
+        async def connect():
+            return listener
+
+        loop.run_until_complete(store.listen(connect))
+        listener.channels['refetch_comics'](None, 0, 'refetch_comics', 'admin')
+
+    assert payloads == ['admin', 'admin']
+
+    loop.run_until_complete(store.unsubscribe('refetch_comics'))
+    assert 'refetch_comics' not in listener.channels
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from funcs.dispatcher import GLOBAL_ROUTE, RateLimitTracker, TokenBucket, route_for
+
+HEADERS = {'X-RateLimit-Limit': '5', 'X-RateLimit-Remaining': '4', 'X-RateLimit-Reset-After': '5'}
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.mark.parametrize('method, path, route', [
+    ('POST', '/api/v10/channels/123/messages', ('channel', 123)),
+    ('PUT', '/api/v10/channels/123/messages/pins/456', ('pin', 123)),
+    ('DELETE', '/api/v10/channels/123/messages/pins/456', ('pin', 123)),
+    ('PUT', '/api/v10/channels/123/pins/456', ('pin', 123)),
+    ('GET', '/api/v10/channels/123/messages', None),
+    ('GET', '/api/v10/channels/123/messages/pins', None),
+    ('DELETE', '/api/v10/channels/123/messages/456', None),
+    ('PATCH', '/api/v10/users/@me', None),
+])
+def test_route_for(method, path, route):
+    assert route_for(method, path) == route
+
+
+def test_penalty_halves_rate_and_pauses(loop):
+    bucket = TokenBucket(50, 50)
+    bucket.penalise(2)
+    assert bucket.rate == 25
+    assert bucket.tokens == 0
+    assert bucket.paused_until == pytest.approx(loop.time() + 2, abs=0.1)
+
+
+def test_rate_never_drops_below_minimum(loop):
+    bucket = TokenBucket(50, 50)
+    for _ in range(20):
+        bucket.penalise(0)
+    assert bucket.rate == TokenBucket.MIN_RATE
+
+
+def test_recovery_is_gradual_and_capped(loop):
+    bucket = TokenBucket(50, 50)
+    bucket.penalise(0)
+    bucket.recover()
+    assert bucket.rate == 30
+    for _ in range(10):
+        bucket.recover()
+    assert bucket.rate == 50
+
+
+def test_update_learns_window_from_headers(loop):
+    bucket = TokenBucket(5, 1)
+    bucket.update(10, 9, 2)
+    assert bucket.capacity == 10
+    assert bucket.max_rate == 5
+
+
+def test_update_pauses_when_exhausted(loop):
+    bucket = TokenBucket(5, 1)
+    bucket.update(5, 0, 3)
+    assert bucket.tokens == 0
+    assert bucket.paused_until == pytest.approx(loop.time() + 3, abs=0.1)
+
+
+def test_observe_updates_send_and_pin_buckets(loop):
+    tracker = RateLimitTracker(50)
+    tracker.observe('POST', '/api/v10/channels/1/messages', 200, {**HEADERS, 'X-RateLimit-Limit': '7'})
+    tracker.observe('PUT', '/api/v10/channels/1/messages/pins/2', 200, {**HEADERS, 'X-RateLimit-Remaining': '0'})
+    assert tracker.buckets[('channel', 1)].capacity == 7
+    assert tracker.buckets[('pin', 1)].tokens == 0
+    assert tracker.statuses[200] == 2
+
+
+def test_observe_ignores_untracked_routes(loop):
+    tracker = RateLimitTracker(50)
+    tracker.observe('GET', '/api/v10/channels/1/messages', 200, {**HEADERS, 'X-RateLimit-Remaining': '0'})
+    tracker.observe('PATCH', '/api/v10/users/@me', 429, {'Retry-After': '7200'})
+    assert ('channel', 1) not in tracker.buckets
+    assert GLOBAL_ROUTE not in tracker.buckets
+    assert not tracker.rate_limited
+
+
+def test_observe_charges_429s_to_their_route(loop):
+    tracker = RateLimitTracker(50)
+    tracker.observe('PUT', '/api/v10/channels/1/messages/pins/2', 429, {'Retry-After': '1'})
+    assert tracker.rate_limited[('pin', 1)] == 1
+    assert GLOBAL_ROUTE not in tracker.buckets
+
+
+def test_global_bucket_recovers_after_penalties(loop):
+    tracker = RateLimitTracker(50)
+    for _ in range(8):
+        tracker.observe('POST', '/api/v10/channels/1/messages', 429,
+                        {'Retry-After': '0.1', 'X-RateLimit-Global': 'true'})
+    assert tracker.buckets[GLOBAL_ROUTE].rate == TokenBucket.MIN_RATE
+    assert tracker.rate_limited[GLOBAL_ROUTE] == 8
+
+    for _ in range(10):
+        tracker.observe('POST', '/api/v10/channels/1/messages', 200, HEADERS)
+    assert tracker.buckets[GLOBAL_ROUTE].rate == 50
@@ -0,0 +1,126 @@
+import asyncio
+import datetime as dt
+
+import pytest
+
+from funcs.feed_scheduler import FeedScheduler
+
+START = dt.datetime(2026, 10, 26, tzinfo=dt.timezone.utc)
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def scheduler(loop, fired):
+    async def callback(key, payload, when):
+        fired.append((key, payload, when))
+
+    # Fire times are in the loop's own clock, starting from START, so sleeps in the tests are short
+    started = loop.time()
+    scheduler = FeedScheduler(callback, clock=lambda: START + dt.timedelta(seconds=loop.time() - started))
+    scheduler.start(loop)
+    yield scheduler
+    scheduler.stop()
+    # Lets the cancelled runner finish, even in tests that never ran the loop
+    loop.run_until_complete(asyncio.sleep(0))
+
+
+def at(seconds: float) -> dt.datetime:
+    return START + dt.timedelta(seconds=seconds)
+
+
+def run(loop, seconds: float):
+    loop.run_until_complete(asyncio.sleep(seconds))
+
+
+def test_fires_in_order(loop, scheduler, fired):
+    scheduler.schedule('c', at(0.06), 3)
+    scheduler.schedule('a', at(0.02), 1)
+    scheduler.schedule('b', at(0.04), 2)
+    run(loop, 0.1)
+
+    assert [key for key, _, _ in fired] == ['a', 'b', 'c']
+    assert [payload for _, payload, _ in fired] == [1, 2, 3]
+    assert len(scheduler) == 0
+
+
+def test_same_time_fires_in_scheduling_order(loop, scheduler, fired):
+    for key in ['x', 'y', 'z']:
+        scheduler.schedule(key, at(0.01))
+    run(loop, 0.05)
+
+    assert [key for key, _, _ in fired] == ['x', 'y', 'z']
+
+
+def test_cancelled_entry_never_fires(loop, scheduler, fired):
+    scheduler.schedule('a', at(0.02))
+    scheduler.schedule('b', at(0.03))
+    assert scheduler.cancel('a')
+    assert not scheduler.cancel('a')
+    run(loop, 0.08)
+
+    assert [key for key, _, _ in fired] == ['b']
+
+
+def test_rescheduling_a_key_replaces_its_entry(loop, scheduler, fired):
+    scheduler.schedule('a', at(0.02), 'old')
+    scheduler.schedule('b', at(0.04))
+    scheduler.schedule('a', at(0.06), 'new')
+    assert len(scheduler) == 2
+    assert scheduler.next_fire('a') == at(0.06)
+    run(loop, 0.1)
+
+    assert [(key, payload) for key, payload, _ in fired] == [('b', None), ('a', 'new')]
+
+
+def test_earlier_entry_wakes_the_runner(loop, scheduler, fired):
+    scheduler.schedule('late', at(60))
+    run(loop, 0.01)
+    scheduler.schedule('soon', at(0.03))
+    run(loop, 0.08)
+
+    assert [key for key, _, _ in fired] == ['soon']
+
+
+def test_fires_exactly_once(loop, scheduler, fired):
+    scheduler.schedule('a', at(0.01))
+    run(loop, 0.1)
+
+    assert len(fired) == 1
+    assert fired[0][2] == at(0.01)
+    assert 'a' not in scheduler and scheduler.next_fire('a') is None
+
+
+def test_compacts_once_cancelled_entries_dominate(loop, scheduler):
+    for i in range(200):
+        scheduler.schedule(i, at(60 + i))
+    for i in range(150):
+        scheduler.cancel(i)
+
+    # Compacted whenever the heap held more than twice the live entries plus slack
+    assert len(scheduler) == 50
+    assert len(scheduler._heap) < 200
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+    assert sorted(scheduler.keys()) == list(range(150, 200))
+    assert scheduler._peek().key == 150
+
+
+def test_rescheduling_many_times_keeps_the_heap_bounded(loop, scheduler):
+    for when in range(1000):
+        scheduler.schedule('a', at(60 + when))
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+    assert scheduler.next_fire('a') == at(60 + 999)
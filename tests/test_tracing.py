@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+
+from funcs.tracing import JsonLinesExporter, Tracer
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+def read_spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_spans_nest_and_export_together(tmp_path):
+    tracer = Tracer(JsonLinesExporter(tmp_path / 'traces.jsonl'), sample_rate=1.0)
+    with tracer.span('send_comics', guild=1, brand='MARVEL'):
+        with tracer.span('lock_wait'):
+            pass
+
+    child, root = read_spans(tmp_path / 'traces.jsonl')
+    assert (child['name'], root['name']) == ('lock_wait', 'send_comics')
+    assert child['trace_id'] == root['trace_id'] and child['parent_id'] == root['span_id']
+    assert child['attributes'] == {'guild': 1, 'brand': 'MARVEL'}
+
+
+def test_unsampled_traces_are_not_exported(tmp_path):
+    tracer = Tracer(JsonLinesExporter(tmp_path / 'traces.jsonl'), sample_rate=0.0)
+    with tracer.span('send_comics') as span:
+        span.set(comics=3)
+    assert not (tmp_path / 'traces.jsonl').exists()
+
+
+def test_exports_on_the_loop_are_written_off_it(loop, tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    exporter = JsonLinesExporter(path)
+    tracer = Tracer(exporter, sample_rate=1.0)
+
+    async def feed(i: int):
+        with tracer.span('send_comics', guild=i):
+            await asyncio.sleep(0)
+
+    async def run():
+        await asyncio.gather(*(feed(i) for i in range(20)))
+        # Nothing was written while the spans finished; the writes are queued for the executor
+        assert not path.exists()
+        await exporter.flush()
+
+    loop.run_until_complete(run())
+    assert sorted(s['attributes']['guild'] for s in read_spans(path)) == list(range(20))